@@ -1,14 +1,43 @@
-import markdown
 from flask import Flask
 from flask_login import LoginManager
 from app.models.user import UserModel
+from app.models import database, migrations, snapshot, search_engine, client_index
+from app.utils.cache import LRUCache
+from app.utils.markdown_render import render_markdown, item_html
+from app.utils import response_cache, invalidation, logo_pipeline, assets, compression, instrumentation
+from app.utils.upload import logo_sources
 from datetime import datetime  # ADD THIS IMPORT
 
 login_manager = LoginManager()
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
     app.config['SECRET_KEY'] = 'your-secret-key-here'  # Change this!
+    if config:
+        app.config.update(config)
+    
+    database.init_app(app)
+    migrations.init_app(app)
+    # First hooks registered, so its timings cover the other hooks too
+    instrumentation.init_app(app)
+    invalidation.init_app(app)
+    
+    app.config.setdefault('SEARCH_CACHE_SIZE', 512)
+    app.config.setdefault('SEARCH_CACHE_TTL', 300)
+    search_cache = LRUCache(app.config['SEARCH_CACHE_SIZE'], app.config['SEARCH_CACHE_TTL'])
+    app.extensions['search_cache'] = search_cache
+    invalidation.register(lambda version: search_cache.clear(), app)
+    # 'engine' (ranked, typo-tolerant) or 'fts' (SQLite FTS5)
+    app.config.setdefault('SEARCH_BACKEND', 'engine')
+    if app.config['SEARCH_BACKEND'] not in ('engine', 'fts'):
+        raise ValueError(f"Unknown SEARCH_BACKEND: {app.config['SEARCH_BACKEND']!r}")
+    search_engine.init_app(app)
+    logo_pipeline.init_app(app)
+    assets.init_app(app)
+    compression.init_app(app)
+    response_cache.init_app(app)
+    snapshot.init_app(app)
+    client_index.init_app(app)
     
     login_manager.init_app(app)
     login_manager.login_view = 'auth.login'
@@ -23,19 +52,9 @@ def create_app():
     app.register_blueprint(admin_bp, url_prefix='/admin')
     app.register_blueprint(search_bp)
     
-    @app.template_filter('markdown')
-    def render_markdown(text):
-        if not text:
-            return ""
-        
-        return markdown.markdown(
-            text, 
-            extensions=[
-                'fenced_code',
-                'tables',
-                'toc'
-            ]
-        )
+    app.add_template_filter(render_markdown, 'markdown')
+    app.add_template_filter(item_html, 'item_html')
+    app.add_template_global(logo_sources, 'logo_sources')
     
     # ADD THE DATETIME FILTER INSIDE create_app FUNCTION
     @app.template_filter('datetime')
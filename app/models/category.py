@@ -1,4 +1,6 @@
 from .database import db_connection
+from .ordering import bulk_reorder
+from .records import Category
 
 class CategoryModel:
     # ------- ALL ------- #
@@ -65,19 +67,8 @@ class CategoryModel:
     # ------- REORDER CATEGORIES ------- #
     @db_connection
     def reorder_categories(self, cursor, category_order):
-        try:
-            cursor.execute('UPDATE category SET display_order = display_order + 1000')
-            
-            for display_order, category_id in enumerate(category_order):
-                cursor.execute(
-                    'UPDATE category SET display_order = ? WHERE id = ?',
-                    (display_order, category_id)
-                )
-            
-            return True
-        except Exception as e:
-            print(f"Error reordering categories: {e}")
-            return False
+        bulk_reorder(cursor, 'category', category_order)
+        return True
     
     # ------- BY CATEGORY WITH TOPICS ------- #
     @db_connection
@@ -146,9 +137,9 @@ class CategoryModel:
 
     # ------- CONVERT DB ROW TO CATEGORY OBJECT ------- #
     def _dict_to_category(self, category_data):
-        category = CategoryModel()
-        category.id = category_data['id']
-        category.name = category_data['name']
-        category.display_order = category_data['display_order']
-        category.created_at = category_data['created_at']
-        return category
\ No newline at end of file
+        return Category(
+            id=category_data['id'],
+            name=category_data['name'],
+            display_order=category_data['display_order'],
+            created_at=category_data['created_at']
+        )
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import threading
+from flask import current_app
+from .search_engine import (
+    Document, TOPIC_TITLE_WEIGHT, SECTION_TITLE_WEIGHT, ITEM_TITLE_WEIGHT, CONTENT_WEIGHT, WEIGHT_SCALE
+)
+from .search_index import KIND_TOPIC, KIND_SECTION, KIND_ITEM
+from .snapshot import get_snapshot
+from app.utils import invalidation
+
+CLIENT_INDEX_VERSION_LENGTH = 16
+
+# ----- BUILD ----- #
+def build_client_index(snapshot, max_documents):
+    """Compact search index over a snapshot's published content, as (version, bytes).
+
+    Documents are numbered topics first (by title), then sections, then
+    items (in display order). ``terms`` is the sorted vocabulary and
+    ``postings[i]`` lists the documents containing ``terms[i]`` as flat
+    (gap from the previous document number, weight) pairs. Item text is only tokenized,
+    never sent, so local results have no snippets. Above max_documents the
+    index just says it is unavailable and clients search on the server.
+    """
+    topics = list(snapshot.topics)
+    sections = [(topic_index, section) for topic_index, topic in enumerate(topics) for section in topic.sections]
+    items = [(section_index, item) for section_index, (_, section) in enumerate(sections) for item in section.items]
+
+    if len(topics) + len(sections) + len(items) > max_documents:
+        payload = {'available': False}
+    else:
+        documents = [
+            Document(KIND_TOPIC, topic.id, [(topic.title, TOPIC_TITLE_WEIGHT), (topic.description, CONTENT_WEIGHT)])
+            for topic in topics
+        ] + [
+            Document(KIND_SECTION, section.id, [(section.title, SECTION_TITLE_WEIGHT)])
+            for _, section in sections
+        ] + [
+            Document(KIND_ITEM, item.id, [(item.title, ITEM_TITLE_WEIGHT), (item.markdown_content, CONTENT_WEIGHT)])
+            for _, item in items
+        ]
+
+        postings = {}
+        for number, document in enumerate(documents):
+            for term, weight in document.weights.items():
+                # Sent as integers; the engine's weights are whole multiples of 1 / WEIGHT_SCALE
+                postings.setdefault(term, []).append((number, round(weight * WEIGHT_SCALE)))
+
+        terms = sorted(postings)
+        encoded = []
+        for term in terms:
+            flat = []
+            previous = 0
+            for number, weight in postings[term]:
+                flat.extend((number - previous, weight))
+                previous = number
+            encoded.append(flat)
+
+        payload = {
+            'available': True,
+            'weight_scale': WEIGHT_SCALE,
+            'topics': [[topic.id, topic.slug, topic.title, topic.description] for topic in topics],
+            'sections': [[section.id, topic_index, section.title] for topic_index, section in sections],
+            'items': [[item.id, section_index, item.title] for section_index, item in items],
+            'terms': terms,
+            'postings': encoded,
+        }
+
+    body = json.dumps(payload, separators=(',', ':'))
+    version = hashlib.sha256(body.encode()).hexdigest()[:CLIENT_INDEX_VERSION_LENGTH]
+    return version, f'{{"version":"{version}",{body[1:]}'.encode()
+
+# ----- CURRENT INDEX ----- #
+class _ClientIndexSlot:
+    def __init__(self):
+        # (snapshot version, (index version, bytes)), replaced as a whole
+        self.entry = None
+        self.lock = threading.Lock()
+
+    def invalidate(self, version):
+        entry = self.entry
+        if entry is not None and entry[0] < version:
+            self.entry = None
+
+def init_app(app):
+    # Larger corpora are searched on the server only
+    app.config.setdefault('CLIENT_SEARCH_MAX_DOCUMENTS', 5000)
+    slot = _ClientIndexSlot()
+    app.extensions['client_search_index'] = slot
+    invalidation.register(slot.invalidate, app)
+
+def get_client_index():
+    """Return (version, JSON bytes) for the current snapshot, built on first use."""
+    slot = current_app.extensions['client_search_index']
+    snapshot = get_snapshot()
+    entry = slot.entry
+    if entry is not None and entry[0] == snapshot.version:
+        return entry[1]
+
+    with slot.lock:
+        entry = slot.entry
+        if entry is None or entry[0] != snapshot.version:
+            entry = (snapshot.version, build_client_index(snapshot, current_app.config['CLIENT_SEARCH_MAX_DOCUMENTS']))
+            slot.entry = entry
+    return entry[1]
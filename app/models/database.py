@@ -1,26 +1,253 @@
 import sqlite3
 import os
-from flask import g
+import threading
+import time
+from contextlib import contextmanager
+from blinker import Namespace
+from flask import g, current_app, has_app_context
 import hashlib
 
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), '../../instance/site.db')
+
+# ----- PRAGMA PROFILE ----- #
+# Applied to every connection, in this order. WAL lets readers keep going
+# while an admin write is in progress; foreign_keys is needed for the
+# ON DELETE CASCADE clauses in the schema. Override with DB_PRAGMAS.
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'foreign_keys': 'ON',
+    'busy_timeout': 5000,
+    'cache_size': -16000,
+    'mmap_size': 134217728,
+    'temp_store': 'MEMORY',
+}
+
+def apply_pragmas(conn, pragmas):
+    for name, value in pragmas.items():
+        if not name.isidentifier():
+            raise ValueError(f"Invalid pragma name: {name!r}")
+        conn.execute(f'PRAGMA {name} = {value}').fetchall()
+
+# ----- INSTRUMENTATION SIGNALS ----- #
+# Sent for every connection opened and every statement run, so
+# app/utils/instrumentation.py can count them per request
+_signals = Namespace()
+connection_opened = _signals.signal('connection-opened')
+query_executed = _signals.signal('query-executed')
+
+def _timed(execute, sql, *args):
+    start = time.perf_counter()
+    try:
+        return execute(sql, *args)
+    finally:
+        if query_executed.receivers:
+            query_executed.send(None, sql=sql, elapsed=time.perf_counter() - start)
+
+class InstrumentedCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        return _timed(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return _timed(super().executemany, sql, seq_of_parameters)
+
+class InstrumentedConnection(sqlite3.Connection):
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+# ----- OPEN A RAW CONNECTION ----- #
+def connect(db_path=DEFAULT_DB_PATH, pragmas=None):
+    conn = sqlite3.connect(db_path, check_same_thread=False, factory=InstrumentedConnection)
+    conn.row_factory = sqlite3.Row
+    connection_opened.send(None, db_path=db_path)
+    apply_pragmas(conn, DEFAULT_PRAGMAS if pragmas is None else pragmas)
+    return conn
+
+# ----- CONNECTION POOL ----- #
+class ConnectionPool:
+    """Bounded, thread-safe pool of SQLite connections.
+
+    At most ``size`` connections exist at once; callers block for up to
+    ``acquire_timeout`` seconds when all of them are checked out. Connections
+    that sat idle for longer than ``idle_timeout`` seconds are closed instead
+    of being reused.
+    """
+    def __init__(self, db_path, size=5, idle_timeout=300, acquire_timeout=10, pragmas=None):
+        self.db_path = db_path
+        self.pragmas = pragmas
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self._idle = []
+        self._in_use = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._cond:
+            while True:
+                self._prune_idle()
+                if self._idle:
+                    conn, _ = self._idle.pop()
+                    self._in_use += 1
+                    return conn
+                if self._in_use < self.size:
+                    self._in_use += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError('Timed out waiting for a database connection')
+                self._cond.wait(remaining)
+
+        try:
+            return connect(self.db_path, self.pragmas)
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            reusable = True
+        except sqlite3.Error:
+            reusable = False
+
+        with self._cond:
+            self._in_use -= 1
+            if reusable:
+                self._idle.append((conn, time.monotonic()))
+            else:
+                conn.close()
+            self._cond.notify()
+
+    def close_all(self):
+        with self._cond:
+            for conn, _ in self._idle:
+                conn.close()
+            self._idle = []
+
+    def _prune_idle(self):
+        if not self.idle_timeout:
+            return
+        cutoff = time.monotonic() - self.idle_timeout
+        fresh = []
+        for conn, released_at in self._idle:
+            if released_at < cutoff:
+                conn.close()
+            else:
+                fresh.append((conn, released_at))
+        self._idle = fresh
+
+# ----- CONTENT GENERATION ----- #
+# A single row in content_version, bumped by triggers on the content tables
+# (see migrations.py), so writes from any process or tool are seen. Caches
+# key their entries on it; it is read at most once per app context.
+def _read_content_version(conn):
+    try:
+        row = conn.execute('SELECT version FROM content_version WHERE id = 1').fetchone()
+    except sqlite3.OperationalError:
+        # Database not migrated yet
+        return 0
+    return row[0] if row else 0
+
+def content_generation():
+    if has_app_context() and 'db_pool' in current_app.extensions:
+        if '_content_version' not in g:
+            g._content_version = _read_content_version(get_db())
+        return g._content_version
+    conn = connect()
+    try:
+        return _read_content_version(conn)
+    finally:
+        conn.close()
+
+# ----- PER-REQUEST CONNECTION STATE ----- #
+class _RequestDB:
+    def __init__(self, conn, private=False):
+        self.conn = conn
+        self.private = private
+        self.depth = 0
+        self.failed = False
+        self.changes_at_start = 0
+
+def _request_db():
+    if '_db' not in g:
+        g._db = _RequestDB(current_app.extensions['db_pool'].acquire())
+    return g._db
+
+def get_db():
+    """Return the connection bound to the current app context."""
+    return _request_db().conn
+
+def close_db(exc=None):
+    state = g.pop('_db', None)
+    if state is not None:
+        current_app.extensions['db_pool'].release(state.conn)
+
+def init_app(app):
+    app.config.setdefault('DATABASE', DEFAULT_DB_PATH)
+    app.config.setdefault('DB_POOL_SIZE', 5)
+    app.config.setdefault('DB_POOL_IDLE_TIMEOUT', 300)
+    app.config.setdefault('DB_POOL_ACQUIRE_TIMEOUT', 10)
+    app.config.setdefault('DB_PRAGMAS', {})
+
+    app.extensions['db_pool'] = ConnectionPool(
+        app.config['DATABASE'],
+        size=app.config['DB_POOL_SIZE'],
+        idle_timeout=app.config['DB_POOL_IDLE_TIMEOUT'],
+        acquire_timeout=app.config['DB_POOL_ACQUIRE_TIMEOUT'],
+        pragmas={**DEFAULT_PRAGMAS, **app.config['DB_PRAGMAS']}
+    )
+    app.teardown_appcontext(close_db)
+
 # ----- DB CONNECTION ----- #
 class DBConnection:
+    """Cursor scope on the shared request connection.
+
+    Inside an app context every ``DBConnection`` borrows the same pooled
+    connection, so nested scopes form a single transaction that is committed
+    when the outermost one exits. Without an app context (``init_db.py``)
+    a private connection is opened and closed as before.
+    """
     def __enter__(self):
-        db_path = os.path.join(os.path.dirname(__file__), '../../instance/site.db')
-        self.conn = sqlite3.connect(db_path)
-        self.conn.row_factory = sqlite3.Row
+        if has_app_context() and 'db_pool' in current_app.extensions:
+            self.state = _request_db()
+        else:
+            self.state = _RequestDB(connect(), private=True)
+        self.conn = self.state.conn
+        if self.state.depth == 0:
+            self.state.changes_at_start = self.conn.total_changes
+        self.state.depth += 1
         self.cursor = self.conn.cursor()
         return self.cursor
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.cursor:
             self.cursor.close()
-        if self.conn:
-            if exc_type is None:
-                self.conn.commit()
-            else:
+        state = self.state
+        state.depth -= 1
+        if exc_type is not None:
+            state.failed = True
+        if state.depth == 0:
+            if state.failed:
                 self.conn.rollback()
-            self.conn.close()
+            else:
+                self.conn.commit()
+                if self.conn.total_changes != state.changes_at_start and not state.private:
+                    # Let this request see its own write
+                    g.pop('_content_version', None)
+            state.failed = False
+            if state.private:
+                self.conn.close()
         return False
 
 def db_connection(func):
@@ -30,6 +257,13 @@ def db_connection(func):
             return result
     return wrapper
 
+# ----- SHARED TRANSACTION ----- #
+@contextmanager
+def transaction():
+    """Group several model calls into one commit (or one rollback)."""
+    with DBConnection() as cursor:
+        yield cursor
+
 # ----- HASH PASSWORD ----- #
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
@@ -37,4 +271,4 @@ def hash_password(password):
 # ----- VERIFY PASSWORD ----- #
 def verify_password(password, password_hash):
     """Verify a stored password against one provided by user"""
-    return hash_password(password) == password_hash
\ No newline at end of file
+    return hash_password(password) == password_hash
@@ -0,0 +1,356 @@
+from .database import db_connection
+from .search_index import KIND_TOPIC, KIND_SECTION, KIND_ITEM
+
+# ----- ADD COLUMNS TO EXISTING TABLES ----- #
+def add_missing_columns(cursor, table, columns):
+    cursor.execute(f'PRAGMA table_info({table})')
+    existing = {column['name'] for column in cursor.fetchall()}
+    for name, column_type in columns.items():
+        if name not in existing:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {column_type}')
+
+def _add_rendered_html_columns(cursor):
+    # Fresh databases already have these from create_tables
+    add_missing_columns(cursor, 'section_item', {
+        'rendered_html': 'TEXT',
+        'rendered_key': 'TEXT'
+    })
+
+# Tables whose rows end up on public pages; any change to them bumps content_version
+CONTENT_TABLES = ('category', 'topic', 'section', 'section_item')
+
+# Searchable tables, their search_index kind and the columns the search engine indexes
+SEARCH_SOURCES = (
+    ('topic', KIND_TOPIC, 'title, description'),
+    ('section', KIND_SECTION, 'title'),
+    ('section_item', KIND_ITEM, 'title, markdown_content'),
+)
+# search_changes keeps this many rows; an engine further behind rebuilds
+SEARCH_CHANGES_KEPT = 10000
+
+# Columns that decide whether a row is published: the engine only indexes
+# published content, so publishing a topic or moving a row is logged too
+SEARCH_PUBLICATION_COLUMNS = (
+    ('topic', KIND_TOPIC, 'is_published'),
+    ('section', KIND_SECTION, 'topic_id'),
+    ('section_item', KIND_ITEM, 'section_id'),
+)
+
+def _add_logo_pending_columns(cursor):
+    add_missing_columns(cursor, 'topic', {
+        'logo_pending_light': 'TEXT',
+        'logo_pending_dark': 'TEXT'
+    })
+
+def _add_logo_claim_columns(cursor):
+    add_missing_columns(cursor, 'topic', {
+        'logo_claimed_light': 'TIMESTAMP',
+        'logo_claimed_dark': 'TIMESTAMP'
+    })
+
+def _add_content_changed_at(cursor):
+    # Last-Modified of pages built from all content (the home page)
+    add_missing_columns(cursor, 'content_version', {'changed_at': 'TIMESTAMP'})
+    cursor.execute('UPDATE content_version SET changed_at = CURRENT_TIMESTAMP WHERE changed_at IS NULL')
+
+# ----- FULL-TEXT SEARCH INDEX ----- #
+# One row per topic, section and item. The rowid encodes the source
+# row as id * 4 + kind (1 = topic, 2 = section, 3 = item).
+SEARCH_INDEX_TRIGGERS = [
+    '''
+    CREATE TRIGGER IF NOT EXISTS topic_search_insert AFTER INSERT ON topic BEGIN
+        INSERT INTO search_index (rowid, title, body)
+        VALUES (new.id * 4 + 1, new.title, COALESCE(new.description, ''));
+    END''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS topic_search_update AFTER UPDATE OF title, description ON topic BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 1;
+        INSERT INTO search_index (rowid, title, body)
+        VALUES (new.id * 4 + 1, new.title, COALESCE(new.description, ''));
+    END''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS topic_search_delete AFTER DELETE ON topic BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 1;
+    END''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS section_search_insert AFTER INSERT ON section BEGIN
+        INSERT INTO search_index (rowid, title, body)
+        VALUES (new.id * 4 + 2, new.title, '');
+    END''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS section_search_update AFTER UPDATE OF title ON section BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 2;
+        INSERT INTO search_index (rowid, title, body)
+        VALUES (new.id * 4 + 2, new.title, '');
+    END''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS section_search_delete AFTER DELETE ON section BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 2;
+    END''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS item_search_insert AFTER INSERT ON section_item BEGIN
+        INSERT INTO search_index (rowid, title, body)
+        VALUES (new.id * 4 + 3, new.title, new.markdown_content);
+    END''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS item_search_update AFTER UPDATE OF title, markdown_content ON section_item BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 3;
+        INSERT INTO search_index (rowid, title, body)
+        VALUES (new.id * 4 + 3, new.title, new.markdown_content);
+    END''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS item_search_delete AFTER DELETE ON section_item BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 3;
+    END''',
+]
+
+def create_search_index(cursor):
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            title,
+            body,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    ''')
+    for trigger_sql in SEARCH_INDEX_TRIGGERS:
+        cursor.execute(trigger_sql)
+
+    # Backfill databases created before the index existed
+    cursor.execute('SELECT COUNT(*) FROM search_index')
+    if cursor.fetchone()[0] == 0:
+        populate_search_index(cursor)
+
+def populate_search_index(cursor):
+    cursor.execute('''
+        INSERT INTO search_index (rowid, title, body)
+        SELECT id * 4 + 1, title, COALESCE(description, '') FROM topic
+        UNION ALL
+        SELECT id * 4 + 2, title, '' FROM section
+        UNION ALL
+        SELECT id * 4 + 3, title, markdown_content FROM section_item
+    ''')
+
+# ----- MIGRATIONS ----- #
+# Applied in order, once each; never edit a released step, append a new one.
+# A step is either an SQL string or a callable taking the cursor.
+MIGRATIONS = [
+    (1, 'rendered markdown columns on section_item', [
+        _add_rendered_html_columns,
+    ]),
+    (2, 'indexes for hot lookup and ORDER BY columns', [
+        'CREATE INDEX IF NOT EXISTS idx_section_topic_order ON section (topic_id, display_order, id)',
+        'CREATE INDEX IF NOT EXISTS idx_item_section_order ON section_item (section_id, display_order, id)',
+        'CREATE INDEX IF NOT EXISTS idx_topic_category_order ON topic (category_id, is_published, display_order, title)',
+        'CREATE INDEX IF NOT EXISTS idx_topic_published_title ON topic (is_published, title)',
+        'CREATE INDEX IF NOT EXISTS idx_topic_updated_at ON topic (updated_at)',
+        'CREATE INDEX IF NOT EXISTS idx_category_order ON category (display_order, name)',
+    ]),
+    (3, 'content_version counter', [
+        '''
+        CREATE TABLE IF NOT EXISTS content_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+        ''',
+        'INSERT OR IGNORE INTO content_version (id, version) VALUES (1, 1)',
+    ]),
+    (4, 'content_version triggers', [
+        f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_content_version_{event.lower()}
+        AFTER {event} ON {table} BEGIN
+            UPDATE content_version SET version = version + 1 WHERE id = 1;
+        END
+        '''
+        for table in CONTENT_TABLES
+        for event in ('INSERT', 'UPDATE', 'DELETE')
+    ]),
+    (5, 'search engine change log', [
+        '''
+        CREATE TABLE IF NOT EXISTS search_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind INTEGER NOT NULL,
+            ref_id INTEGER NOT NULL
+        )
+        ''',
+        *[
+            f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_search_changes_{event.split()[0].lower()}
+            AFTER {event} ON {table} BEGIN
+                INSERT INTO search_changes (kind, ref_id) VALUES ({kind}, {'OLD' if event == 'DELETE' else 'NEW'}.id);
+                DELETE FROM search_changes WHERE seq <= (SELECT MAX(seq) FROM search_changes) - {SEARCH_CHANGES_KEPT};
+            END
+            '''
+            for table, kind, columns in SEARCH_SOURCES
+            for event in ('INSERT', f'UPDATE OF {columns}', 'DELETE')
+        ],
+    ]),
+    (6, 'staged logo uploads on topic', [
+        _add_logo_pending_columns,
+    ]),
+    # Only init_db.py used to create it, so upgraded databases lacked it
+    (7, 'full-text search index', [
+        create_search_index,
+    ]),
+    (8, 'search engine publication changes', [
+        f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_search_changes_publication
+        AFTER UPDATE OF {column} ON {table} BEGIN
+            INSERT INTO search_changes (kind, ref_id) VALUES ({kind}, NEW.id);
+            DELETE FROM search_changes WHERE seq <= (SELECT MAX(seq) FROM search_changes) - {SEARCH_CHANGES_KEPT};
+        END
+        '''
+        for table, kind, column in SEARCH_PUBLICATION_COLUMNS
+    ]),
+    (9, 'claims on staged logo uploads', [
+        _add_logo_claim_columns,
+    ]),
+    (10, 'content_version change time', [
+        _add_content_changed_at,
+    ] + [
+        statement
+        for table in CONTENT_TABLES
+        for event in ('INSERT', 'UPDATE', 'DELETE')
+        for statement in (
+            f'DROP TRIGGER IF EXISTS {table}_content_version_{event.lower()}',
+            f'''
+            CREATE TRIGGER {table}_content_version_{event.lower()}
+            AFTER {event} ON {table} BEGIN
+                UPDATE content_version SET version = version + 1, changed_at = CURRENT_TIMESTAMP WHERE id = 1;
+            END
+            ''',
+        )
+    ]),
+]
+
+# ----- HOT QUERIES ----- #
+# Model queries on the request path, with sample parameters. None of them
+# may fall back to a full table scan, except on the tables listed, which
+# the query has to read completely anyway.
+HOT_QUERIES = [
+    ('TopicModel.get_all_published', '''
+        SELECT t.*, c.name as category_name FROM topic t
+        LEFT JOIN category c ON t.category_id = c.id
+        WHERE t.is_published = 1 ORDER BY t.title
+    ''', (), ()),
+    ('TopicModel.get_by_slug', '''
+        SELECT t.*, c.name as category_name FROM topic t
+        LEFT JOIN category c ON t.category_id = c.id
+        WHERE t.slug = ? AND t.is_published = 1
+    ''', ('python',), ()),
+    ('TopicModel.get_by_category', '''
+        SELECT t.*, c.name as category_name FROM topic t
+        LEFT JOIN category c ON t.category_id = c.id
+        WHERE t.category_id = ? ORDER BY t.title
+    ''', (1,), ()),
+    ('TopicModel.get_recently_updated', '''
+        SELECT t.*, c.name as category_name FROM topic t
+        LEFT JOIN category c ON t.category_id = c.id
+        ORDER BY t.updated_at DESC LIMIT ?
+    ''', (4,), ()),
+    ('TopicModel._attach_sections (sections)', '''
+        SELECT * FROM section WHERE topic_id IN (?, ?) ORDER BY display_order, id
+    ''', (1, 2), ()),
+    ('TopicModel._attach_sections (items)', '''
+        SELECT i.* FROM section_item i JOIN section s ON i.section_id = s.id
+        WHERE s.topic_id IN (?, ?) ORDER BY i.display_order, i.id
+    ''', (1, 2), ()),
+    ('SectionModel.get_by_topic', '''
+        SELECT * FROM section WHERE topic_id = ? ORDER BY display_order, id
+    ''', (1,), ()),
+    ('SectionItemModel.get_by_section', '''
+        SELECT * FROM section_item WHERE section_id = ? ORDER BY display_order, id
+    ''', (1,), ()),
+    ('CategoryModel.get_all', '''
+        SELECT * FROM category ORDER BY display_order, name
+    ''', (), ()),
+    ('CategoryModel.get_topics_by_category', '''
+        SELECT c.id as category_id, c.name as category_name, c.display_order,
+            GROUP_CONCAT(t.id) as topic_ids
+        FROM category c
+        LEFT JOIN topic t ON c.id = t.category_id AND t.is_published = 1
+        GROUP BY c.id
+        ORDER BY c.display_order, c.name
+    ''', (), ('c',)),
+]
+
+class Migrations:
+    # ----- CURRENT VERSION ----- #
+    @db_connection
+    def current_version(self, cursor):
+        self._ensure_version_table(cursor)
+        cursor.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version')
+        return cursor.fetchone()[0]
+
+    # ----- APPLY PENDING MIGRATIONS ----- #
+    @db_connection
+    def migrate(self, cursor):
+        """Apply every pending step in one transaction; returns the versions applied."""
+        # Take the write lock before reading the version, so workers that
+        # start together apply each step once, one after the other
+        if not cursor.connection.in_transaction:
+            cursor.execute('BEGIN IMMEDIATE')
+        self._ensure_version_table(cursor)
+        cursor.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version')
+        current = cursor.fetchone()[0]
+
+        applied = []
+        for version, name, steps in MIGRATIONS:
+            if version <= current:
+                continue
+            for step in steps:
+                if callable(step):
+                    step(cursor)
+                else:
+                    cursor.execute(step)
+            cursor.execute(
+                'INSERT INTO schema_version (version, name) VALUES (?, ?)',
+                (version, name)
+            )
+            applied.append(version)
+            print(f"Applied migration {version}: {name}")
+
+        return applied
+
+    # ----- FIND FULL TABLE SCANS ----- #
+    @db_connection
+    def check_query_plans(self, cursor):
+        """Return (query name, plan detail) for each hot query that scans a table."""
+        problems = []
+        for name, sql, params, allowed_scans in HOT_QUERIES:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            for row in cursor.fetchall():
+                detail = row['detail']
+                words = detail.split()
+                if words[0] == 'SCAN' and 'INDEX' not in words and words[1] not in allowed_scans:
+                    problems.append((name, detail))
+        return problems
+
+    # ----- EXISTING DATABASE ----- #
+    @db_connection
+    def has_schema(self, cursor):
+        """True once init_db.py has created the tables."""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'topic'")
+        return cursor.fetchone() is not None
+
+    def _ensure_version_table(self, cursor):
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+def init_app(app):
+    # Bring a database from an older release up to date on startup, so
+    # pages don't fail on missing tables until migrate_db.py is run
+    app.config.setdefault('AUTO_MIGRATE', True)
+    if not app.config['AUTO_MIGRATE']:
+        return
+    with app.app_context():
+        migrations = Migrations()
+        try:
+            if migrations.has_schema():
+                migrations.migrate()
+        except Exception as e:
+            print(f"Error applying migrations: {e}")
@@ -0,0 +1,81 @@
+import json
+import sqlite3
+
+# UPDATE ... FROM needs SQLite 3.33; json_each needs the JSON1 extension,
+# built in by default only since 3.38. Checked once per process.
+UPDATE_FROM_MIN_VERSION = (3, 33, 0)
+_set_based_supported = None
+
+def set_based_reorder_supported(cursor):
+    """True when this SQLite can run the one-statement UPDATE ... FROM json_each."""
+    global _set_based_supported
+    if _set_based_supported is None:
+        supported = sqlite3.sqlite_version_info >= UPDATE_FROM_MIN_VERSION
+        if supported:
+            try:
+                cursor.execute("SELECT COUNT(*) FROM json_each('[1]')")
+                cursor.fetchone()
+            except sqlite3.OperationalError:
+                supported = False
+        if not supported:
+            print(f"SQLite {sqlite3.sqlite_version} lacks UPDATE ... FROM or JSON1; reordering one row per statement")
+        _set_based_supported = supported
+    return _set_based_supported
+
+# ----- BULK REORDER ----- #
+def bulk_reorder(cursor, table, ordered_ids, parent_column=None, parent_id=None):
+    """Set display_order to each id's position in ordered_ids with one UPDATE.
+
+    When parent_column is given every id must belong to parent_id; otherwise
+    every id must exist. Raises ValueError before writing anything if not.
+    Rows left out of ordered_ids keep their display_order. On SQLite builds
+    without UPDATE ... FROM or JSON1 the rows are updated with executemany.
+    """
+    try:
+        ordered_ids = [int(row_id) for row_id in ordered_ids]
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {table} ids: {ordered_ids!r}")
+    if len(set(ordered_ids)) != len(ordered_ids):
+        raise ValueError(f"Duplicate {table} ids in ordering")
+    if not ordered_ids:
+        return 0
+
+    if not set_based_reorder_supported(cursor):
+        return _reorder_each(cursor, table, ordered_ids, parent_column, parent_id)
+
+    ids_json = json.dumps(ordered_ids)
+    parent_filter = f'AND {table}.{parent_column} = ?' if parent_column else ''
+    parent_params = (parent_id,) if parent_column else ()
+
+    cursor.execute(f'''
+        SELECT COUNT(*) FROM {table}
+        WHERE id IN (SELECT value FROM json_each(?)) {parent_filter}
+    ''', (ids_json, *parent_params))
+    if cursor.fetchone()[0] != len(ordered_ids):
+        _raise_foreign_ids(table, parent_column, parent_id)
+
+    # json_each yields each id with its array index as key
+    cursor.execute(f'''
+        UPDATE {table} SET display_order = positions.key
+        FROM json_each(?) AS positions
+        WHERE {table}.id = positions.value {parent_filter}
+    ''', (ids_json, *parent_params))
+    return cursor.rowcount
+
+def _reorder_each(cursor, table, ordered_ids, parent_column, parent_id):
+    if parent_column:
+        cursor.execute(f'SELECT id FROM {table} WHERE {parent_column} = ?', (parent_id,))
+    else:
+        cursor.execute(f'SELECT id FROM {table}')
+    if not set(ordered_ids) <= {row[0] for row in cursor.fetchall()}:
+        _raise_foreign_ids(table, parent_column, parent_id)
+
+    cursor.executemany(
+        f'UPDATE {table} SET display_order = ? WHERE id = ?',
+        list(enumerate(ordered_ids))
+    )
+    return len(ordered_ids)
+
+def _raise_foreign_ids(table, parent_column, parent_id):
+    owner = f" of {parent_column} {parent_id}" if parent_column else ""
+    raise ValueError(f"Ordering contains ids that are not {table} rows{owner}")
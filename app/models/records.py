@@ -0,0 +1,51 @@
+from flask_login import UserMixin
+from .database import verify_password
+
+# ----- ROW RECORDS ----- #
+# Plain __slots__ objects the models return for each row, instead of model
+# instances with a per-instance __dict__. Attributes not filled in are None.
+class Record:
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    def __repr__(self):
+        return f"<{type(self).__name__} id={getattr(self, 'id', None)}>"
+
+class Category(Record):
+    __slots__ = ('id', 'name', 'display_order', 'created_at')
+
+class Topic(Record):
+    __slots__ = (
+        'id', 'slug', 'title', 'description', 'category_id', 'category_name',
+        'is_published', 'user_id', 'card_color_light', 'card_color_dark',
+        'logo_filename_light', 'logo_filename_dark', 'logo_pending_light', 'logo_pending_dark',
+        'created_at', 'updated_at',
+        # filled in by loaders and search
+        'sections', 'rank', 'match_type'
+    )
+
+class Section(Record):
+    __slots__ = ('id', 'title', 'display_order', 'topic_id', 'items', 'rank')
+
+class Item(Record):
+    __slots__ = (
+        'id', 'title', 'markdown_content', 'display_order', 'card_size',
+        'bookmark_color', 'rendered_html', 'rendered_key', 'section_id',
+        'created_at', 'updated_at', 'snippet'
+    )
+
+class User(UserMixin):
+    # UserMixin has no __slots__, so instances still get a __dict__; the
+    # row fields themselves live in slots.
+    __slots__ = ('id', 'username', 'email', 'password_hash', 'is_admin', 'created_at')
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    # ----- CHECK PASSWORD ----- #
+    def check_password(self, password):
+        return verify_password(password, self.password_hash)
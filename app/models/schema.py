@@ -1,4 +1,5 @@
 from .database import db_connection
+from .migrations import Migrations, create_search_index, populate_search_index
 
 class Schema:
     @db_connection
@@ -41,6 +42,10 @@ class Schema:
                 card_color_dark TEXT DEFAULT '#1a1a1a',
                 logo_filename_light TEXT,
                 logo_filename_dark TEXT,
+                logo_pending_light TEXT,
+                logo_pending_dark TEXT,
+                logo_claimed_light TIMESTAMP,
+                logo_claimed_dark TIMESTAMP,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (user_id) REFERENCES user (id),
@@ -68,6 +73,8 @@ class Schema:
                 display_order INTEGER DEFAULT 0,
                 card_size TEXT DEFAULT 'normal',
                 bookmark_color TEXT DEFAULT '#3b82f6',  -- ADD THIS LINE (blue as default)
+                rendered_html TEXT,
+                rendered_key TEXT,
                 section_id INTEGER NOT NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -75,8 +82,17 @@ class Schema:
             )
         ''')
         
+        # ------------- FULL-TEXT SEARCH INDEX ------------- #
+        create_search_index(cursor)
+        
         print("Database tables created successfully!")
     
+    # ----- REBUILD SEARCH INDEX ----- #
+    @db_connection
+    def rebuild_search_index(self, cursor):
+        cursor.execute('DELETE FROM search_index')
+        populate_search_index(cursor)
+    
     # ----- CREATE ADMIN USER ----- #
     @db_connection
     def create_admin_user(self, cursor):
@@ -96,4 +112,5 @@ class Schema:
     # ----- INITIALIZE ENTIRE DB ----- #
     def init_db(self):
         self.create_tables()
+        Migrations().migrate()
         self.create_admin_user()
\ No newline at end of file
@@ -0,0 +1,362 @@
+import bisect
+import html
+import math
+import re
+import threading
+import unicodedata
+from flask import current_app
+from .database import db_connection, content_generation
+from .search_index import SearchResults, KIND_TOPIC, KIND_SECTION, KIND_ITEM
+
+# Title words count more than section titles, which count more than body text
+TOPIC_TITLE_WEIGHT = 3.0
+SECTION_TITLE_WEIGHT = 2.0
+ITEM_TITLE_WEIGHT = 1.5
+CONTENT_WEIGHT = 1.0
+
+# A query term also matches longer words it starts with, and words within
+# a small edit distance; both score lower than the exact word
+PREFIX_FACTOR = 0.8
+FUZZY_FACTOR = 0.5
+MAX_PREFIX_EXPANSIONS = 50
+
+SNIPPET_WORDS = 12
+
+# Term weights are kept in tenths, so the browser's copy of the index
+# (client_index.py) holds exactly the same weights and ranks the same
+WEIGHT_SCALE = 10
+
+# Only content of published topics is indexed, so drafts never take up
+# places among the best hits. Every query ends in a WHERE clause.
+PUBLISHED_ROWS = {
+    KIND_TOPIC: 'SELECT t.* FROM topic t WHERE t.is_published = 1',
+    KIND_SECTION: '''
+        SELECT s.* FROM section s JOIN topic t ON t.id = s.topic_id
+        WHERE t.is_published = 1
+    ''',
+    KIND_ITEM: '''
+        SELECT i.* FROM section_item i
+        JOIN section s ON s.id = i.section_id
+        JOIN topic t ON t.id = s.topic_id
+        WHERE t.is_published = 1
+    ''',
+}
+ROW_ALIASES = {KIND_TOPIC: 't', KIND_SECTION: 's', KIND_ITEM: 'i'}
+
+# Ids per IN (...) list, well under SQLite's bound-parameter limit
+ID_CHUNK_SIZE = 500
+
+WORD_RE = re.compile(r'\w+')
+
+def _chunks(ids, size=ID_CHUNK_SIZE):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+# ----- TOKENIZE ----- #
+def fold(text):
+    """Lowercase and strip accents, like the FTS5 unicode61 tokenizer."""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+def tokenize(text):
+    return WORD_RE.findall(fold(text or ''))
+
+def trigrams(term):
+    padded = f' {term} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def max_edits(term):
+    if len(term) < 4:
+        return 0
+    return 1 if len(term) < 8 else 2
+
+def edit_distance(a, b, limit):
+    """Edit distance counting a swap of neighbouring letters as one edit.
+
+    Returns limit + 1 as soon as the distance is certain to exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before_previous = None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            cost = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            )
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                cost = min(cost, before_previous[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before_previous, previous = previous, current
+    return previous[-1]
+
+# ----- INDEXED DOCUMENT ----- #
+class Document:
+    __slots__ = ('kind', 'id', 'parent', 'title', 'weights', 'text')
+
+    def __init__(self, kind, id, fields, parent=None, title=None, text=None):
+        self.kind = kind
+        self.id = id
+        # Topic of a section, section of an item
+        self.parent = parent
+        self.title = title
+        self.text = text
+        # term -> weighted, log-damped term frequency over all fields
+        counts = {}
+        for field_text, weight in fields:
+            for term in tokenize(field_text):
+                counts.setdefault(term, {})
+                counts[term][weight] = counts[term].get(weight, 0) + 1
+        self.weights = {
+            term: round(sum(weight * (1 + math.log(count)) for weight, count in by_weight.items()) * WEIGHT_SCALE) / WEIGHT_SCALE
+            for term, by_weight in counts.items()
+        }
+
+# ----- SEARCH ENGINE ----- #
+class SearchEngine:
+    """In-memory inverted index over published topic, section and item text.
+
+    Built once from the database, then kept current from search_changes,
+    which triggers fill on every insert, update and delete of an indexed
+    column, and whenever a topic is (un)published or a row moves to another
+    parent. Matching is per document: every query term has to match one of
+    its words exactly, as a prefix, or within max_edits() edits.
+    """
+    def __init__(self):
+        self.documents = {}
+        self.postings = {}
+        self.trigram_terms = {}
+        self.last_seq = None
+        # Content generation the index was last brought up to date for
+        self.generation = None
+        self._sorted_terms = None
+        self._lock = threading.Lock()
+
+    # ----- BUILD ----- #
+    @db_connection
+    def build(self, cursor):
+        if not cursor.connection.in_transaction:
+            cursor.execute('BEGIN')
+        cursor.execute('SELECT COALESCE(MAX(seq), 0) FROM search_changes')
+        last_seq = cursor.fetchone()[0]
+
+        self.documents = {}
+        self.postings = {}
+        self.trigram_terms = {}
+        self._sorted_terms = None
+        for kind, sql in PUBLISHED_ROWS.items():
+            cursor.execute(sql)
+            for row in cursor.fetchall():
+                self._add(self._document(kind, row))
+        self.last_seq = last_seq
+
+    # ----- APPLY LOGGED CHANGES ----- #
+    @db_connection
+    def sync(self, cursor):
+        cursor.execute('SELECT MIN(seq) FROM search_changes')
+        oldest = cursor.fetchone()[0]
+        if self.last_seq is None or (oldest is not None and oldest > self.last_seq + 1):
+            # Older changes were pruned before this process saw them
+            self.build()
+            return
+
+        cursor.execute(
+            'SELECT seq, kind, ref_id FROM search_changes WHERE seq > ? ORDER BY seq',
+            (self.last_seq,)
+        )
+        changes = cursor.fetchall()
+        changed = {kind: set() for kind in PUBLISHED_ROWS}
+        for change in changes:
+            changed[change['kind']].add(change['ref_id'])
+
+        # Publishing, unpublishing or moving a topic or section decides
+        # whether everything under it is indexed, so re-read that too
+        changed[KIND_SECTION] |= self._child_ids(cursor, 'section', 'topic_id', changed[KIND_TOPIC])
+        changed[KIND_ITEM] |= self._child_ids(cursor, 'section_item', 'section_id', changed[KIND_SECTION])
+
+        for kind, ref_ids in changed.items():
+            for ref_id in ref_ids:
+                self._remove((kind, ref_id))
+            for chunk in _chunks(sorted(ref_ids)):
+                placeholders = ','.join(['?'] * len(chunk))
+                cursor.execute(f'{PUBLISHED_ROWS[kind]} AND {ROW_ALIASES[kind]}.id IN ({placeholders})', chunk)
+                for row in cursor.fetchall():
+                    self._add(self._document(kind, row))
+
+        if changes:
+            self.last_seq = changes[-1]['seq']
+
+    def _child_ids(self, cursor, table, parent_column, parent_ids):
+        child_ids = set()
+        for chunk in _chunks(sorted(parent_ids)):
+            placeholders = ','.join(['?'] * len(chunk))
+            cursor.execute(f'SELECT id FROM {table} WHERE {parent_column} IN ({placeholders})', chunk)
+            child_ids.update(row['id'] for row in cursor.fetchall())
+        return child_ids
+
+    # ----- SEARCH ----- #
+    def search(self, query):
+        """Return every published topic for query, best match first.
+
+        Same SearchResults as SearchIndexModel.search. Drafts are not
+        indexed, so every hit belongs to a published topic.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return SearchResults([])
+
+        # Compared with the generation itself, like get_snapshot(), rather than
+        # waiting for the invalidation bus: a request can see a new generation
+        # before the bus has run its callbacks, and would cache stale hits
+        generation = content_generation()
+        with self._lock:
+            if self.last_seq is None:
+                self.build()
+            elif self.generation != generation:
+                self.sync()
+            self.generation = generation
+            scores, matched_terms = self._score(terms)
+
+            hits = []
+            texts = {}
+            for (kind, ref_id), score in scores.items():
+                topic = self._topic_of(self.documents[(kind, ref_id)])
+                if topic is None:
+                    continue
+                hits.append((kind, ref_id, -score, topic.id, topic.title))
+                if kind == KIND_ITEM:
+                    texts[ref_id] = self.documents[(kind, ref_id)].text
+
+        # Snippets are only made for the items on the page being shown
+        return SearchResults(hits, lambda item_ids: {
+            item_id: self._snippet(texts[item_id], matched_terms) for item_id in item_ids
+        })
+
+    def _topic_of(self, document):
+        while document is not None and document.kind != KIND_TOPIC:
+            parent_kind = KIND_TOPIC if document.kind == KIND_SECTION else KIND_SECTION
+            document = self.documents.get((parent_kind, document.parent))
+        return document
+
+    def _score(self, terms):
+        scores = None
+        matched_terms = set()
+        total = len(self.documents) or 1
+        for term in terms:
+            term_scores = {}
+            for candidate, factor in self._expand(term):
+                docs = self.postings[candidate]
+                matched_terms.add(candidate)
+                idf = math.log(1 + total / len(docs))
+                for key, weight in docs.items():
+                    score = factor * idf * weight
+                    if score > term_scores.get(key, 0.0):
+                        term_scores[key] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {key: score + term_scores[key] for key, score in scores.items() if key in term_scores}
+            if not scores:
+                return {}, matched_terms
+        return scores, matched_terms
+
+    def _expand(self, term):
+        """Yield (indexed term, score factor) pairs a query term matches."""
+        if term in self.postings:
+            yield term, 1.0
+
+        sorted_terms = self._vocabulary()
+        start = bisect.bisect_right(sorted_terms, term)
+        for candidate in sorted_terms[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not candidate.startswith(term):
+                break
+            yield candidate, PREFIX_FACTOR
+
+        limit = max_edits(term)
+        if not limit:
+            return
+        # One edit changes at most four of a word's trigrams (a swap does)
+        grams = trigrams(term)
+        shared = {}
+        for gram in grams:
+            for candidate in self.trigram_terms.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        needed = max(1, len(grams) - 4 * limit)
+        for candidate, count in shared.items():
+            if count < needed or candidate.startswith(term):
+                continue
+            distance = edit_distance(term, candidate, limit)
+            if distance <= limit:
+                yield candidate, FUZZY_FACTOR / distance
+
+    # ----- SNIPPET ----- #
+    def _snippet(self, text, matched_terms):
+        words = (text or '').split()
+        for position, word in enumerate(words):
+            if any(token in matched_terms for token in tokenize(word)):
+                break
+        else:
+            return None
+
+        start = max(0, position - SNIPPET_WORDS // 2)
+        window = words[start:start + SNIPPET_WORDS]
+        marked = [
+            f'<mark>{html.escape(word)}</mark>' if any(token in matched_terms for token in tokenize(word))
+            else html.escape(word)
+            for word in window
+        ]
+        prefix = '…' if start > 0 else ''
+        suffix = '…' if start + SNIPPET_WORDS < len(words) else ''
+        return prefix + ' '.join(marked) + suffix
+
+    # ----- INDEX MAINTENANCE ----- #
+    def _document(self, kind, row):
+        if kind == KIND_TOPIC:
+            fields = [(row['title'], TOPIC_TITLE_WEIGHT), (row['description'], CONTENT_WEIGHT)]
+            return Document(kind, row['id'], fields, title=row['title'])
+        if kind == KIND_SECTION:
+            return Document(kind, row['id'], [(row['title'], SECTION_TITLE_WEIGHT)], parent=row['topic_id'])
+        fields = [(row['title'], ITEM_TITLE_WEIGHT), (row['markdown_content'], CONTENT_WEIGHT)]
+        return Document(kind, row['id'], fields, parent=row['section_id'], text=row['markdown_content'])
+
+    def _add(self, document):
+        key = (document.kind, document.id)
+        self.documents[key] = document
+        for term, weight in document.weights.items():
+            if term not in self.postings:
+                self.postings[term] = {}
+                for gram in trigrams(term):
+                    self.trigram_terms.setdefault(gram, set()).add(term)
+                self._sorted_terms = None
+            self.postings[term][key] = weight
+
+    def _remove(self, key):
+        document = self.documents.pop(key, None)
+        if document is None:
+            return
+        for term in document.weights:
+            docs = self.postings.get(term)
+            if docs is None:
+                continue
+            docs.pop(key, None)
+            if not docs:
+                del self.postings[term]
+                for gram in trigrams(term):
+                    self.trigram_terms[gram].discard(term)
+                self._sorted_terms = None
+
+    def _vocabulary(self):
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self.postings)
+        return self._sorted_terms
+
+def init_app(app):
+    app.extensions['search_engine'] = SearchEngine()
+
+def get_search_engine():
+    return current_app.extensions['search_engine']
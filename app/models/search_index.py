@@ -0,0 +1,204 @@
+import html
+import re
+from .database import db_connection
+from .topic import TopicModel
+from .section import SectionModel
+from .section_item import SectionItemModel
+
+# search_index rowids are source_id * 4 + kind
+KIND_TOPIC = 1
+KIND_SECTION = 2
+KIND_ITEM = 3
+
+# Placeholders FTS5 wraps around matched terms; swapped for <mark> after escaping
+HIGHLIGHT_OPEN = '\x02'
+HIGHLIGHT_CLOSE = '\x03'
+
+class SearchIndexModel:
+    # ----- SEARCH ----- #
+    @db_connection
+    def search(self, cursor, query):
+        """Return every published topic matching query, best BM25 rank first.
+
+        The result is a SearchResults; see resolve() for the shape of the
+        topics on each page.
+        """
+        match_expression = self._match_expression(query)
+        if not match_expression:
+            return SearchResults([])
+
+        # Hits are joined up to their topic so drafts are dropped here; the
+        # whole ranked list is kept so pages never run out before the matches do
+        cursor.execute('''
+            SELECT hit.kind, hit.ref_id, hit.rank, t.id AS topic_id, t.title AS topic_title
+            FROM (
+                SELECT rowid / 4 AS ref_id, rowid % 4 AS kind,
+                    bm25(search_index, 10.0, 1.0) AS rank
+                FROM search_index
+                WHERE search_index MATCH ?
+            ) AS hit
+            LEFT JOIN section_item i ON hit.kind = 3 AND i.id = hit.ref_id
+            LEFT JOIN section s ON s.id = CASE hit.kind WHEN 2 THEN hit.ref_id ELSE i.section_id END
+            JOIN topic t ON t.id = CASE hit.kind WHEN 1 THEN hit.ref_id ELSE s.topic_id END
+            WHERE t.is_published = 1
+        ''', (match_expression,))
+
+        hits = [tuple(hit) for hit in cursor.fetchall()]
+        return SearchResults(hits, lambda item_ids: self.snippets(match_expression, item_ids))
+
+    # ----- SNIPPETS FOR ONE PAGE OF ITEMS ----- #
+    @db_connection
+    def snippets(self, cursor, match_expression, item_ids):
+        rows = self._fetch_rows(cursor, '''
+            SELECT rowid / 4 AS ref_id, snippet(search_index, 1, char(2), char(3), '…', 12) AS snippet
+            FROM search_index
+            WHERE search_index MATCH ? AND rowid IN ({})
+        ''', [item_id * 4 + KIND_ITEM for item_id in item_ids], (match_expression,))
+        return {row['ref_id']: self._highlight(row['snippet']) for row in rows}
+
+    # ----- TURN HITS INTO TOPIC TREES ----- #
+    @db_connection
+    def resolve(self, cursor, topic_ranks, section_ranks, item_hits):
+        """Build search results from hits; lower rank is better.
+
+        topic_ranks and section_ranks map ids to ranks, item_hits maps item
+        ids to (rank, snippet HTML). Hits outside published topics are dropped.
+        """
+        return self._resolve(cursor, topic_ranks, section_ranks, item_hits)
+
+    def _resolve(self, cursor, topic_ranks, section_ranks, item_hits):
+        if not (topic_ranks or section_ranks or item_hits):
+            return []
+
+        # Resolve hits to rows, walking up item -> section -> topic
+        item_model = SectionItemModel()
+        items = self._fetch_rows(cursor, 'SELECT * FROM section_item WHERE id IN ({})', item_hits)
+        items = [item_model._dict_to_item(item) for item in items]
+
+        section_model = SectionModel()
+        section_ids = set(section_ranks) | {item.section_id for item in items}
+        sections = self._fetch_rows(cursor, 'SELECT * FROM section WHERE id IN ({})', section_ids)
+        sections = {section['id']: section_model._dict_to_section(section) for section in sections}
+
+        topic_model = TopicModel()
+        topic_ids = set(topic_ranks) | {section.topic_id for section in sections.values()}
+        topics = self._fetch_rows(cursor, '''
+            SELECT t.*, c.name as category_name
+            FROM topic t
+            LEFT JOIN category c ON t.category_id = c.id
+            WHERE t.is_published = 1 AND t.id IN ({})
+        ''', topic_ids)
+        topics = {topic['id']: topic_model._dict_to_topic(topic) for topic in topics}
+
+        for topic in topics.values():
+            topic.rank = topic_ranks.get(topic.id, 0.0)
+            topic.match_type = 'topic' if topic.id in topic_ranks else 'content'
+
+        # Topic matches show everything they contain
+        topic_model._attach_sections(cursor, [t for t in topics.values() if t.match_type == 'topic'])
+
+        # Content matches show only the matching sections and items
+        for section in sections.values():
+            section.items = []
+            section.rank = section_ranks.get(section.id, 0.0)
+        for item in items:
+            rank, item.snippet = item_hits[item.id]
+            section = sections.get(item.section_id)
+            if section:
+                section.items.append(item)
+                section.rank = min(section.rank, rank)
+
+        for topic in topics.values():
+            if topic.match_type == 'content':
+                topic.sections = []
+        for section in sorted(sections.values(), key=lambda s: (s.display_order, s.id)):
+            topic = topics.get(section.topic_id)
+            if not topic:
+                continue
+            topic.rank = min(topic.rank, section.rank)
+            if topic.match_type == 'content':
+                section.items.sort(key=lambda i: (i.display_order, i.id))
+                topic.sections.append(section)
+
+        # Carry item snippets over to topic matches, too
+        snippets = {item.id: item.snippet for item in items}
+        for topic in topics.values():
+            if topic.match_type == 'topic':
+                for section in topic.sections:
+                    for item in section.items:
+                        item.snippet = snippets.get(item.id)
+
+        return sorted(topics.values(), key=lambda t: (t.rank, t.title))
+
+    # ----- NORMALIZE QUERY ----- #
+    def normalize_query(self, query):
+        """Queries that normalize to the same string return the same results."""
+        return ' '.join(re.findall(r'\w+', query.lower()))
+
+    # ----- BUILD FTS5 MATCH EXPRESSION ----- #
+    def _match_expression(self, query):
+        # Every word must match; the last-typed word is usually incomplete,
+        # so each term is a prefix query.
+        terms = self.normalize_query(query).split()
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    # ----- ESCAPE SNIPPET AND MARK MATCHES ----- #
+    def _highlight(self, text):
+        if not text:
+            return None
+        return html.escape(text).replace(HIGHLIGHT_OPEN, '<mark>').replace(HIGHLIGHT_CLOSE, '</mark>')
+
+    def _fetch_rows(self, cursor, sql, ids, params=()):
+        ids = list(ids)
+        if not ids:
+            return []
+        cursor.execute(sql.format(','.join(['?'] * len(ids))), (*params, *ids))
+        return cursor.fetchall()
+
+# ----- RANKED RESULTS ----- #
+class SearchResults:
+    """Every published topic matching a query, best first.
+
+    Built from hits, (kind, ref_id, rank, topic_id, topic_title) tuples with
+    lower ranks better. Ordering the topics needs nothing else; their trees
+    and snippets are only loaded for the page asked for. snippets takes item
+    ids and returns their snippet HTML by id.
+    """
+    def __init__(self, hits, snippets=None):
+        self._snippets = snippets
+        self._hits = {}
+        ranks = {}
+        titles = {}
+        for kind, ref_id, rank, topic_id, topic_title in hits:
+            self._hits.setdefault(topic_id, []).append((kind, ref_id, rank))
+            # Same rule as resolve(): a topic ranks as its best hit
+            ranks[topic_id] = min(ranks.get(topic_id, 0.0), rank)
+            titles[topic_id] = topic_title
+        self.topic_ids = sorted(ranks, key=lambda topic_id: (ranks[topic_id], titles[topic_id]))
+        self._pages = {}
+
+    def __len__(self):
+        return len(self.topic_ids)
+
+    def page(self, offset, limit):
+        key = (offset, limit)
+        if key not in self._pages:
+            self._pages[key] = self._resolve_page(self.topic_ids[offset:offset + limit])
+        return self._pages[key]
+
+    def _resolve_page(self, topic_ids):
+        topic_ranks = {}
+        section_ranks = {}
+        item_ranks = {}
+        for topic_id in topic_ids:
+            for kind, ref_id, rank in self._hits[topic_id]:
+                if kind == KIND_TOPIC:
+                    topic_ranks[ref_id] = rank
+                elif kind == KIND_SECTION:
+                    section_ranks[ref_id] = rank
+                else:
+                    item_ranks[ref_id] = rank
+
+        snippets = self._snippets(list(item_ranks)) if item_ranks else {}
+        item_hits = {item_id: (rank, snippets.get(item_id)) for item_id, rank in item_ranks.items()}
+        return SearchIndexModel().resolve(topic_ranks, section_ranks, item_hits)
@@ -1,4 +1,6 @@
 from .database import db_connection
+from .ordering import bulk_reorder
+from .records import Section
 
 class SectionModel:
     # ----- BY TOPIC ----- #
@@ -88,11 +90,21 @@ class SectionModel:
             print(f"Error deleting section: {e}")
             return False
         
+    # ----- REORDER SECTIONS ----- #
+    @db_connection
+    def reorder_sections(self, cursor, topic_id, section_order):
+        if bulk_reorder(cursor, 'section', section_order, 'topic_id', topic_id):
+            cursor.execute(
+                'UPDATE topic SET updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+                (topic_id,)
+            )
+        return True
+        
     # ----- CONVERT DB ROW TO SECTION OBJECT ----- #
     def _dict_to_section(self, section_data):
-        section = SectionModel()
-        section.id = section_data['id']
-        section.title = section_data['title']
-        section.display_order = section_data['display_order']
-        section.topic_id = section_data['topic_id']
-        return section
\ No newline at end of file
+        return Section(
+            id=section_data['id'],
+            title=section_data['title'],
+            display_order=section_data['display_order'],
+            topic_id=section_data['topic_id']
+        )
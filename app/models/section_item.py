@@ -1,4 +1,7 @@
 from .database import db_connection
+from .ordering import bulk_reorder
+from .records import Item
+from app.utils.markdown_render import render_markdown, render_many, render_key
 
 class SectionItemModel:
     # ----- BY SECTION ----- #
@@ -26,9 +29,10 @@ class SectionItemModel:
     @db_connection
     def create_item(self, cursor, title, section_id, markdown_content="", display_order=0, card_size='normal', bookmark_color='#3b82f6'):
         cursor.execute(
-            'INSERT INTO section_item (title, markdown_content, display_order, card_size, bookmark_color, section_id) VALUES (?, ?, ?, ?, ?, ?)',
-            (title, markdown_content, display_order, card_size, bookmark_color, section_id)
+            'INSERT INTO section_item (title, markdown_content, display_order, card_size, bookmark_color, rendered_html, rendered_key, section_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (title, markdown_content, display_order, card_size, bookmark_color, render_markdown(markdown_content), render_key(markdown_content), section_id)
         )
+        item_id = cursor.lastrowid
         
         # Update topic timestamp via section in a single query
         cursor.execute('''
@@ -36,14 +40,14 @@ class SectionItemModel:
             WHERE id = (SELECT topic_id FROM section WHERE id = ?)
         ''', (section_id,))
         
-        return cursor.lastrowid
+        return item_id
     
     # ----- UPDATE ITEM ----- #
     @db_connection
     def update_item(self, cursor, item_id, title, markdown_content, display_order, card_size='normal', bookmark_color='#3b82f6'):
         cursor.execute(
-            'UPDATE section_item SET title = ?, markdown_content = ?, display_order = ?, card_size = ?, bookmark_color = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
-            (title, markdown_content, display_order, card_size, bookmark_color, item_id)
+            'UPDATE section_item SET title = ?, markdown_content = ?, display_order = ?, card_size = ?, bookmark_color = ?, rendered_html = ?, rendered_key = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+            (title, markdown_content, display_order, card_size, bookmark_color, render_markdown(markdown_content), render_key(markdown_content), item_id)
         )
         
         # Update topic timestamp via section
@@ -76,27 +80,58 @@ class SectionItemModel:
         
         return True
     
-    # ----- CONVERT DB ROW TO SECTION OBJECT ----- #
-    def _dict_to_item(self, item_data):
-        item = SectionItemModel()
-        item.id = item_data['id']
-        item.title = item_data['title']
-        item.markdown_content = item_data['markdown_content']
-        item.display_order = item_data['display_order']
-        
-        # Handle card_size
-        try:
-            item.card_size = item_data['card_size']
-        except (KeyError, AttributeError):
-            item.card_size = 'normal'
+    # ----- REORDER ITEMS ----- #
+    @db_connection
+    def reorder_items(self, cursor, section_id, item_order):
+        if bulk_reorder(cursor, 'section_item', item_order, 'section_id', section_id):
+            cursor.execute('''
+                UPDATE topic SET updated_at = CURRENT_TIMESTAMP 
+                WHERE id = (SELECT topic_id FROM section WHERE id = ?)
+            ''', (section_id,))
+        return True
+    
+    # ----- RE-RENDER STORED HTML ----- #
+    @db_connection
+    def rerender_all(self, cursor, force=False, topic_id=None, workers=None):
+        """Refresh rendered_html for items whose key is stale; returns the count.
+
+        Limit to one topic with topic_id. Large batches render in a process pool.
+        """
+        if topic_id is None:
+            cursor.execute('SELECT id, markdown_content, rendered_key FROM section_item')
+        else:
+            cursor.execute('''
+                SELECT i.id, i.markdown_content, i.rendered_key
+                FROM section_item i
+                JOIN section s ON i.section_id = s.id
+                WHERE s.topic_id = ?
+            ''', (topic_id,))
         
-        # Handle bookmark_color
-        try:
-            item.bookmark_color = item_data['bookmark_color']
-        except (KeyError, AttributeError):
-            item.bookmark_color = '#3b82f6'
+        stale = []
+        for item_data in cursor.fetchall():
+            key = render_key(item_data['markdown_content'])
+            if force or item_data['rendered_key'] != key:
+                stale.append((item_data['id'], item_data['markdown_content'], key))
         
-        item.section_id = item_data['section_id']
-        item.created_at = item_data['created_at']
-        item.updated_at = item_data['updated_at']
-        return item
\ No newline at end of file
+        rendered = render_many([content for _, content, _ in stale], workers=workers)
+        cursor.executemany(
+            'UPDATE section_item SET rendered_html = ?, rendered_key = ? WHERE id = ?',
+            [(html, key, item_id) for (item_id, _, key), html in zip(stale, rendered)]
+        )
+        return len(stale)
+    
+    # ----- CONVERT DB ROW TO SECTION OBJECT ----- #
+    def _dict_to_item(self, item_data):
+        return Item(
+            id=item_data['id'],
+            title=item_data['title'],
+            markdown_content=item_data['markdown_content'],
+            display_order=item_data['display_order'],
+            card_size=item_data['card_size'] or 'normal',
+            bookmark_color=item_data['bookmark_color'] or '#3b82f6',
+            rendered_html=item_data['rendered_html'],
+            rendered_key=item_data['rendered_key'],
+            section_id=item_data['section_id'],
+            created_at=item_data['created_at'],
+            updated_at=item_data['updated_at']
+        )
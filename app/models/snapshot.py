@@ -0,0 +1,157 @@
+import hashlib
+import json
+import threading
+from types import MappingProxyType
+from flask import current_app
+from .database import db_connection, content_generation, _read_content_version
+from .topic import TopicModel
+from app.utils import invalidation
+
+RECENT_TOPICS_LIMIT = 4
+
+SIDEBAR_VERSION_LENGTH = 16
+
+# ----- SIDEBAR INDEX ----- #
+def build_sidebar_index(categorized_topics):
+    """JSON for the search sidebar and a hash of it, as (version, bytes).
+
+    The version only changes when the listed topics do, so clients keep
+    their copy across edits to sections and items.
+    """
+    topics = [
+        {
+            'id': topic.id,
+            'slug': topic.slug,
+            'title': topic.title,
+            'description': topic.description,
+            'category': category_name
+        }
+        for category_name, category_data in categorized_topics.items()
+        for topic in category_data['topics']
+    ]
+    topics_json = json.dumps(topics, separators=(',', ':'))
+    version = hashlib.sha256(topics_json.encode()).hexdigest()[:SIDEBAR_VERSION_LENGTH]
+    return version, f'{{"version":"{version}","topics":{topics_json}}}'.encode()
+
+# ----- CONTENT SNAPSHOT ----- #
+class ContentSnapshot:
+    """Published category -> topic -> section -> item tree at one content version.
+
+    Built once and never changed afterwards: collections are tuples and
+    read-only mappings, so every request thread can share the same object.
+    """
+    __slots__ = ('version', 'changed_at', 'categorized_topics', 'topics', 'topics_by_id', 'topics_by_slug', 'recent_topics',
+                 'sidebar_version', 'sidebar_index')
+
+    def __init__(self, version, categorized_topics, topics, recent_topics, changed_at=None):
+        self.version = version
+        # When any content last changed, as a CURRENT_TIMESTAMP string
+        self.changed_at = changed_at
+        self.categorized_topics = categorized_topics
+        self.topics = topics
+        self.topics_by_id = MappingProxyType({topic.id: topic for topic in topics})
+        self.topics_by_slug = MappingProxyType({topic.slug: topic for topic in topics})
+        self.recent_topics = recent_topics
+        self.sidebar_version, self.sidebar_index = build_sidebar_index(categorized_topics)
+
+class SnapshotModel:
+    # ----- BUILD SNAPSHOT ----- #
+    @db_connection
+    def build(self, cursor):
+        # One read transaction, so the version and every row come from the
+        # same database state even if an admin commits halfway through
+        if not cursor.connection.in_transaction:
+            cursor.execute('BEGIN')
+        version = _read_content_version(cursor.connection)
+        cursor.execute('SELECT changed_at FROM content_version WHERE id = 1')
+        row = cursor.fetchone()
+        changed_at = row['changed_at'] if row else None
+
+        topic_model = TopicModel()
+        cursor.execute('''
+            SELECT t.*, c.name as category_name
+            FROM topic t
+            LEFT JOIN category c ON t.category_id = c.id
+            WHERE t.is_published = 1
+            ORDER BY t.display_order, t.title
+        ''')
+        topics = [topic_model._dict_to_topic(topic) for topic in cursor.fetchall()]
+        topic_model._attach_sections(cursor, topics)
+        for topic in topics:
+            for section in topic.sections:
+                section.items = tuple(section.items)
+            topic.sections = tuple(topic.sections)
+
+        topics_by_category = {}
+        for topic in topics:
+            topics_by_category.setdefault(topic.category_id, []).append(topic)
+
+        # Same shape as CategoryModel.get_topics_by_category
+        cursor.execute('SELECT * FROM category ORDER BY display_order, name')
+        categorized_topics = {}
+        for category in cursor.fetchall():
+            categorized_topics[category['name']] = MappingProxyType({
+                'topics': tuple(topics_by_category.get(category['id'], ())),
+                'display_order': category['display_order'],
+                'id': category['id']
+            })
+        categorized_topics = dict(sorted(categorized_topics.items(), key=lambda x: x[1]['display_order']))
+
+        # The footer lists unpublished topics too
+        cursor.execute('''
+            SELECT t.*, c.name as category_name
+            FROM topic t
+            LEFT JOIN category c ON t.category_id = c.id
+            ORDER BY t.updated_at DESC
+            LIMIT ?
+        ''', (RECENT_TOPICS_LIMIT,))
+        recent_topics = tuple(topic_model._dict_to_topic(topic) for topic in cursor.fetchall())
+
+        return ContentSnapshot(
+            version,
+            MappingProxyType(categorized_topics),
+            tuple(sorted(topics, key=lambda t: t.title)),
+            recent_topics,
+            changed_at
+        )
+
+# ----- CURRENT SNAPSHOT ----- #
+class _SnapshotSlot:
+    def __init__(self):
+        self.snapshot = None
+        self.lock = threading.Lock()
+
+    def invalidate(self, version):
+        # Drop the old tree now instead of keeping it until the next read
+        snapshot = self.snapshot
+        if snapshot is not None and snapshot.version < version:
+            self.snapshot = None
+
+def init_app(app):
+    slot = _SnapshotSlot()
+    app.extensions['content_snapshot'] = slot
+    invalidation.register(slot.invalidate, app)
+    app.add_template_global(sidebar_index_version, 'sidebar_index_version')
+
+def sidebar_index_version():
+    return get_snapshot().sidebar_version
+
+def get_snapshot():
+    """Return the snapshot for the current content version, rebuilding it if stale.
+
+    Only one thread rebuilds; the new snapshot replaces the old one with a
+    single reference assignment, so readers see either the old tree or the
+    new one, never a partial one.
+    """
+    slot = current_app.extensions['content_snapshot']
+    generation = content_generation()
+    snapshot = slot.snapshot
+    if snapshot is not None and snapshot.version >= generation:
+        return snapshot
+
+    with slot.lock:
+        snapshot = slot.snapshot
+        if snapshot is None or snapshot.version < generation:
+            snapshot = SnapshotModel().build()
+            slot.snapshot = snapshot
+    return snapshot
@@ -1,4 +1,12 @@
+import sqlite3
 from .database import db_connection
+from .ordering import bulk_reorder
+from .records import Topic
+from .section import SectionModel
+from .section_item import SectionItemModel
+
+# UPDATE ... RETURNING needs SQLite 3.35
+RETURNING_MIN_VERSION = (3, 35, 0)
 
 class TopicModel:
     # ----- ALL PUBLISHED ----- #
@@ -30,6 +38,42 @@ class TopicModel:
         
         return self._dict_to_topic(topic_data)
     
+    # ----- BY SLUG WITH SECTIONS AND ITEMS ----- #
+    @db_connection
+    def get_tree_by_slug(self, cursor, slug):
+        cursor.execute('''
+            SELECT t.*, c.name as category_name 
+            FROM topic t
+            LEFT JOIN category c ON t.category_id = c.id
+            WHERE t.slug = ? AND t.is_published = 1
+        ''', (slug,))
+        topic_data = cursor.fetchone()
+        
+        if not topic_data:
+            return None
+        
+        topic = self._dict_to_topic(topic_data)
+        self._attach_sections(cursor, [topic])
+        return topic
+    
+    # ----- BY ID WITH SECTIONS AND ITEMS ----- #
+    @db_connection
+    def get_tree_by_id(self, cursor, topic_id):
+        cursor.execute('''
+            SELECT t.*, c.name as category_name 
+            FROM topic t
+            LEFT JOIN category c ON t.category_id = c.id
+            WHERE t.id = ?
+        ''', (topic_id,))
+        topic_data = cursor.fetchone()
+        
+        if not topic_data:
+            return None
+        
+        topic = self._dict_to_topic(topic_data)
+        self._attach_sections(cursor, [topic])
+        return topic
+    
     # ----- ALL ----- #
     @db_connection
     def get_all(self, cursor):
@@ -42,6 +86,19 @@ class TopicModel:
         topics_data = cursor.fetchall()
         return [self._dict_to_topic(topic) for topic in topics_data]
 
+    # ----- RECENTLY UPDATED ----- #
+    @db_connection
+    def get_recently_updated(self, cursor, limit=4):
+        cursor.execute('''
+            SELECT t.*, c.name as category_name 
+            FROM topic t
+            LEFT JOIN category c ON t.category_id = c.id
+            ORDER BY t.updated_at DESC
+            LIMIT ?
+        ''', (limit,))
+        topics_data = cursor.fetchall()
+        return [self._dict_to_topic(topic) for topic in topics_data]
+
     # ----- ALL GROUPED BY CATEGORY ----- #
     @db_connection
     def get_all_grouped_by_category(self, cursor):
@@ -142,6 +199,12 @@ class TopicModel:
             print(f"Error deleting topic: {e}")
             return False
         
+    # ----- REORDER TOPICS IN CATEGORY ----- #
+    @db_connection
+    def reorder_topics(self, cursor, category_id, topic_order):
+        bulk_reorder(cursor, 'topic', topic_order, 'category_id', category_id)
+        return True
+    
     # ----- REFRESH TOPIC TIMESTAMP ----- #
     @db_connection
     def refresh_updated_at(self, cursor, topic_id):
@@ -155,6 +218,113 @@ class TopicModel:
             print(f"Error refreshing topic timestamp: {e}")
             return False
     
+    # ----- QUEUE A STAGED LOGO ----- #
+    @db_connection
+    def set_logo_pending(self, cursor, topic_id, theme, staged_filename):
+        """Mark staged_filename as the pending upload, claimed by this process."""
+        theme = self._logo_theme(theme)
+        cursor.execute(
+            f'UPDATE topic SET logo_pending_{theme} = ?, logo_claimed_{theme} = CURRENT_TIMESTAMP WHERE id = ?',
+            (staged_filename, topic_id)
+        )
+        return cursor.rowcount > 0
+    
+    # ----- CLAIM UNPROCESSED LOGOS ----- #
+    @db_connection
+    def claim_pending_logos(self, cursor, claim_timeout):
+        """Claim pending uploads no live worker is processing.
+        
+        Unclaimed uploads and claims older than claim_timeout seconds (their
+        worker died) are claimed in one statement per theme, so when every
+        worker resumes at once each upload goes to exactly one of them.
+        Returns (topic_id, theme, staged filename) tuples.
+        """
+        claimed = []
+        for theme in ('light', 'dark'):
+            condition = f'''
+                logo_pending_{theme} IS NOT NULL
+                AND (logo_claimed_{theme} IS NULL OR logo_claimed_{theme} < datetime('now', ?))
+            '''
+            params = (f'-{int(claim_timeout)} seconds',)
+            if sqlite3.sqlite_version_info >= RETURNING_MIN_VERSION:
+                cursor.execute(f'''
+                    UPDATE topic SET logo_claimed_{theme} = CURRENT_TIMESTAMP
+                    WHERE {condition}
+                    RETURNING id, logo_pending_{theme} AS pending
+                ''', params)
+                rows = cursor.fetchall()
+            else:
+                # Take the write lock first so no other worker reads the same rows
+                if not cursor.connection.in_transaction:
+                    cursor.execute('BEGIN IMMEDIATE')
+                cursor.execute(f'SELECT id, logo_pending_{theme} AS pending FROM topic WHERE {condition}', params)
+                rows = cursor.fetchall()
+                cursor.executemany(
+                    f'UPDATE topic SET logo_claimed_{theme} = CURRENT_TIMESTAMP WHERE id = ?',
+                    [(row['id'],) for row in rows]
+                )
+            claimed.extend((row['id'], theme, row['pending']) for row in rows)
+        return claimed
+    
+    # ----- RECORD A PROCESSED LOGO ----- #
+    @db_connection
+    def finish_logo(self, cursor, topic_id, theme, staged_filename, logo_filename):
+        """Swap in a processed logo if staged_filename is still the pending upload.
+        
+        Returns (applied, previous logo filename). A None logo_filename means
+        processing failed: the pending upload is dropped and the logo kept.
+        """
+        theme = self._logo_theme(theme)
+        cursor.execute(
+            f'SELECT logo_filename_{theme} AS logo, logo_pending_{theme} AS pending FROM topic WHERE id = ?',
+            (topic_id,)
+        )
+        row = cursor.fetchone()
+        if not row or row['pending'] != staged_filename:
+            # Topic deleted, or a newer upload replaced this one
+            return False, None
+        
+        if logo_filename:
+            cursor.execute(
+                f'UPDATE topic SET logo_filename_{theme} = ?, logo_pending_{theme} = NULL, logo_claimed_{theme} = NULL, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+                (logo_filename, topic_id)
+            )
+        else:
+            cursor.execute(f'UPDATE topic SET logo_pending_{theme} = NULL, logo_claimed_{theme} = NULL WHERE id = ?', (topic_id,))
+        return bool(logo_filename), row['logo']
+    
+    # ----- PENDING LOGOS ----- #
+    @db_connection
+    def get_pending_logos(self, cursor):
+        """(topic_id, theme, staged filename) for every upload still waiting."""
+        cursor.execute('''
+            SELECT id, logo_pending_light, logo_pending_dark FROM topic
+            WHERE logo_pending_light IS NOT NULL OR logo_pending_dark IS NOT NULL
+        ''')
+        pending = []
+        for row in cursor.fetchall():
+            for theme in ('light', 'dark'):
+                if row[f'logo_pending_{theme}']:
+                    pending.append((row['id'], theme, row[f'logo_pending_{theme}']))
+        return pending
+    
+    # ----- LOGO STILL REFERENCED ----- #
+    @db_connection
+    def logo_in_use(self, cursor, filename):
+        """Identical uploads share files, so only delete ones no topic points at."""
+        cursor.execute('''
+            SELECT 1 FROM topic
+            WHERE logo_filename_light = ? OR logo_filename_dark = ?
+                OR logo_pending_light = ? OR logo_pending_dark = ?
+            LIMIT 1
+        ''', (filename,) * 4)
+        return cursor.fetchone() is not None
+    
+    def _logo_theme(self, theme):
+        if theme not in ('light', 'dark'):
+            raise ValueError(f"Invalid logo theme: {theme!r}")
+        return theme
+    
     # ----- ALL CATEGORIES ----- #
     @db_connection
     def get_all_categories(self, cursor):
@@ -162,24 +332,60 @@ class TopicModel:
         categories_data = cursor.fetchall()
         return [(cat['id'], cat['name']) for cat in categories_data]
     
+    # ----- LOAD SECTIONS + ITEMS FOR MANY TOPICS ----- #
+    def _attach_sections(self, cursor, topics):
+        """Set topic.sections (each with section.items) using two batched queries."""
+        topics_by_id = {topic.id: topic for topic in topics}
+        for topic in topics:
+            topic.sections = []
+        if not topics_by_id:
+            return topics
+        
+        topic_ids = list(topics_by_id)
+        placeholders = ','.join(['?'] * len(topic_ids))
+        
+        section_model = SectionModel()
+        sections_by_id = {}
+        cursor.execute(f'''
+            SELECT * FROM section
+            WHERE topic_id IN ({placeholders})
+            ORDER BY display_order, id
+        ''', topic_ids)
+        for section_data in cursor.fetchall():
+            section = section_model._dict_to_section(section_data)
+            section.items = []
+            sections_by_id[section.id] = section
+            topics_by_id[section.topic_id].sections.append(section)
+        
+        item_model = SectionItemModel()
+        cursor.execute(f'''
+            SELECT i.* FROM section_item i
+            JOIN section s ON i.section_id = s.id
+            WHERE s.topic_id IN ({placeholders})
+            ORDER BY i.display_order, i.id
+        ''', topic_ids)
+        for item_data in cursor.fetchall():
+            sections_by_id[item_data['section_id']].items.append(item_model._dict_to_item(item_data))
+        
+        return topics
+    
     # ----- CONVERT DB ROW TO TOPIC ----- #
     def _dict_to_topic(self, topic_data):
-        if not isinstance(topic_data, dict):
-            topic_data = dict(topic_data)
-
-        topic = TopicModel()
-        topic.id = topic_data['id']
-        topic.slug = topic_data['slug']
-        topic.title = topic_data['title']
-        topic.description = topic_data['description']
-        topic.category_id = topic_data['category_id']
-        topic.category_name = topic_data.get('category_name', 'General')
-        topic.is_published = bool(topic_data['is_published'])
-        topic.user_id = topic_data['user_id']
-        topic.card_color_light = topic_data.get('card_color_light', '#ffffff')
-        topic.card_color_dark = topic_data.get('card_color_dark', '#1a1a1a')
-        topic.logo_filename_light = topic_data.get('logo_filename_light')  # UPDATE
-        topic.logo_filename_dark = topic_data.get('logo_filename_dark')    # ADD
-        topic.created_at = topic_data['created_at']
-        topic.updated_at = topic_data['updated_at']
-        return topic
\ No newline at end of file
+        return Topic(
+            id=topic_data['id'],
+            slug=topic_data['slug'],
+            title=topic_data['title'],
+            description=topic_data['description'],
+            category_id=topic_data['category_id'],
+            category_name=topic_data['category_name'] if 'category_name' in topic_data.keys() else 'General',
+            is_published=bool(topic_data['is_published']),
+            user_id=topic_data['user_id'],
+            card_color_light=topic_data['card_color_light'],
+            card_color_dark=topic_data['card_color_dark'],
+            logo_filename_light=topic_data['logo_filename_light'],
+            logo_filename_dark=topic_data['logo_filename_dark'],
+            logo_pending_light=topic_data['logo_pending_light'] if 'logo_pending_light' in topic_data.keys() else None,
+            logo_pending_dark=topic_data['logo_pending_dark'] if 'logo_pending_dark' in topic_data.keys() else None,
+            created_at=topic_data['created_at'],
+            updated_at=topic_data['updated_at']
+        )
@@ -1,7 +1,7 @@
-from flask_login import UserMixin
-from .database import db_connection, verify_password
+from .database import db_connection
+from .records import User
 
-class UserModel(UserMixin):
+class UserModel:
     # ----- BY ID ----- #
     @db_connection
     def get_by_id(self, cursor, user_id):
@@ -47,18 +47,13 @@ class UserModel(UserMixin):
         users_data = cursor.fetchall()
         return [self._dict_to_user(user) for user in users_data]
     
-    # ----- CHECK PASSWORD ----- #
-    def check_password(self, password):
-        return verify_password(password, self.password_hash)
-    
     # ----- CONVERT DB ROW TO USER OBJECT ----- #
     def _dict_to_user(self, user_data):
-        user = UserModel()
-        user.id = user_data['id']
-        user.username = user_data['username']
-        user.email = user_data['email']
-        user.password_hash = user_data['password_hash']
-        user.is_admin = bool(user_data['is_admin'])
-        user.created_at = user_data['created_at']
-        return user
-    
\ No newline at end of file
+        return User(
+            id=user_data['id'],
+            username=user_data['username'],
+            email=user_data['email'],
+            password_hash=user_data['password_hash'],
+            is_admin=bool(user_data['is_admin']),
+            created_at=user_data['created_at']
+        )
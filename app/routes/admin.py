@@ -1,12 +1,15 @@
 import os
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app
 from flask_login import login_required, current_user
 from app.models.topic import TopicModel
 from app.models.section import SectionModel
 from app.models.section_item import SectionItemModel
 from app.models.category import CategoryModel 
+from app.models.database import content_generation
 from werkzeug.utils import secure_filename
-from app.utils.upload import save_topic_logo, delete_topic_logo
+from app.utils.upload import stage_topic_logo
+from app.utils.logo_pipeline import get_logo_pipeline, release_topic_logo
+from app.utils.instrumentation import metrics_token_matches, metrics_response
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -39,6 +42,26 @@ def dashboard():
                          categories=categories)
 
 
+# ------ CACHE STATS ------ #
+@admin_bp.route('/api/cache/stats')
+@admin_required
+def api_cache_stats():
+    return jsonify({
+        'content_generation': content_generation(),
+        'search': current_app.extensions['search_cache'].stats(),
+        'pages': current_app.extensions['response_cache'].stats()
+    })
+
+
+# ------ METRICS ------ #
+@admin_bp.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint, for admins or a METRICS_TOKEN bearer."""
+    if metrics_token_matches():
+        return metrics_response()
+    return admin_required(metrics_response)()
+
+
 # ------------------------------------------- #
 # --------------- CATEGORIES ---------------- #
 # ------------------------------------------- #
@@ -122,12 +145,13 @@ def delete_category(category_id):
 def api_reorder_categories():
     order_data = request.json.get('order', [])
     
-    category_model = CategoryModel()
-    
-    if category_model.reorder_categories(order_data):
+    try:
+        category_model = CategoryModel()
+        category_model.reorder_categories(order_data)
         return jsonify({'success': True})
-    else:
-        return jsonify({'success': False, 'error': 'Failed to reorder categories'})
+    except Exception as e:
+        print(f"Error reordering categories: {e}")
+        return jsonify({'success': False, 'error': str(e)})
     
 
 # ------------------------------------------- #
@@ -150,31 +174,18 @@ def new_topic():
         card_color_light = request.form.get('card_color_light', '#ffffff')
         card_color_dark = request.form.get('card_color_dark', '#1a1a1a')
         
-        # Handle logo uploads
-        logo_filename_light = None
-        logo_filename_dark = None
-        
-        if 'logo_light' in request.files:
-            file = request.files['logo_light']
-            if file and file.filename:
-                logo_filename_light = save_topic_logo(file)
-                if not logo_filename_light:
-                    flash('Error uploading light theme logo', 'error')
-        
-        if 'logo_dark' in request.files:
-            file = request.files['logo_dark']
-            if file and file.filename:
-                logo_filename_dark = save_topic_logo(file)
-                if not logo_filename_dark:
-                    flash('Error uploading dark theme logo', 'error')
-        
         if not slug or not title:
             flash('Slug and title are required', 'error')
             return render_template('admin/edit_topic.html', categories=categories)
         
-        topic_id = topic_model.create_topic(slug, title, description, current_user.id, category_id, is_published, card_color_light, card_color_dark, logo_filename_light, logo_filename_dark)
+        topic_id = topic_model.create_topic(slug, title, description, current_user.id, category_id, is_published, card_color_light, card_color_dark)
         
         if topic_id:
+            # Handle logo uploads: only staged once the topic exists, the logo
+            # pipeline resizes them in the background and sets them when done
+            staged_logos = _stage_logo_uploads()
+            for theme, staged_filename in staged_logos.items():
+                get_logo_pipeline().submit(topic_id, theme, staged_filename)
             flash('Topic created successfully!', 'success')
             return redirect(url_for('admin.dashboard'))
         else:
@@ -202,44 +213,29 @@ def edit_topic(topic_id):
         is_published = 'is_published' in request.form
         card_color_light = request.form.get('card_color_light', '#ffffff')
         card_color_dark = request.form.get('card_color_dark', '#1a1a1a')
-        remove_logo_light = 'remove_logo_light' in request.form
-        remove_logo_dark = 'remove_logo_dark' in request.form
+        remove_logo_light = request.form.get('remove_logo_light') == 'true'
+        remove_logo_dark = request.form.get('remove_logo_dark') == 'true'
         
-        # Handle logo uploads/removals
-        logo_filename_light = topic.logo_filename_light if hasattr(topic, 'logo_filename_light') else None
-        logo_filename_dark = topic.logo_filename_dark if hasattr(topic, 'logo_filename_dark') else None
+        # Handle logo removals; files are deleted once the topic no longer points at them
+        logo_filename_light = topic.logo_filename_light
+        logo_filename_dark = topic.logo_filename_dark
+        released_logos = []
         
-        # Handle light theme logo
         if remove_logo_light and logo_filename_light:
-            delete_topic_logo(logo_filename_light)
+            released_logos.append(logo_filename_light)
             logo_filename_light = None
-        elif 'logo_light' in request.files:
-            file = request.files['logo_light']
-            if file and file.filename:
-                if logo_filename_light:
-                    delete_topic_logo(logo_filename_light)
-                new_logo_filename = save_topic_logo(file)
-                if new_logo_filename:
-                    logo_filename_light = new_logo_filename
-                else:
-                    flash('Error uploading light theme logo', 'error')
         
-        # Handle dark theme logo
         if remove_logo_dark and logo_filename_dark:
-            delete_topic_logo(logo_filename_dark)
+            released_logos.append(logo_filename_dark)
             logo_filename_dark = None
-        elif 'logo_dark' in request.files:
-            file = request.files['logo_dark']
-            if file and file.filename:
-                if logo_filename_dark:
-                    delete_topic_logo(logo_filename_dark)
-                new_logo_filename = save_topic_logo(file)
-                if new_logo_filename:
-                    logo_filename_dark = new_logo_filename
-                else:
-                    flash('Error uploading dark theme logo', 'error')
         
         if topic_model.update_topic(topic_id, slug, title, description, category_id, is_published, card_color_light, card_color_dark, logo_filename_light, logo_filename_dark):
+            for filename in released_logos:
+                release_topic_logo(filename)
+            # New uploads replace the current logo when processing finishes
+            staged_logos = _stage_logo_uploads()
+            for theme, staged_filename in staged_logos.items():
+                get_logo_pipeline().submit(topic_id, theme, staged_filename)
             flash('Topic updated successfully!', 'success')
             return redirect(url_for('admin.dashboard'))
         else:
@@ -247,12 +243,28 @@ def edit_topic(topic_id):
     
     return render_template('admin/edit_topic.html', topic=topic, categories=categories)
 
+def _stage_logo_uploads():
+    staged_logos = {}
+    for theme in ('light', 'dark'):
+        file = request.files.get(f'logo_{theme}')
+        if file and file.filename:
+            staged_filename = stage_topic_logo(file)
+            if staged_filename:
+                staged_logos[theme] = staged_filename
+            else:
+                flash(f'Error uploading {theme} theme logo', 'error')
+    return staged_logos
+
 # -------- DELETE TOPIC -------- #
 @admin_bp.route('/topic/<int:topic_id>/delete')
 @admin_required
 def delete_topic(topic_id):
     topic_model = TopicModel()
+    topic = topic_model.get_by_id(topic_id)
     if topic_model.delete_topic(topic_id):
+        if topic:
+            release_topic_logo(topic.logo_filename_light)
+            release_topic_logo(topic.logo_filename_dark)
         flash('Topic deleted successfully!', 'success')
     else:
         flash('Error deleting topic', 'error')
@@ -264,16 +276,11 @@ def delete_topic(topic_id):
 @admin_required
 def api_reorder_topics():
     try:
-        from app.models.database import DBConnection
-        with DBConnection() as cursor:
-            category_id = request.json.get('category_id')
-            order_data = request.json.get('order', [])
-            
-            for display_order, topic_id in enumerate(order_data):
-                cursor.execute(
-                    'UPDATE topic SET display_order = ? WHERE id = ? AND category_id = ?',
-                    (display_order, topic_id, category_id)
-                )
+        category_id = request.json.get('category_id')
+        order_data = request.json.get('order', [])
+        
+        topic_model = TopicModel()
+        topic_model.reorder_topics(category_id, order_data)
         return jsonify({'success': True})
     except Exception as e:
         print(f"Error reordering topics: {e}")
@@ -308,20 +315,13 @@ def api_change_topic_category():
 @admin_required
 def manage_sections(topic_id):
     topic_model = TopicModel()
-    section_model = SectionModel()
-    item_model = SectionItemModel()
     
-    topic = topic_model.get_by_id(topic_id)
+    topic = topic_model.get_tree_by_id(topic_id)
     if not topic:
         flash('Topic not found', 'error')
         return redirect(url_for('admin.dashboard'))
     
-    sections = section_model.get_by_topic(topic_id)
-    
-    for section in sections:
-        section.items = item_model.get_by_section(section.id)
-    
-    return render_template('admin/manage_sections.html', topic=topic, sections=sections)
+    return render_template('admin/manage_sections.html', topic=topic, sections=topic.sections)
 
 # --------- NEW SECTION --------- #
 @admin_bp.route('/api/section/new', methods=['POST'])
@@ -373,13 +373,8 @@ def api_reorder_sections():
     order_data = request.json.get('order', [])
     
     try:
-        from app.models.database import DBConnection
-        with DBConnection() as cursor:
-            for display_order, section_id in enumerate(order_data):
-                cursor.execute(
-                    'UPDATE section SET display_order = ? WHERE id = ? AND topic_id = ?',
-                    (display_order, section_id, topic_id)
-                )
+        section_model = SectionModel()
+        section_model.reorder_sections(topic_id, order_data)
         return jsonify({'success': True})
     except Exception as e:
         print(f"Error reordering sections: {e}")
@@ -393,13 +388,8 @@ def api_reorder_items():
     order_data = request.json.get('order', [])
     
     try:
-        from app.models.database import DBConnection
-        with DBConnection() as cursor:
-            for display_order, item_id in enumerate(order_data):
-                cursor.execute(
-                    'UPDATE section_item SET display_order = ? WHERE id = ? AND section_id = ?',
-                    (display_order, item_id, section_id)
-                )
+        item_model = SectionItemModel()
+        item_model.reorder_items(section_id, order_data)
         return jsonify({'success': True})
     except Exception as e:
         print(f"Error reordering items: {e}")
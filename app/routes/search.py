@@ -1,50 +1,51 @@
-from flask import Blueprint, request, jsonify
+import base64
+import hashlib
+import json
+from flask import Blueprint, Response, request, jsonify, current_app
 from app.models.topic import TopicModel
-from app.models.section import SectionModel
-from app.models.section_item import SectionItemModel
-from app.models.category import CategoryModel
+from app.models.search_index import SearchIndexModel, SearchResults
+from app.models.database import content_generation
+from app.models.snapshot import get_snapshot
+from app.models.search_engine import get_search_engine
+from app.models.client_index import get_client_index
 
 search_bp = Blueprint('search', __name__)
 
+# Topics per page of /search/query
+DEFAULT_RESULT_LIMIT = 50
+MAX_RESULT_LIMIT = 200
+
 @search_bp.route('/search/topics')
 def get_all_topics():
     """Get all published topics for the left sidebar"""
-    topic_model = TopicModel()
-    category_model = CategoryModel()
-    
-    # Get categorized topics
-    categorized_topics = category_model.get_topics_by_category()
-    
-    # Flatten the structure for the search sidebar
-    all_topics = []
-    for category_name, category_data in categorized_topics.items():
-        for topic in category_data['topics']:
-            all_topics.append({
-                'id': topic.id,
-                'slug': topic.slug,
-                'title': topic.title,
-                'description': topic.description,
-                'category': category_name
-            })
-    
-    return jsonify({'topics': all_topics})
+    # Prebuilt with the snapshot; the ETag is the index's content hash
+    snapshot = get_snapshot()
+    response = current_app.response_class(snapshot.sidebar_index, mimetype='application/json')
+    response.set_etag(snapshot.sidebar_version)
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+@search_bp.route('/search/index')
+def get_search_index():
+    """Compact index of all published content for searching in the browser"""
+    version, index = get_client_index()
+    response = current_app.response_class(index, mimetype='application/json')
+    response.set_etag(version)
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 @search_bp.route('/search/topic/<int:topic_id>')
 def get_topic_content(topic_id):
     """Get all sections and items for a specific topic"""
-    section_model = SectionModel()
-    item_model = SectionItemModel()
-    topic_model = TopicModel()
-    
-    topic = topic_model.get_by_id(topic_id)
+    topic = get_snapshot().topics_by_id.get(topic_id)
+    if not topic:
+        # Unpublished topics are not in the snapshot
+        topic = TopicModel().get_tree_by_id(topic_id)
     if not topic:
         return jsonify({'error': 'Topic not found'}), 404
     
-    sections = section_model.get_by_topic(topic_id)
-    
-    for section in sections:
-        section.items = item_model.get_by_section(section.id)
-    
     return jsonify({
         'topic': {
             'id': topic.id,
@@ -59,107 +60,115 @@ def get_topic_content(topic_id):
                 'id': item.id,
                 'title': item.title
             } for item in section.items]
-        } for section in sections]
+        } for section in topic.sections]
     })
 
 @search_bp.route('/search/query')
 def search_query():
-    """Search across all content and return complete topic structures for matches"""
-    query = request.args.get('q', '').strip().lower()
+    """Search across all content and return complete topic structures for matches.
+
+    Returns at most ``limit`` topics plus a ``next_cursor`` to pass back as
+    ``cursor`` for the next page. With ``format=ndjson`` the page is streamed
+    as one JSON topic result per line and the cursor is sent in the
+    X-Next-Cursor header. A cursor only works for the query it came from
+    and while content is unchanged; otherwise the answer is a 400.
+    """
+    query = request.args.get('q', '').strip()
+    limit = min(max(request.args.get('limit', DEFAULT_RESULT_LIMIT, type=int), 1), MAX_RESULT_LIMIT)
+    
+    search_model = SearchIndexModel()
+    normalized_query = search_model.normalize_query(query)
+    # Read the generation before querying so a concurrent write can't leave
+    # stale results under the new generation
+    generation = content_generation()
     
-    topic_model = TopicModel()
-    section_model = SectionModel()
-    item_model = SectionItemModel()
+    offset = 0
+    cursor = request.args.get('cursor')
+    if cursor:
+        position = _decode_cursor(cursor)
+        if position is None:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        offset, query_hash, cursor_generation = position
+        if query_hash != _query_hash(normalized_query):
+            return jsonify({'error': 'Cursor belongs to another query'}), 400
+        if cursor_generation != generation:
+            return jsonify({'error': 'Content changed, search again'}), 400
     
-    # Get all published topics
-    all_topics = topic_model.get_all_published()
-    matching_topics = []
+    if normalized_query:
+        search_cache = current_app.extensions['search_cache']
+        cache_key = (generation, normalized_query)
+        matching_topics = search_cache.get(cache_key)
+        if matching_topics is None:
+            if current_app.config['SEARCH_BACKEND'] == 'fts':
+                matching_topics = search_model.search(normalized_query)
+            else:
+                matching_topics = get_search_engine().search(normalized_query)
+            search_cache.set(cache_key, matching_topics)
+    else:
+        matching_topics = SearchResults([])
     
-    if not query:
-        return jsonify({'results': []})
+    # Topics are ranked in full; only the requested page is resolved and turned into JSON
+    page = matching_topics.page(offset, limit)
+    next_cursor = None
+    if offset + limit < len(matching_topics):
+        next_cursor = _encode_cursor(offset + limit, _query_hash(normalized_query), generation)
     
-    for topic in all_topics:
-        # Check if topic matches
-        topic_matches = (query in topic.title.lower() or 
-                        (topic.description and query in topic.description.lower()))
-        
-        # Get all sections for this topic to check for matches
-        sections = section_model.get_by_topic(topic.id)
-        matching_sections = []
-        
-        for section in sections:
-            section_matches = query in section.title.lower()
-            
-            # Get all items for this section to check for matches
-            items = item_model.get_by_section(section.id)
-            matching_items = []
-            
-            for item in items:
-                item_matches = (query in item.title.lower() or 
-                               query in (item.markdown_content or '').lower())
-                
-                if item_matches:
-                    matching_items.append({
-                        'id': item.id,
-                        'title': item.title
-                    })
-            
-            # Include section if it matches or has matching items
-            if section_matches or matching_items:
-                matching_sections.append({
-                    'id': section.id,
-                    'title': section.title,
-                    'items': matching_items
-                })
-            # If topic matches, include ALL sections with ALL items
-            elif topic_matches:
-                matching_sections.append({
-                    'id': section.id,
-                    'title': section.title,
-                    'items': [{
-                        'id': item.id,
-                        'title': item.title
-                    } for item in items]
-                })
-        
-        # If topic matches, include ALL sections (even if they don't match individually)
-        if topic_matches:
-            # Re-fetch all sections with all items for this topic
-            all_sections = section_model.get_by_topic(topic.id)
-            complete_sections = []
-            
-            for section in all_sections:
-                items = item_model.get_by_section(section.id)
-                complete_sections.append({
-                    'id': section.id,
-                    'title': section.title,
-                    'items': [{
-                        'id': item.id,
-                        'title': item.title
-                    } for item in items]
-                })
-            
-            matching_topics.append({
-                'topic': {
-                    'id': topic.id,
-                    'slug': topic.slug,
-                    'title': topic.title,
-                    'description': topic.description
-                },
-                'sections': complete_sections,
-                'match_type': 'topic'
-            })
-        # If we have matching sections/items (but topic doesn't match)
-        elif matching_sections:
-            matching_topics.append({
-                'topic': {
-                    'id': topic.id,
-                    'slug': topic.slug,
-                    'title': topic.title,
-                    'description': topic.description
-                },
-                'sections': matching_sections,
-                'match_type': 'content'
-            })
+    if request.args.get('format') == 'ndjson':
+        response = Response(_stream_results(page), mimetype='application/x-ndjson')
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
     
-    return jsonify({'results': matching_topics})
\ No newline at end of file
+    return jsonify({'results': _search_results(page), 'next_cursor': next_cursor})
+
+# ----- PAGINATION CURSOR ----- #
+def _query_hash(normalized_query):
+    return hashlib.sha256(normalized_query.encode()).hexdigest()[:16]
+
+def _encode_cursor(offset, query_hash, generation):
+    value = f'o:{offset}:{query_hash}:{generation}'
+    return base64.urlsafe_b64encode(value.encode()).decode().rstrip('=')
+
+def _decode_cursor(cursor):
+    try:
+        value = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        prefix, offset, query_hash, generation = value.split(':')
+        offset = int(offset)
+        generation = int(generation)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if prefix != 'o' or offset < 0:
+        return None
+    return offset, query_hash, generation
+
+def _stream_results(matching_topics):
+    for topic in matching_topics:
+        yield json.dumps(_search_result(topic)) + '\n'
+
+def _search_results(matching_topics):
+    return [_search_result(topic) for topic in matching_topics]
+
+def _search_result(topic):
+    return {
+        'topic': {
+            'id': topic.id,
+            'slug': topic.slug,
+            'title': topic.title,
+            'description': topic.description
+        },
+        'sections': [{
+            'id': section.id,
+            'title': section.title,
+            'items': [_search_item(item) for item in section.items]
+        } for section in topic.sections],
+        'match_type': topic.match_type
+    }
+
+def _search_item(item):
+    result = {
+        'id': item.id,
+        'title': item.title
+    }
+    if getattr(item, 'snippet', None):
+        result['snippet'] = item.snippet
+    return result
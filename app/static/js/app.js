@@ -7,6 +7,12 @@ let isTransitioning = false;
 // prevent duplicate auto-hash scrolling when we already handled it manually
 let suppressAutoHashScroll = false;
 
+// localStorage key of the search sidebar's topic list
+const SIDEBAR_INDEX_KEY = 'sidebarIndex';
+
+// Topics shown per "Load more" when searching in the browser
+const LOCAL_RESULTS_PAGE_SIZE = 50;
+
 // Theme toggle functionality
 document.addEventListener('DOMContentLoaded', function () {
 	const themeToggle = document.getElementById('themeToggle');
@@ -58,12 +64,14 @@ function initializeSearch() {
 	let allTopics = [];
 	let currentTopicId = null;
 	let searchTimeout;
+	let searchSequence = 0;
 
 	// Open search modal
 	if (searchTrigger) {
 		searchTrigger.addEventListener('click', function () {
 			searchModal.style.display = 'block';
 			loadAllTopics();
+			LocalSearch.load();
 			setTimeout(() => searchInput.focus(), 100);
 		});
 	}
@@ -87,6 +95,7 @@ function initializeSearch() {
 			const query = this.value.trim();
 
 			if (query.length === 0) {
+				searchSequence++;
 				showAllTopics();
 				showTopicContentEmpty();
 				return;
@@ -104,6 +113,7 @@ function initializeSearch() {
 			e.preventDefault();
 			if (searchModal) {
 				searchModal.style.display = 'block';
+				LocalSearch.load();
 				setTimeout(() => {
 					if (searchInput) searchInput.focus();
 				}, 100);
@@ -124,20 +134,57 @@ function initializeSearch() {
 	}
 
 	function loadAllTopics() {
-		fetch('/search/topics')
-			.then(response => response.json())
+		const cached = readSidebarIndex();
+		if (cached) {
+			allTopics = cached.topics;
+			displayAllTopics();
+			// The page names the current version; nothing to fetch if it matches
+			if (cached.version === currentSidebarVersion()) return;
+		}
+
+		const headers = cached ? { 'If-None-Match': `"${cached.version}"` } : {};
+		fetch('/search/topics', { headers: headers })
+			.then(response => {
+				if (response.status === 304) return null;
+				if (!response.ok) throw new Error(`HTTP ${response.status}`);
+				return response.json();
+			})
 			.then(data => {
+				if (!data) return;
 				allTopics = data.topics || [];
+				writeSidebarIndex(data);
 				displayAllTopics();
 			})
 			.catch(error => {
 				console.error('Error loading topics:', error);
-				if (topicsList) {
+				if (topicsList && !cached) {
 					topicsList.innerHTML = '<div class="search-error">Error loading topics</div>';
 				}
 			});
 	}
 
+	function currentSidebarVersion() {
+		const meta = document.querySelector('meta[name="sidebar-index-version"]');
+		return meta ? meta.content : null;
+	}
+
+	function readSidebarIndex() {
+		try {
+			const cached = JSON.parse(localStorage.getItem(SIDEBAR_INDEX_KEY));
+			return cached && cached.version && Array.isArray(cached.topics) ? cached : null;
+		} catch (error) {
+			return null;
+		}
+	}
+
+	function writeSidebarIndex(data) {
+		try {
+			localStorage.setItem(SIDEBAR_INDEX_KEY, JSON.stringify({ version: data.version, topics: data.topics }));
+		} catch (error) {
+			// Storage full or disabled: the index is simply fetched again next time
+		}
+	}
+
 	function displayAllTopics() {
 		if (!topicsList) return;
 
@@ -240,34 +287,115 @@ function initializeSearch() {
 		topicContent.style.display = 'none';
 		searchContentEmpty.style.display = 'none';
 
-		fetch(`/search/query?q=${encodeURIComponent(query)}`)
-			.then(response => response.json())
-			.then(data => {
-				displaySearchResults(data, query);
+		const search = ++searchSequence;
+		// Answered in the browser once the index is loaded, else by the server
+		const localResults = LocalSearch.search(query);
+		if (localResults) {
+			searchResults.innerHTML = '';
+			showLocalResults(query, localResults, 0, search);
+		} else {
+			loadSearchPage(query, null, search, true);
+		}
+	}
+
+	// Renders local results a page at a time, like the server's pagination
+	function showLocalResults(query, results, offset, search) {
+		if (search !== searchSequence) return;
+		if (results.length === 0) {
+			showNoResults(query);
+			return;
+		}
+		const page = results.slice(offset, offset + LOCAL_RESULTS_PAGE_SIZE);
+		searchResults.insertAdjacentHTML('beforeend', page.map(result => renderSearchResult(result, query)).join(''));
+		if (offset + LOCAL_RESULTS_PAGE_SIZE < results.length) {
+			appendLoadMore(() => showLocalResults(query, results, offset + LOCAL_RESULTS_PAGE_SIZE, search));
+		}
+	}
+
+	function showNoResults(query) {
+		searchResults.innerHTML = `
+                        <div class="search-empty">
+                            <p>No results found for "<strong>${query}</strong>"</p>
+                            <p class="search-hint">Try different keywords or check spelling</p>
+                        </div>
+                    `;
+	}
+
+	function appendLoadMore(loadMore) {
+		searchResults.insertAdjacentHTML('beforeend', '<button type="button" class="search-load-more">Load more results</button>');
+		const button = searchResults.querySelector('.search-load-more');
+		button.addEventListener('click', function () {
+			button.remove();
+			loadMore();
+		});
+	}
+
+	// Streams one page of results as NDJSON and renders each topic as soon
+	// as its line arrives; a "Load more" button fetches the next page
+	function loadSearchPage(query, cursor, search, firstPage) {
+		let url = `/search/query?q=${encodeURIComponent(query)}&format=ndjson`;
+		if (cursor) url += `&cursor=${encodeURIComponent(cursor)}`;
+
+		let rendered = 0;
+		const renderLine = line => {
+			if (!line.trim() || search !== searchSequence) return;
+			if (firstPage && rendered === 0) searchResults.innerHTML = '';
+			searchResults.insertAdjacentHTML('beforeend', renderSearchResult(JSON.parse(line), query));
+			rendered++;
+		};
+
+		fetch(url)
+			.then(response => {
+				if (response.status === 400 && !firstPage) {
+					// Content changed since the first page: the cursor no longer applies
+					performSearch(query);
+					return null;
+				}
+				if (!response.ok) throw new Error(`HTTP ${response.status}`);
+				const nextCursor = response.headers.get('X-Next-Cursor');
+
+				if (!response.body || !window.TextDecoder) {
+					return response.text().then(text => {
+						text.split('\n').forEach(renderLine);
+						return nextCursor;
+					});
+				}
+
+				const reader = response.body.getReader();
+				const decoder = new TextDecoder();
+				let buffer = '';
+				const read = () => reader.read().then(({ done, value }) => {
+					buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+					const lines = buffer.split('\n');
+					buffer = lines.pop();
+					lines.forEach(renderLine);
+					if (done) {
+						renderLine(buffer);
+						return nextCursor;
+					}
+					return read();
+				});
+				return read();
+			})
+			.then(nextCursor => {
+				if (search !== searchSequence) return;
+				if (firstPage && rendered === 0) {
+					showNoResults(query);
+				}
+				if (nextCursor) {
+					appendLoadMore(() => loadSearchPage(query, nextCursor, search, false));
+				}
 			})
 			.catch(error => {
 				console.error('Search error:', error);
-				if (searchResults) {
+				if (searchResults && search === searchSequence) {
 					searchResults.innerHTML = '<div class="search-error">Error performing search</div>';
 				}
 			});
 	}
 
-	function displaySearchResults(data, query) {
-		if (!searchResults) return;
-
-		let html = '';
-
-		if (!data.results || data.results.length === 0) {
-			html = `
-                <div class="search-empty">
-                    <p>No results found for "<strong>${query}</strong>"</p>
-                    <p class="search-hint">Try different keywords or check spelling</p>
-                </div>
-            `;
-		} else {
-			data.results.forEach(result => {
-				html += `
+	function renderSearchResult(result, query) {
+		let html = `
                     <div class="search-topic-result">
                         <h3 class="search-topic-title">
                             <a href="/${result.topic.slug}" onclick="navigateToTopic('${result.topic.slug}')">
@@ -278,9 +406,9 @@ function initializeSearch() {
                         <div class="search-topic-sections">
                 `;
 
-				if (result.sections && result.sections.length > 0) {
-					result.sections.forEach(section => {
-						html += `
+		if (result.sections && result.sections.length > 0) {
+			result.sections.forEach(section => {
+				html += `
                             <div class="search-section-result">
                                 <h4 class="search-section-title">
                                     <a href="/${result.topic.slug}#section-${section.id}" onclick="navigateToSection('${result.topic.slug}', 'section-${section.id}')">
@@ -290,33 +418,31 @@ function initializeSearch() {
                                 <div class="search-section-items">
                         `;
 
-						if (section.items && section.items.length > 0) {
-							section.items.forEach(item => {
-								html += `
+				if (section.items && section.items.length > 0) {
+					section.items.forEach(item => {
+						html += `
                                     <div class="search-item-result">
                                         <a href="/${result.topic.slug}#item-${item.id}" onclick="navigateToSection('${result.topic.slug}', 'item-${item.id}')">
                                             ${highlightText(item.title, query)}
                                         </a>
+                                        ${item.snippet ? `<div class="search-item-snippet">${item.snippet}</div>` : ''}
                                     </div>
                                 `;
-							});
-						}
+					});
+				}
 
-						html += `
+				html += `
                                 </div>
                             </div>
                         `;
-					});
-				}
+			});
+		}
 
-				html += `
+		html += `
                         </div>
                     </div>
                 `;
-			});
-		}
-
-		searchResults.innerHTML = html;
+		return html;
 	}
 
 	function showAllTopics() {
@@ -383,6 +509,7 @@ function navigateToUrl(url) {
             if (newContent && mainContent) {
                 mainContent.innerHTML = newContent.innerHTML;
                 document.title = newTitle;
+                syncSidebarIndexVersion(doc);
                 window.history.pushState({}, '', url);
 
                 initializePageSpecificFunctionality();
@@ -420,6 +547,18 @@ function navigateToUrl(url) {
         });
 }
 
+// Keep the sidebar index version current across in-page navigation
+function syncSidebarIndexVersion(doc) {
+    // Only public pages name it; elsewhere the sidebar revalidates with an ETag
+    const current = document.querySelector('meta[name="sidebar-index-version"]');
+    const fetched = doc.querySelector('meta[name="sidebar-index-version"]');
+    if (current && fetched) {
+        current.content = fetched.content;
+    } else if (fetched) {
+        document.head.appendChild(fetched.cloneNode());
+    }
+}
+
 function showPageLoading() {
 	const loading = document.getElementById('pageLoading');
 	if (loading) {
@@ -0,0 +1,235 @@
+// static/js/local-search.js
+
+// Search-as-you-type in the browser, over the compact index from
+// /search/index. Ranking follows the server's search engine: every query
+// word has to match a word of the topic, section or item exactly, as a
+// prefix, or within a couple of edits. When the index is unavailable (too
+// large, or not loaded yet) search() returns null and the caller asks the
+// server instead.
+const LocalSearch = (function () {
+    const PREFIX_FACTOR = 0.8;
+    const FUZZY_FACTOR = 0.5;
+    const MAX_PREFIX_EXPANSIONS = 50;
+
+    let index = null;
+    let loading = null;
+
+    // Loads the index once; the browser revalidates it with its ETag
+    function load() {
+        if (!loading) {
+            loading = fetch('/search/index')
+                .then(response => {
+                    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                    return response.json();
+                })
+                .then(data => {
+                    index = data.available ? prepare(data) : null;
+                    return index;
+                })
+                .catch(error => {
+                    console.error('Error loading search index:', error);
+                    loading = null;
+                    return null;
+                });
+        }
+        return loading;
+    }
+
+    function prepare(data) {
+        const postings = data.postings.map(flat => {
+            const docs = new Int32Array(flat.length / 2);
+            const weights = new Float64Array(flat.length / 2);
+            let doc = 0;
+            for (let i = 0; i < flat.length; i += 2) {
+                doc += flat[i];
+                docs[i / 2] = doc;
+                weights[i / 2] = flat[i + 1] / data.weight_scale;
+            }
+            return { docs: docs, weights: weights };
+        });
+
+        const topicSections = data.topics.map(() => []);
+        data.sections.forEach((section, sectionIndex) => topicSections[section[1]].push(sectionIndex));
+        const sectionItems = data.sections.map(() => []);
+        data.items.forEach((item, itemIndex) => sectionItems[item[1]].push(itemIndex));
+
+        return {
+            topics: data.topics,
+            sections: data.sections,
+            items: data.items,
+            terms: data.terms,
+            postings: postings,
+            topicSections: topicSections,
+            sectionItems: sectionItems,
+            documentCount: data.topics.length + data.sections.length + data.items.length
+        };
+    }
+
+    // ----- TOKENIZE ----- //
+    function tokenize(text) {
+        const folded = (text || '').toLowerCase().normalize('NFKD').replace(/\p{M}/gu, '');
+        return folded.match(/[\p{L}\p{N}_]+/gu) || [];
+    }
+
+    function maxEdits(term) {
+        if (term.length < 4) return 0;
+        return term.length < 8 ? 1 : 2;
+    }
+
+    // Counts a swap of neighbouring letters as one edit, like the server
+    function editDistance(a, b, limit) {
+        if (Math.abs(a.length - b.length) > limit) return limit + 1;
+        let beforePrevious = null;
+        let previous = Array.from({ length: b.length + 1 }, (_, j) => j);
+        for (let i = 1; i <= a.length; i++) {
+            const current = [i];
+            for (let j = 1; j <= b.length; j++) {
+                let cost = Math.min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (a[i - 1] === b[j - 1] ? 0 : 1)
+                );
+                if (i > 1 && j > 1 && a[i - 1] === b[j - 2] && a[i - 2] === b[j - 1]) {
+                    cost = Math.min(cost, beforePrevious[j - 2] + 1);
+                }
+                current.push(cost);
+            }
+            if (Math.min(...current) > limit) return limit + 1;
+            beforePrevious = previous;
+            previous = current;
+        }
+        return previous[b.length];
+    }
+
+    // ----- MATCH ----- //
+    function bisectRight(terms, term) {
+        let low = 0;
+        let high = terms.length;
+        while (low < high) {
+            const middle = (low + high) >> 1;
+            if (term < terms[middle]) high = middle;
+            else low = middle + 1;
+        }
+        return low;
+    }
+
+    // [term number, score factor] pairs a query term matches
+    function expand(term) {
+        const terms = index.terms;
+        const matches = [];
+        const start = bisectRight(terms, term);
+        if (start > 0 && terms[start - 1] === term) matches.push([start - 1, 1.0]);
+
+        for (let i = start; i < terms.length && i < start + MAX_PREFIX_EXPANSIONS; i++) {
+            if (!terms[i].startsWith(term)) break;
+            matches.push([i, PREFIX_FACTOR]);
+        }
+
+        const limit = maxEdits(term);
+        if (!limit) return matches;
+        for (let i = 0; i < terms.length; i++) {
+            const candidate = terms[i];
+            if (candidate === term || candidate.startsWith(term) || Math.abs(candidate.length - term.length) > limit) continue;
+            const distance = editDistance(term, candidate, limit);
+            if (distance <= limit) matches.push([i, FUZZY_FACTOR / distance]);
+        }
+        return matches;
+    }
+
+    function score(terms) {
+        let scores = null;
+        for (const term of terms) {
+            const termScores = new Map();
+            expand(term).forEach(([termNumber, factor]) => {
+                const posting = index.postings[termNumber];
+                const idf = Math.log(1 + index.documentCount / posting.docs.length);
+                for (let i = 0; i < posting.docs.length; i++) {
+                    const value = factor * idf * posting.weights[i];
+                    if (value > (termScores.get(posting.docs[i]) || 0)) termScores.set(posting.docs[i], value);
+                }
+            });
+            if (scores === null) {
+                scores = termScores;
+            } else {
+                const combined = new Map();
+                scores.forEach((value, doc) => {
+                    if (termScores.has(doc)) combined.set(doc, value + termScores.get(doc));
+                });
+                scores = combined;
+            }
+            if (scores.size === 0) break;
+        }
+        return scores || new Map();
+    }
+
+    // ----- RESULTS ----- //
+    // Same shape and order as /search/query results, without snippets
+    function search(query) {
+        if (!index) return null;
+        const terms = tokenize(query);
+        if (terms.length === 0) return [];
+
+        // Every hit is ranked, like the server, so no match is cut off
+        const hits = Array.from(score(terms));
+        const topicCount = index.topics.length;
+        const sectionEnd = topicCount + index.sections.length;
+
+        const topicRanks = new Map();
+        const sectionRanks = new Map();
+        const itemRanks = new Map();
+        hits.forEach(([doc, value]) => {
+            if (doc < topicCount) topicRanks.set(doc, -value);
+            else if (doc < sectionEnd) sectionRanks.set(doc - topicCount, -value);
+            else itemRanks.set(doc - sectionEnd, -value);
+        });
+
+        // Walk item -> section -> topic, keeping the best rank on the way up
+        const sections = new Map();
+        sectionRanks.forEach((rank, section) => sections.set(section, { rank: rank, items: [] }));
+        itemRanks.forEach((rank, item) => {
+            const section = index.items[item][1];
+            if (!sections.has(section)) sections.set(section, { rank: 0, items: [] });
+            const hit = sections.get(section);
+            hit.items.push(item);
+            hit.rank = Math.min(hit.rank, rank);
+        });
+
+        const topics = new Map();
+        topicRanks.forEach((rank, topic) => topics.set(topic, { rank: rank, sections: [] }));
+        sections.forEach((hit, section) => {
+            const topic = index.sections[section][1];
+            if (!topics.has(topic)) topics.set(topic, { rank: 0, sections: [] });
+            const topicHit = topics.get(topic);
+            topicHit.sections.push(section);
+            topicHit.rank = Math.min(topicHit.rank, hit.rank);
+        });
+
+        const results = [];
+        topics.forEach((hit, topic) => {
+            const [id, slug, title, description] = index.topics[topic];
+            const matchesTopic = topicRanks.has(topic);
+            // Topic matches show everything, content matches only the hits
+            const sectionNumbers = matchesTopic ? index.topicSections[topic] : hit.sections.sort((a, b) => a - b);
+            results.push({
+                rank: hit.rank,
+                topic: { id: id, slug: slug, title: title, description: description },
+                sections: sectionNumbers.map(section => ({
+                    id: index.sections[section][0],
+                    title: index.sections[section][2],
+                    items: (matchesTopic ? index.sectionItems[section] : sections.get(section).items.sort((a, b) => a - b))
+                        .map(item => ({ id: index.items[item][0], title: index.items[item][2] }))
+                })),
+                match_type: matchesTopic ? 'topic' : 'content'
+            });
+        });
+
+        results.sort((a, b) => a.rank - b.rank || (a.topic.title < b.topic.title ? -1 : a.topic.title > b.topic.title ? 1 : 0));
+        return results;
+    }
+
+    return {
+        load: load,
+        search: search,
+        isReady: () => index !== null
+    };
+})();
@@ -0,0 +1,107 @@
+import hashlib
+import os
+import threading
+from flask import current_app, request, url_for
+from app.utils.bundles import BUNDLE_DIR, bundle_sources
+
+FINGERPRINT_LENGTH = 12
+ONE_YEAR = 31536000
+
+# Directories under app/static whose files get fingerprinted URLs
+FINGERPRINTED_DIRS = ('css', 'js', BUNDLE_DIR)
+
+# Uploaded logos are never rewritten under the same name (content-hash or
+# uuid4 filenames), so they can be cached forever without a fingerprint
+IMMUTABLE_PREFIXES = ('uploads/logos/',)
+
+# ----- ASSET MANIFEST ----- #
+class AssetManifest:
+    """Content hash of every static CSS/JS file, keyed by path under app/static.
+
+    Built once at startup. In debug mode a changed mtime triggers a rehash,
+    so edited files get a new URL without a restart.
+    """
+    def __init__(self, static_folder):
+        self.static_folder = static_folder
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def build(self):
+        for directory in FINGERPRINTED_DIRS:
+            root = os.path.join(self.static_folder, directory)
+            for dirpath, _, filenames in os.walk(root):
+                for name in filenames:
+                    path = os.path.relpath(os.path.join(dirpath, name), self.static_folder)
+                    self.fingerprint(path.replace(os.sep, '/'), check_mtime=True)
+        return self
+
+    def fingerprint(self, filename, check_mtime=False):
+        entry = self._entries.get(filename)
+        if entry is not None and not check_mtime:
+            return entry[1]
+
+        full_path = os.path.join(self.static_folder, filename)
+        try:
+            mtime = os.stat(full_path).st_mtime_ns
+        except OSError:
+            return None
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+
+        with open(full_path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:FINGERPRINT_LENGTH]
+        with self._lock:
+            self._entries[filename] = (mtime, digest)
+        return digest
+
+    def as_dict(self):
+        return {filename: entry[1] for filename, entry in sorted(self._entries.items())}
+
+def get_manifest():
+    return current_app.extensions['assets']
+
+# ----- TEMPLATE HELPERS ----- #
+def asset_url(filename):
+    """URL for a static file with its content hash as ?v=, cached for a year."""
+    fingerprint = get_manifest().fingerprint(filename, check_mtime=current_app.debug)
+    if fingerprint is None:
+        return url_for('static', filename=filename)
+    return url_for('static', filename=filename, v=fingerprint)
+
+def bundle_urls(name):
+    """Fingerprinted URLs to load a bundle from app/utils/bundles.py.
+
+    With ASSET_BUNDLES on this is the built file in static/dist (see
+    build_assets.py); otherwise, or before it is built, the source files,
+    with a stylesheet's @imports linked directly so each one gets its own
+    long-lived URL.
+    """
+    if current_app.config['ASSET_BUNDLES']:
+        filename = f"{BUNDLE_DIR}/{name}"
+        if get_manifest().fingerprint(filename, check_mtime=current_app.debug):
+            return [asset_url(filename)]
+    return [asset_url(filename) for filename in bundle_sources(name, current_app.static_folder)]
+
+# ----- CACHE HEADERS ----- #
+def add_cache_headers(response):
+    if request.endpoint != 'static' or response.status_code not in (200, 304):
+        return response
+
+    filename = request.view_args.get('filename', '')
+    version = request.args.get('v')
+    if filename.startswith(IMMUTABLE_PREFIXES) or (
+        version and version == get_manifest().fingerprint(filename, check_mtime=current_app.debug)
+    ):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = ONE_YEAR
+        response.cache_control.immutable = True
+    return response
+
+def init_app(app):
+    # Serve the prebuilt bundles from build_assets.py; turn on in production
+    app.config.setdefault('ASSET_BUNDLES', False)
+    app.extensions['assets'] = AssetManifest(app.static_folder).build()
+    app.add_template_global(asset_url, 'asset_url')
+    app.add_template_global(bundle_urls, 'bundle_urls')
+    app.after_request(add_cache_headers)
@@ -0,0 +1,238 @@
+import gzip
+import os
+import re
+
+# Output directory under app/static
+BUNDLE_DIR = 'dist'
+
+# Bundle name -> source files under app/static, in load order. A stylesheet
+# that only @imports others stands for the files it imports.
+BUNDLES = {
+    'public.css': ['css/main.css'],
+    'public.js': ['js/local-search.js', 'js/app.js'],
+    'admin.js': ['js/form-handlers.js'],
+    'admin-dashboard.js': ['js/form-handlers.js', 'js/admin-dashboard.js'],
+    'admin-categories.js': ['js/form-handlers.js', 'js/admin-categories.js'],
+    'admin-sections.js': ['js/form-handlers.js', 'js/admin-sections.js'],
+}
+
+IMPORT_RE = re.compile(r'''@import\s+url\(\s*['"]?([^'")]+)['"]?\s*\)\s*;''')
+
+# ----- SOURCE FILES OF A BUNDLE ----- #
+def bundle_sources(name, static_folder):
+    sources = []
+    for filename in BUNDLES[name]:
+        sources.extend(_expand_imports(filename, static_folder))
+    return sources
+
+def _expand_imports(filename, static_folder):
+    with open(os.path.join(static_folder, filename), encoding='utf-8') as f:
+        imports = IMPORT_RE.findall(f.read()) if filename.endswith('.css') else []
+    if not imports:
+        return [filename]
+    directory = os.path.dirname(filename)
+    expanded = []
+    for name in imports:
+        expanded.extend(_expand_imports(os.path.normpath(os.path.join(directory, name)).replace(os.sep, '/'), static_folder))
+    return expanded
+
+# ----- CSS MINIFIER ----- #
+CSS_TIGHT_CHARS = '{};,>'
+
+def minify_css(source):
+    """Drop comments and collapse whitespace; strings are left untouched."""
+    out = []
+    i = 0
+    n = len(source)
+    while i < n:
+        char = source[i]
+        if char in '"\'':
+            end = _skip_string(source, i, char)
+            out.append(source[i:end])
+            i = end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+        elif char.isspace():
+            while i < n and source[i].isspace():
+                i += 1
+            previous = out[-1][-1:] if out else ''
+            following = source[i:i + 1]
+            # Space before ':' is kept: "a :hover" is not "a:hover"
+            if previous and following and previous not in CSS_TIGHT_CHARS + ':' and following not in CSS_TIGHT_CHARS:
+                out.append(' ')
+        elif char == '}' and out and out[-1] == ';':
+            out[-1] = '}'
+            i += 1
+        else:
+            out.append(char)
+            i += 1
+    return ''.join(out).strip() + '\n'
+
+# ----- JS MINIFIER ----- #
+# A '/' after one of these starts a regex literal rather than a division
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void', 'yield', 'await', 'delete', 'instanceof', 'new'}
+
+def _is_word_char(char):
+    return char.isalnum() or char in '_$'
+
+def minify_js(source):
+    """Conservative minifier: drops comments, indentation and blank lines.
+
+    Line breaks are kept so automatic semicolon insertion behaves exactly as
+    in the source; strings, template literals and regexes are copied as is.
+    """
+    out = []
+    i = 0
+    n = len(source)
+    # One entry per open ${ } inside a template literal: its brace depth
+    template_braces = []
+    last_word = ''
+
+    def last_char():
+        for piece in reversed(out):
+            if piece.strip():
+                return piece.rstrip()[-1]
+        return ''
+
+    while i < n:
+        char = source[i]
+        if char in '"\'':
+            end = _skip_string(source, i, char)
+            out.append(source[i:end])
+            i = end
+            last_word = ''
+        elif char == '`':
+            i = _copy_template(source, i, out, template_braces)
+            last_word = ''
+        elif source.startswith('//', i):
+            end = source.find('\n', i)
+            i = n if end == -1 else end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            out.append(' ')
+        elif char == '/' and (last_char() in REGEX_PRECEDERS or last_char() == '' or last_word in REGEX_KEYWORDS):
+            end = _skip_regex(source, i)
+            out.append(source[i:end])
+            i = end
+            last_word = ''
+        elif char.isspace():
+            start = i
+            while i < n and source[i].isspace():
+                i += 1
+            if '\n' in source[start:i]:
+                while out and out[-1] == ' ':
+                    out.pop()
+                if out and out[-1] != '\n':
+                    out.append('\n')
+            elif out and out[-1] not in (' ', '\n'):
+                previous = out[-1][-1]
+                following = source[i:i + 1]
+                if (_is_word_char(previous) and _is_word_char(following)) or (previous in '+-' and following in '+-'):
+                    out.append(' ')
+        elif char == '{' and template_braces:
+            template_braces[-1] += 1
+            out.append(char)
+            i += 1
+        elif char == '}' and template_braces:
+            if template_braces[-1] == 0:
+                # End of a ${ } expression: back inside the template literal
+                template_braces.pop()
+                out.append(char)
+                i = _copy_template(source, i + 1, out, template_braces, resume=True)
+            else:
+                template_braces[-1] -= 1
+                out.append(char)
+                i += 1
+        elif _is_word_char(char):
+            start = i
+            while i < n and _is_word_char(source[i]):
+                i += 1
+            last_word = source[start:i]
+            out.append(last_word)
+        else:
+            out.append(char)
+            i += 1
+            last_word = ''
+
+    return ''.join(out).strip() + '\n'
+
+def _skip_string(source, start, quote):
+    i = start + 1
+    while i < len(source):
+        if source[i] == '\\':
+            i += 2
+        elif source[i] == quote or (source[i] == '\n' and quote != '`'):
+            return i + 1
+        else:
+            i += 1
+    return len(source)
+
+def _skip_regex(source, start):
+    i = start + 1
+    in_class = False
+    while i < len(source) and source[i] != '\n':
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            i += 1
+            while i < len(source) and source[i].isalpha():
+                i += 1
+            return i
+        i += 1
+    return i
+
+def _copy_template(source, start, out, template_braces, resume=False):
+    """Copy a template literal up to its closing backtick or next ${."""
+    i = start if resume else start + 1
+    while i < len(source):
+        char = source[i]
+        if char == '\\':
+            i += 2
+        elif char == '`':
+            out.append(source[start:i + 1])
+            return i + 1
+        elif source.startswith('${', i):
+            out.append(source[start:i + 2])
+            template_braces.append(0)
+            return i + 2
+        else:
+            i += 1
+    out.append(source[start:])
+    return len(source)
+
+# ----- BUILD ----- #
+def build_bundle(name, static_folder):
+    """Write dist/<name> and dist/<name>.gz; returns (source bytes, minified bytes, gzip bytes)."""
+    minify = minify_css if name.endswith('.css') else minify_js
+    separator = '\n' if name.endswith('.css') else '\n;\n'
+
+    parts = []
+    source_size = 0
+    for filename in bundle_sources(name, static_folder):
+        with open(os.path.join(static_folder, filename), encoding='utf-8') as f:
+            source = f.read()
+        source_size += len(source.encode())
+        parts.append(minify(source))
+
+    data = separator.join(parts).encode()
+    # mtime=0 keeps the .gz byte-identical across builds of the same input
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+
+    output_dir = os.path.join(static_folder, BUNDLE_DIR)
+    os.makedirs(output_dir, exist_ok=True)
+    for filename, content in ((name, data), (f"{name}.gz", compressed)):
+        tmp_path = os.path.join(output_dir, f".{filename}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, os.path.join(output_dir, filename))
+
+    return source_size, len(data), len(compressed)
@@ -0,0 +1,66 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+# ----- LRU CACHE WITH TTL ----- #
+class LRUCache:
+    """Thread-safe LRU cache with an optional time-to-live per entry.
+
+    Keeps hit/miss/eviction/expiration counters for the metrics endpoints.
+    """
+    def __init__(self, maxsize=256, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+            }
@@ -0,0 +1,127 @@
+import gzip
+from werkzeug.http import parse_accept_header
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Only text formats are worth compressing; images and fonts already are
+COMPRESSIBLE_TYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/javascript', 'text/xml',
+    'application/javascript', 'application/json', 'application/x-ndjson',
+    'application/xml', 'image/svg+xml',
+}
+
+# Levels for compressing on every response; cache entries are compressed
+# once, so they get the slow, smallest settings
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+CACHED_GZIP_LEVEL = 9
+CACHED_BROTLI_QUALITY = 11
+
+def available_encodings():
+    """Encodings this process can produce, in order of preference."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+def negotiate_encoding(accept_encoding):
+    """Best encoding the client accepts, or None for an uncompressed body."""
+    if not accept_encoding:
+        return None
+    return parse_accept_header(accept_encoding).best_match(available_encodings())
+
+def is_compressible(mimetype):
+    return (mimetype or '').split(';', 1)[0].strip().lower() in COMPRESSIBLE_TYPES
+
+def compress(data, encoding, cached=False):
+    if encoding == 'br':
+        return brotli.compress(data, quality=CACHED_BROTLI_QUALITY if cached else BROTLI_QUALITY)
+    # mtime=0 so the same body always compresses to the same bytes
+    return gzip.compress(data, compresslevel=CACHED_GZIP_LEVEL if cached else GZIP_LEVEL, mtime=0)
+
+def compressed_variants(data, mimetype, min_size):
+    """Every available encoding of a body, for storing next to it in a cache."""
+    if len(data) < min_size or not is_compressible(mimetype):
+        return {}
+    return {encoding: compress(data, encoding, cached=True) for encoding in available_encodings()}
+
+def add_vary(headers, value='Accept-Encoding'):
+    """Add a value to the Vary header in a WSGI header list."""
+    for index, (name, current) in enumerate(headers):
+        if name.lower() == 'vary':
+            if value.lower() not in [v.strip().lower() for v in current.split(',')]:
+                headers[index] = (name, f"{current}, {value}")
+            return
+    headers.append(('Vary', value))
+
+# ----- WSGI MIDDLEWARE ----- #
+class CompressionMiddleware:
+    """Compress text responses for clients that send Accept-Encoding.
+
+    Only complete 200 responses of at least min_size bytes are compressed.
+    Streamed responses (no Content-Length, e.g. NDJSON search results) and
+    responses that already have a Content-Encoding, such as the precompressed
+    bodies from the response cache, are passed through untouched. The ETag of
+    a compressed body is made weak, so conditional requests still match the
+    uncompressed representation the view computed it for.
+    """
+    def __init__(self, wsgi_app, min_size=500):
+        self.wsgi_app = wsgi_app
+        self.min_size = min_size
+
+    def _should_compress(self, status, headers):
+        if not status.startswith('200'):
+            return False
+        values = {name.lower(): value for name, value in headers}
+        if 'content-encoding' in values or 'no-transform' in values.get('cache-control', ''):
+            return False
+        try:
+            length = int(values.get('content-length', ''))
+        except ValueError:
+            return False
+        return length >= self.min_size and is_compressible(values.get('content-type'))
+
+    def __call__(self, environ, start_response):
+        encoding = negotiate_encoding(environ.get('HTTP_ACCEPT_ENCODING'))
+        deferred = {}
+
+        def capture_start_response(status, headers, exc_info=None):
+            if not self._should_compress(status, headers):
+                return start_response(status, headers, exc_info)
+            add_vary(headers)
+            if encoding is None or environ['REQUEST_METHOD'] == 'HEAD':
+                return start_response(status, headers, exc_info)
+            # Flask starts the response before returning its body, so the
+            # real start_response is called below once the body is compressed
+            deferred['response'] = (status, headers, exc_info)
+            return deferred.setdefault('written', []).append
+
+        app_iter = self.wsgi_app(environ, capture_start_response)
+        if 'response' not in deferred:
+            return app_iter
+
+        try:
+            body = b''.join(deferred.get('written', []) + list(app_iter))
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+
+        status, headers, exc_info = deferred['response']
+        data = compress(body, encoding)
+        headers = [
+            (name, value) for name, value in headers
+            if name.lower() not in ('content-length', 'accept-ranges')
+        ]
+        for index, (name, value) in enumerate(headers):
+            if name.lower() == 'etag' and not value.startswith('W/'):
+                headers[index] = (name, f"W/{value}")
+        headers.append(('Content-Encoding', encoding))
+        headers.append(('Content-Length', str(len(data))))
+        start_response(status, headers, exc_info)
+        return [data]
+
+def init_app(app):
+    # Turn off when a proxy in front of the app already compresses
+    app.config.setdefault('COMPRESS_RESPONSES', True)
+    app.config.setdefault('COMPRESS_MIN_SIZE', 500)
+    if app.config['COMPRESS_RESPONSES']:
+        app.wsgi_app = CompressionMiddleware(app.wsgi_app, app.config['COMPRESS_MIN_SIZE'])
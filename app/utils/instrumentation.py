@@ -0,0 +1,210 @@
+import hmac
+import threading
+import time
+from collections import Counter
+from bisect import bisect_left
+from flask import current_app, g, has_app_context, request
+from flask_login import current_user
+from app.models.database import connection_opened, query_executed
+from app.utils.markdown_render import markdown_rendered
+
+# Upper bounds of the request duration histogram, in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# ----- ONE REQUEST ----- #
+class RequestStats:
+    __slots__ = ('start', 'connections', 'queries', 'query_time', 'renders', 'render_time')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.connections = 0
+        self.queries = 0
+        self.query_time = 0.0
+        self.renders = 0
+        self.render_time = 0.0
+
+    def server_timing(self, duration):
+        return ', '.join([
+            f'app;dur={duration * 1000:.1f}',
+            f'db;dur={self.query_time * 1000:.1f};desc="{self.queries} queries"',
+            f'markdown;dur={self.render_time * 1000:.1f};desc="{self.renders} renders"',
+        ])
+
+# ----- TOTALS PER ENDPOINT ----- #
+class RouteMetrics:
+    def __init__(self):
+        self.statuses = Counter()
+        self.buckets = [0] * (len(DURATION_BUCKETS) + 1)
+        self.duration = 0.0
+        self.connections = 0
+        self.queries = 0
+        self.query_time = 0.0
+        self.renders = 0
+        self.render_time = 0.0
+
+class Metrics:
+    """Process-wide request metrics, rendered in the Prometheus text format.
+
+    Counters live in this process only; with several workers, scrape each
+    one or sum them in Prometheus.
+    """
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+        self.slow_queries = 0
+
+    def record(self, endpoint, status, stats, duration):
+        with self._lock:
+            route = self._routes.get(endpoint)
+            if route is None:
+                route = self._routes[endpoint] = RouteMetrics()
+            route.statuses[status] += 1
+            route.buckets[bisect_left(DURATION_BUCKETS, duration)] += 1
+            route.duration += duration
+            route.connections += stats.connections
+            route.queries += stats.queries
+            route.query_time += stats.query_time
+            route.renders += stats.renders
+            route.render_time += stats.render_time
+
+    def record_slow_query(self):
+        with self._lock:
+            self.slow_queries += 1
+
+    def render(self):
+        lines = []
+        with self._lock:
+            routes = sorted(self._routes.items())
+
+            _format_metric(lines, 'lookup_http_requests_total', 'counter',
+                           'Requests handled, by endpoint and status.', [
+                ('', {'endpoint': endpoint, 'status': status}, count)
+                for endpoint, route in routes
+                for status, count in sorted(route.statuses.items())
+            ])
+
+            histogram = []
+            for endpoint, route in routes:
+                cumulative = 0
+                for bound, count in zip(DURATION_BUCKETS + ('+Inf',), route.buckets):
+                    cumulative += count
+                    histogram.append(('_bucket', {'endpoint': endpoint, 'le': bound}, cumulative))
+                histogram.append(('_sum', {'endpoint': endpoint}, round(route.duration, 6)))
+                histogram.append(('_count', {'endpoint': endpoint}, cumulative))
+            _format_metric(lines, 'lookup_http_request_duration_seconds', 'histogram',
+                           'Wall time from the first request hook to the response.', histogram)
+
+            for name, attribute, help_text in (
+                ('lookup_db_connections_opened_total', 'connections', 'SQLite connections opened during requests.'),
+                ('lookup_db_queries_total', 'queries', 'SQL statements executed during requests.'),
+                ('lookup_db_query_seconds_total', 'query_time', 'Time spent executing SQL during requests.'),
+                ('lookup_markdown_renders_total', 'renders', 'Markdown documents rendered during requests.'),
+                ('lookup_markdown_render_seconds_total', 'render_time', 'Time spent rendering markdown during requests.'),
+            ):
+                _format_metric(lines, name, 'counter', help_text, [
+                    ('', {'endpoint': endpoint}, round(getattr(route, attribute), 6))
+                    for endpoint, route in routes
+                ])
+
+            _format_metric(lines, 'lookup_db_slow_queries_total', 'counter',
+                           'Statements slower than SLOW_QUERY_THRESHOLD, including background work.',
+                           [('', {}, self.slow_queries)])
+        return '\n'.join(lines) + '\n'
+
+def _format_metric(lines, name, kind, help_text, samples):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} {kind}')
+    for suffix, labels, value in samples:
+        label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+        lines.append(f'{name}{suffix}{{{label_text}}} {value}' if labels else f'{name}{suffix} {value}')
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def get_metrics():
+    return current_app.extensions['metrics']
+
+# ----- SCRAPE AUTHENTICATION ----- #
+def metrics_token_matches():
+    """True when the request carries METRICS_TOKEN as a bearer token."""
+    token = current_app.config['METRICS_TOKEN']
+    if not token:
+        return False
+    return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+
+def metrics_response():
+    return current_app.response_class(get_metrics().render(), content_type=METRICS_CONTENT_TYPE)
+
+# ----- SIGNAL RECEIVERS ----- #
+# Connected once per process; each signal is counted for the app handling it
+def _current_metrics():
+    if has_app_context():
+        return current_app.extensions.get('metrics')
+    return None
+
+def _request_stats():
+    if _current_metrics() is None:
+        return None
+    return g.get('_request_stats')
+
+@connection_opened.connect
+def _on_connection_opened(sender, **extra):
+    stats = _request_stats()
+    if stats is not None:
+        stats.connections += 1
+
+@query_executed.connect
+def _on_query_executed(sender, sql, elapsed):
+    metrics = _current_metrics()
+    if metrics is None:
+        return
+    stats = g.get('_request_stats')
+    if stats is not None:
+        stats.queries += 1
+        stats.query_time += elapsed
+    if elapsed >= current_app.config['SLOW_QUERY_THRESHOLD']:
+        metrics.record_slow_query()
+        endpoint = request.endpoint if stats is not None else 'background'
+        current_app.logger.warning('Slow query (%.1f ms, %s): %s', elapsed * 1000, endpoint, ' '.join(sql.split()))
+
+@markdown_rendered.connect
+def _on_markdown_rendered(sender, elapsed):
+    stats = _request_stats()
+    if stats is not None:
+        stats.renders += 1
+        stats.render_time += elapsed
+
+# ----- SERVER-TIMING HEADER ----- #
+def server_timing_allowed():
+    """Timings reveal how much work a request did; admins always see them."""
+    if current_app.config['SERVER_TIMING']:
+        return True
+    return current_user.is_authenticated and current_user.is_admin
+
+def init_app(app):
+    # Statements at least this slow (seconds) are logged and counted
+    app.config.setdefault('SLOW_QUERY_THRESHOLD', 0.1)
+    # Send Server-Timing to everyone, not just logged-in admins; for debugging
+    app.config.setdefault('SERVER_TIMING', False)
+    # Lets a Prometheus scraper read /admin/metrics without logging in
+    app.config.setdefault('METRICS_TOKEN', None)
+
+    metrics = Metrics()
+    app.extensions['metrics'] = metrics
+
+    @app.before_request
+    def start_request_stats():
+        g._request_stats = RequestStats()
+
+    @app.after_request
+    def record_request_stats(response):
+        stats = g.pop('_request_stats', None)
+        if stats is None:
+            return response
+        duration = time.perf_counter() - stats.start
+        metrics.record(request.endpoint or 'unmatched', response.status_code, stats, duration)
+        if server_timing_allowed():
+            response.headers.add('Server-Timing', stats.server_timing(duration))
+        return response
@@ -0,0 +1,50 @@
+import threading
+from flask import current_app
+from app.models.database import content_generation
+
+# ----- INVALIDATION BUS ----- #
+class InvalidationBus:
+    """Runs registered callbacks when the database content version changes.
+
+    The version is a row bumped by triggers, so a write made by any worker
+    process is noticed by every other one on its next request. Each
+    callback receives the new version.
+    """
+    def __init__(self):
+        self.version = None
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def register(self, callback):
+        self._callbacks.append(callback)
+        return callback
+
+    def check(self):
+        version = content_generation()
+        if version == self.version:
+            return False
+
+        with self._lock:
+            previous, self.version = self.version, version
+        if previous is None or previous == version:
+            return False
+
+        for callback in self._callbacks:
+            try:
+                callback(version)
+            except Exception as e:
+                print(f"Error running invalidation callback: {e}")
+        return True
+
+def init_app(app):
+    bus = InvalidationBus()
+    app.extensions['invalidation'] = bus
+    # One content_version read per request, memoized for the rest of it
+    @app.before_request
+    def check_content_version():
+        bus.check()
+
+def register(callback, app=None):
+    """Call callback(version) whenever content changes; usable as a decorator."""
+    app = app or current_app
+    return app.extensions['invalidation'].register(callback)
@@ -0,0 +1,164 @@
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+from flask import current_app
+from app.models.topic import TopicModel
+from app.utils.upload import (
+    logo_folder, staging_folder, logo_variant_name, logo_files, delete_topic_logo,
+    LOGO_SCALES
+)
+
+# 1x size; 2x and 3x variants are multiples of it
+LOGO_SIZE = 64
+
+SAVE_OPTIONS = {
+    'png': {'optimize': True},
+    'webp': {'quality': 85, 'method': 6},
+}
+
+# ----- RESIZE ONE STAGED UPLOAD ----- #
+def process_logo(staged_path, output_folder):
+    """Write every variant of a staged upload; returns the 1x filename.
+
+    Variants that already exist (an identical upload) are not made again.
+    """
+    digest, extension = os.path.basename(staged_path).rsplit('.', 1)
+    os.makedirs(output_folder, exist_ok=True)
+
+    if extension == 'svg':
+        filename = f"{digest}.svg"
+        if not os.path.exists(os.path.join(output_folder, filename)):
+            with open(staged_path, 'rb') as source:
+                _write_atomically(output_folder, filename, lambda f: shutil.copyfileobj(source, f))
+        return filename
+
+    filename = logo_variant_name(digest, 1, 'png')
+    if all(os.path.exists(os.path.join(output_folder, name)) for name in logo_files(filename)):
+        return filename
+
+    with Image.open(staged_path) as img:
+        img.load()
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA')
+        for scale in LOGO_SCALES:
+            variant = img.copy()
+            variant.thumbnail((LOGO_SIZE * scale, LOGO_SIZE * scale), Image.Resampling.LANCZOS)
+            for image_format, options in SAVE_OPTIONS.items():
+                _write_atomically(
+                    output_folder,
+                    logo_variant_name(digest, scale, image_format),
+                    lambda f: variant.save(f, format=image_format.upper(), **options)
+                )
+    return filename
+
+def _write_atomically(folder, filename, write):
+    fd, tmp_path = tempfile.mkstemp(dir=folder)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, os.path.join(folder, filename))
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+# ----- RELEASE A LOGO ----- #
+def release_topic_logo(filename):
+    """Delete a logo's files unless another topic still uses them."""
+    if filename and not TopicModel().logo_in_use(filename):
+        delete_topic_logo(filename)
+
+# ----- BACKGROUND PIPELINE ----- #
+class LogoPipeline:
+    """Processes staged logo uploads on a small thread pool.
+
+    The request only stages the upload and marks it pending on the topic;
+    a worker resizes it and then swaps it into logo_filename_<theme>.
+    """
+    def __init__(self, app, workers=2):
+        self.app = app
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='logo')
+        self._futures = set()
+        self._resumed = False
+        self._lock = threading.Lock()
+
+    def submit(self, topic_id, theme, staged_filename):
+        TopicModel().set_logo_pending(topic_id, theme, staged_filename)
+        future = self.executor.submit(self._run, topic_id, theme, staged_filename)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._discard)
+        return future
+
+    def resume(self):
+        """Queue uploads left pending by a previous process; runs once.
+
+        Every worker process resumes, so uploads are claimed first and each
+        is processed by only one of them.
+        """
+        with self._lock:
+            if self._resumed:
+                return
+            self._resumed = True
+        claim_timeout = self.app.config['LOGO_CLAIM_TIMEOUT']
+        for topic_id, theme, staged_filename in TopicModel().claim_pending_logos(claim_timeout):
+            future = self.executor.submit(self._run, topic_id, theme, staged_filename)
+            with self._lock:
+                self._futures.add(future)
+            future.add_done_callback(self._discard)
+
+    def wait(self):
+        """Block until every queued upload has been processed."""
+        with self._lock:
+            futures = list(self._futures)
+        for future in futures:
+            future.result()
+
+    def _discard(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def _run(self, topic_id, theme, staged_filename):
+        with self.app.app_context():
+            staged_path = os.path.join(staging_folder(), staged_filename)
+            try:
+                filename = process_logo(staged_path, logo_folder())
+            except Exception as e:
+                print(f"Error processing logo {staged_filename}: {e}")
+                filename = None
+
+            topic_model = TopicModel()
+            applied, previous = topic_model.finish_logo(topic_id, theme, staged_filename, filename)
+            if applied and previous != filename:
+                release_topic_logo(previous)
+            elif not applied and filename:
+                # Superseded before it finished; keep the files only if used
+                release_topic_logo(filename)
+
+            # The same staged file may be pending on another topic
+            still_pending = any(pending == staged_filename for _, _, pending in topic_model.get_pending_logos())
+            if not still_pending and os.path.exists(staged_path):
+                os.remove(staged_path)
+            return filename
+
+def init_app(app):
+    app.config.setdefault('LOGO_WORKERS', 2)
+    # Seconds before another process takes over an upload a worker claimed
+    app.config.setdefault('LOGO_CLAIM_TIMEOUT', 300)
+    app.config.setdefault('LOGO_STAGING_DIR', os.path.join(app.instance_path, 'logo_staging'))
+    pipeline = LogoPipeline(app, app.config['LOGO_WORKERS'])
+    app.extensions['logo_pipeline'] = pipeline
+
+    # The database may not be migrated yet when the app is created
+    @app.before_request
+    def resume_pending_logos():
+        if not pipeline._resumed:
+            try:
+                pipeline.resume()
+            except Exception as e:
+                print(f"Error resuming pending logos: {e}")
+
+def get_logo_pipeline():
+    return current_app.extensions['logo_pipeline']
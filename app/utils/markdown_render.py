@@ -0,0 +1,71 @@
+import hashlib
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from blinker import Namespace
+import markdown
+
+MARKDOWN_EXTENSIONS = ['fenced_code', 'tables', 'toc']
+
+# Bump whenever MARKDOWN_EXTENSIONS or their options change, so stored HTML
+# no longer matches and gets re-rendered (see rerender_markdown.py).
+RENDER_VERSION = 1
+
+# Below this many documents a process pool costs more than it saves
+BULK_MIN_DOCUMENTS = 64
+
+_local = threading.local()
+
+# Sent after each document, for the request metrics in instrumentation.py
+_signals = Namespace()
+markdown_rendered = _signals.signal('markdown-rendered')
+
+# ----- PER-THREAD RENDERER ----- #
+def get_renderer():
+    """Markdown instance for this thread, built once and reset between documents.
+
+    markdown.Markdown is not thread-safe, so each thread keeps its own.
+    """
+    renderer = getattr(_local, 'renderer', None)
+    if renderer is None or _local.version != RENDER_VERSION:
+        renderer = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+        _local.renderer = renderer
+        _local.version = RENDER_VERSION
+    return renderer
+
+# ----- RENDER MARKDOWN ----- #
+def render_markdown(text):
+    if not text:
+        return ""
+    start = time.perf_counter()
+    html = get_renderer().reset().convert(text)
+    if markdown_rendered.receivers:
+        markdown_rendered.send(None, elapsed=time.perf_counter() - start)
+    return html
+
+# ----- RENDER MANY DOCUMENTS ----- #
+def render_many(texts, workers=None, chunksize=32):
+    """Render a batch of markdown strings, across a process pool when it pays off.
+
+    Returns the HTML in the same order as texts. workers=1 forces in-process
+    rendering; None lets the pool use every CPU.
+    """
+    texts = list(texts)
+    if workers == 1 or len(texts) < BULK_MIN_DOCUMENTS:
+        return [render_markdown(text) for text in texts]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(render_markdown, texts, chunksize=chunksize))
+
+# ----- CACHE KEY FOR RENDERED HTML ----- #
+def render_key(text):
+    config = f"{RENDER_VERSION}:{','.join(MARKDOWN_EXTENSIONS)}"
+    return hashlib.sha256(f"{config}\0{text or ''}".encode()).hexdigest()
+
+# ----- HTML FOR AN ITEM ----- #
+def item_html(item):
+    """Stored HTML when it is current for the item's markdown, else render now."""
+    html = getattr(item, 'rendered_html', None)
+    if html is not None and getattr(item, 'rendered_key', None) == render_key(item.markdown_content):
+        return html
+    return render_markdown(item.markdown_content)
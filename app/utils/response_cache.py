@@ -0,0 +1,184 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from datetime import datetime, timezone
+from functools import wraps
+from flask import current_app, request, session, make_response
+from flask_login import current_user
+from app.models.database import content_generation
+from app.utils.cache import LRUCache
+from app.utils import invalidation
+from app.utils.compression import compressed_variants, negotiate_encoding
+
+# ----- CACHED RESPONSE ----- #
+class CachedResponse:
+    def __init__(self, body, mimetype, last_modified, generation, compressed=None):
+        self.body = body
+        self.mimetype = mimetype
+        self.last_modified = last_modified
+        self.generation = generation
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        # Content-Encoding -> compressed body, so hits don't recompress
+        self.compressed = compressed or {}
+
+# ----- IN-MEMORY BACKEND ----- #
+class MemoryBackend:
+    def __init__(self, maxsize=256):
+        self._cache = LRUCache(maxsize)
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, entry):
+        self._cache.set(key, entry)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
+
+# ----- FILESYSTEM BACKEND ----- #
+class FileSystemBackend:
+    """One pickle file per key; writes go through a temp file and os.replace."""
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(repr(key).encode()).hexdigest())
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError):
+            return None
+
+    def set(self, key, entry):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(entry, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"Error writing response cache entry: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def clear(self):
+        # Every worker clears the shared directory; tolerate losing the race
+        for name in os.listdir(self.directory):
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        return {'size': len(os.listdir(self.directory))}
+
+# ----- RESPONSE CACHE ----- #
+class ResponseCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, generation):
+        entry = self.backend.get(key)
+        if entry is None or entry.generation != generation:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def set(self, key, entry):
+        self.backend.set(key, entry)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        return {**self.backend.stats(), 'hits': self.hits, 'misses': self.misses}
+
+def init_app(app):
+    app.config.setdefault('RESPONSE_CACHE_BACKEND', 'memory')
+    app.config.setdefault('RESPONSE_CACHE_SIZE', 256)
+    app.config.setdefault('RESPONSE_CACHE_DIR', os.path.join(app.instance_path, 'page_cache'))
+
+    if app.config['RESPONSE_CACHE_BACKEND'] == 'filesystem':
+        backend = FileSystemBackend(app.config['RESPONSE_CACHE_DIR'])
+    elif app.config['RESPONSE_CACHE_BACKEND'] == 'memory':
+        backend = MemoryBackend(app.config['RESPONSE_CACHE_SIZE'])
+    else:
+        raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {app.config['RESPONSE_CACHE_BACKEND']!r}")
+
+    cache = ResponseCache(backend)
+    app.extensions['response_cache'] = cache
+    invalidation.register(lambda version: cache.clear(), app)
+
+# ----- PARSE SQLITE TIMESTAMP ----- #
+def parse_timestamp(value):
+    """SQLite CURRENT_TIMESTAMP strings are UTC 'YYYY-MM-DD HH:MM:SS'."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+    except (TypeError, ValueError):
+        return None
+
+def _is_cacheable_request():
+    # Pages for logged-in users or with pending flash messages differ per visitor
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if session.get('_flashes'):
+        return False
+    return not current_user.is_authenticated
+
+# ----- CACHED PAGE DECORATOR ----- #
+def cached_page(view):
+    """Serve a public page from the response cache with ETag/Last-Modified.
+
+    Entries are keyed by endpoint and view arguments and stay valid until the
+    content generation changes, so a conditional GET that matches a cached
+    entry is answered with 304 without calling the view. The view may set
+    response.last_modified. Entries keep gzip/brotli copies of the body,
+    which are sent as is to clients that accept them.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not _is_cacheable_request():
+            return view(*args, **kwargs)
+
+        cache = current_app.extensions['response_cache']
+        key = (request.endpoint, tuple(sorted(kwargs.items())))
+        generation = content_generation()
+
+        entry = cache.get(key, generation)
+        if entry is None:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            body = response.get_data()
+            compressed = {}
+            if current_app.config['COMPRESS_RESPONSES']:
+                compressed = compressed_variants(body, response.mimetype, current_app.config['COMPRESS_MIN_SIZE'])
+            entry = CachedResponse(body, response.mimetype, response.last_modified, generation, compressed)
+            cache.set(key, entry)
+
+        encoding = negotiate_encoding(request.headers.get('Accept-Encoding'))
+        if encoding in entry.compressed:
+            response = current_app.response_class(entry.compressed[encoding], mimetype=entry.mimetype)
+            response.headers['Content-Encoding'] = encoding
+            # Same weak ETag the compression middleware gives compressed bodies
+            response.set_etag(entry.etag, weak=True)
+        else:
+            response = current_app.response_class(entry.body, mimetype=entry.mimetype)
+            response.set_etag(entry.etag)
+        if entry.compressed:
+            response.vary.add('Accept-Encoding')
+        response.last_modified = entry.last_modified
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
+    return wrapper
@@ -1,7 +1,17 @@
 import os
-from PIL import Image
-from flask import current_app
-import uuid
+import re
+import hashlib
+import tempfile
+from flask import current_app, url_for
+
+# Logos are named after the first characters of the upload's SHA-256, so
+# identical uploads end up in the same files
+LOGO_HASH_LENGTH = 16
+HASHED_LOGO_RE = re.compile(r'^([0-9a-f]{%d})\.(png|svg)$' % LOGO_HASH_LENGTH)
+
+# Raster logos get one file per scale and format (see app/utils/logo_pipeline.py)
+LOGO_SCALES = (1, 2, 3)
+LOGO_FORMATS = ('png', 'webp')
 
 def allowed_file(filename, allowed_extensions=None):
     if allowed_extensions is None:
@@ -9,52 +19,88 @@ def allowed_file(filename, allowed_extensions=None):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in allowed_extensions
 
-def save_topic_logo(file, upload_folder=None):
+def logo_folder():
+    return os.path.join(current_app.root_path, 'static', 'uploads', 'logos')
+
+def staging_folder():
+    return current_app.config['LOGO_STAGING_DIR']
+
+def logo_variant_name(digest, scale, extension):
+    suffix = '' if scale == 1 else f'@{scale}x'
+    return f"{digest}{suffix}.{extension}"
+
+# ----- STAGE AN UPLOAD ----- #
+def stage_topic_logo(file, upload_folder=None):
+    """Store an upload untouched for the logo pipeline; returns the staged filename.
+
+    Nothing is decoded here, so the request doesn't wait for PIL.
+    """
     if upload_folder is None:
-        upload_folder = os.path.join(current_app.root_path, 'static', 'uploads', 'logos')
-    
-    # Create upload directory if it doesn't exist
+        upload_folder = staging_folder()
+
+    if not (file and allowed_file(file.filename)):
+        return None
+
     os.makedirs(upload_folder, exist_ok=True)
-    
-    if file and allowed_file(file.filename):
-        # Generate unique filename
-        file_ext = file.filename.rsplit('.', 1)[1].lower()
-        filename = f"{uuid.uuid4().hex}.{file_ext}"
+    file_ext = file.filename.rsplit('.', 1)[1].lower()
+
+    try:
+        data = file.read()
+        filename = f"{hashlib.sha256(data).hexdigest()[:LOGO_HASH_LENGTH]}.{file_ext}"
         filepath = os.path.join(upload_folder, filename)
-        
-        try:
-            # Handle different image types
-            if file_ext != 'svg':
-                # Open and process image
-                img = Image.open(file.stream)
-                
-                # Resize image (max 64x64 pixels like quickref.me)
-                img.thumbnail((64, 64), Image.Resampling.LANCZOS)
-                
-                # Save processed image
-                img.save(filepath, optimize=True, quality=85)
-            else:
-                # For SVG, just save as-is
-                file.save(filepath)
-            
-            return filename
-        except Exception as e:
-            print(f"Error processing image: {e}")
-            return None
-    
-    return None
+        if not os.path.exists(filepath):
+            fd, tmp_path = tempfile.mkstemp(dir=upload_folder)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, filepath)
+        return filename
+    except Exception as e:
+        print(f"Error staging logo: {e}")
+        return None
+
+# ----- LOGO FILES ----- #
+def logo_files(filename):
+    """Every file that belongs to a logo: all variants for pipeline output."""
+    match = HASHED_LOGO_RE.match(filename or '')
+    if not match or match.group(2) == 'svg':
+        return [filename] if filename else []
+    return [
+        logo_variant_name(match.group(1), scale, extension)
+        for extension in LOGO_FORMATS
+        for scale in LOGO_SCALES
+    ]
+
+def logo_sources(filename):
+    """URLs for a logo <img>/<picture>: src, plus srcsets when variants exist."""
+    if not filename:
+        return None
+
+    def url(name):
+        return url_for('static', filename='uploads/logos/' + name)
+
+    sources = {'src': url(filename), 'srcset': None, 'webp_srcset': None}
+    match = HASHED_LOGO_RE.match(filename)
+    if match and match.group(2) == 'png':
+        digest = match.group(1)
+        for extension, key in (('png', 'srcset'), ('webp', 'webp_srcset')):
+            sources[key] = ', '.join(
+                f"{url(logo_variant_name(digest, scale, extension))} {scale}x"
+                for scale in LOGO_SCALES
+            )
+    return sources
 
 def delete_topic_logo(filename, upload_folder=None):
     if upload_folder is None:
-        upload_folder = os.path.join(current_app.root_path, 'static', 'uploads', 'logos')
-    
-    if filename:
-        filepath = os.path.join(upload_folder, filename)
+        upload_folder = logo_folder()
+
+    deleted = False
+    for name in logo_files(filename):
+        filepath = os.path.join(upload_folder, name)
         try:
             if os.path.exists(filepath):
                 os.remove(filepath)
-                return True
+                deleted = True
         except Exception as e:
             print(f"Error deleting logo: {e}")
-    
-    return False
\ No newline at end of file
+
+    return deleted
@@ -0,0 +1,164 @@
+"""Seeded synthetic corpus, written through the app's models.
+
+The same --seed and sizes always produce the same categories, topics,
+sections and items, so timings from different commits are comparable.
+
+    python -m benchmarks.corpus --database /tmp/bench/site.db --topics 200
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.models.category import CategoryModel
+from app.models.database import transaction
+from app.models.schema import Schema
+from app.models.section import SectionModel
+from app.models.section_item import SectionItemModel
+from app.models.topic import TopicModel
+
+WORDS = [
+    'array', 'async', 'branch', 'buffer', 'cache', 'channel', 'class', 'closure',
+    'commit', 'config', 'container', 'cursor', 'decorator', 'deploy', 'dict',
+    'docker', 'error', 'event', 'export', 'fetch', 'filter', 'format', 'function',
+    'generator', 'git', 'hash', 'header', 'import', 'index', 'iterator', 'join',
+    'json', 'kernel', 'lambda', 'list', 'loop', 'merge', 'module', 'mutex',
+    'network', 'object', 'package', 'parser', 'pipe', 'pointer', 'process',
+    'promise', 'python', 'query', 'queue', 'rebase', 'regex', 'request', 'route',
+    'schema', 'select', 'server', 'shell', 'signal', 'socket', 'sort', 'stash',
+    'stream', 'string', 'struct', 'template', 'thread', 'token', 'tuple', 'type',
+    'update', 'vector', 'volume', 'worker', 'yield',
+]
+
+LANGUAGES = ['python', 'javascript', 'bash', 'sql', 'go', 'rust']
+CARD_SIZES = ['small', 'normal', 'normal', 'normal', 'wide', 'stretch']
+BOOKMARK_COLORS = ['#3b82f6', '#ef4444', '#10b981', '#f59e0b', '#8b5cf6']
+
+# Share of topics left unpublished, like drafts on the real site
+UNPUBLISHED_RATIO = 0.05
+
+# ----- MARKDOWN ----- #
+def phrase(rng, low=2, high=5):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+def sentence(rng):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(6, 14))]
+    words[rng.randrange(len(words))] = f'`{rng.choice(WORDS)}()`'
+    words[rng.randrange(len(words))] = f'**{rng.choice(WORDS)}**'
+    return ' '.join(words).capitalize() + '.'
+
+def code_block(rng):
+    language = rng.choice(LANGUAGES)
+    lines = []
+    for n in range(rng.randint(3, 12)):
+        indent = '    ' * rng.randint(0, 2)
+        lines.append(f'{indent}{rng.choice(WORDS)}_{n} = {rng.choice(WORDS)}({rng.choice(WORDS)}, {n})')
+    return f'```{language}\n' + '\n'.join(lines) + '\n```'
+
+def table(rng):
+    columns = rng.randint(2, 4)
+    header = ['Option', 'Default', 'Description', 'Since'][:columns]
+    rows = [
+        ['`--' + rng.choice(WORDS) + '`', str(rng.randint(0, 100)), phrase(rng, 3, 7), f'v{rng.randint(1, 9)}.{rng.randint(0, 20)}'][:columns]
+        for _ in range(rng.randint(2, 8))
+    ]
+    lines = ['| ' + ' | '.join(header) + ' |', '|' + '---|' * columns]
+    lines.extend('| ' + ' | '.join(row) + ' |' for row in rows)
+    return '\n'.join(lines)
+
+def bullet_list(rng):
+    return '\n'.join(f'- {sentence(rng)}' for _ in range(rng.randint(2, 6)))
+
+def item_markdown(rng):
+    """A cheatsheet card: a heading, then a mix of prose, code, tables and lists."""
+    blocks = [f'### {phrase(rng).title()}', sentence(rng)]
+    for _ in range(rng.randint(1, 4)):
+        kind = rng.random()
+        if kind < 0.4:
+            blocks.append(code_block(rng))
+        elif kind < 0.6:
+            blocks.append(table(rng))
+        elif kind < 0.8:
+            blocks.append(bullet_list(rng))
+        else:
+            blocks.append(' '.join(sentence(rng) for _ in range(rng.randint(1, 4))))
+    return '\n\n'.join(blocks)
+
+# ----- CORPUS ----- #
+def generate_corpus(categories=5, topics=50, sections=8, items=10, seed=1):
+    """Fill the app's database; needs an app context. Returns the row counts.
+
+    Sections and items per topic vary around the given averages.
+    """
+    rng = random.Random(seed)
+    category_model = CategoryModel()
+    topic_model = TopicModel()
+    section_model = SectionModel()
+    item_model = SectionItemModel()
+
+    category_ids = [category_model.create(f'{phrase(rng, 1, 2).title()} {n}') for n in range(categories)]
+    counts = {'categories': len(category_ids), 'topics': 0, 'sections': 0, 'items': 0}
+
+    for t in range(topics):
+        # One commit per topic keeps the generator fast without one huge transaction
+        with transaction():
+            title = f'{phrase(rng, 1, 3).title()} {t}'
+            topic_id = topic_model.create_topic(
+                f"{title.lower().replace(' ', '-')}",
+                title,
+                sentence(rng),
+                1,
+                category_ids[t % len(category_ids)],
+                rng.random() >= UNPUBLISHED_RATIO,
+            )
+            counts['topics'] += 1
+            for s in range(max(1, rng.randint(sections // 2, sections * 3 // 2))):
+                section_id = section_model.create_section(phrase(rng, 1, 3).title(), topic_id, s)
+                counts['sections'] += 1
+                for i in range(max(1, rng.randint(items // 2, items * 3 // 2))):
+                    item_model.create_item(
+                        phrase(rng, 1, 4).title(),
+                        section_id,
+                        item_markdown(rng),
+                        i,
+                        rng.choice(CARD_SIZES),
+                        rng.choice(BOOKMARK_COLORS),
+                    )
+                    counts['items'] += 1
+    return counts
+
+def build_database(path, categories=5, topics=50, sections=8, items=10, seed=1):
+    """Create a fresh database at path holding the seeded corpus."""
+    if os.path.exists(path):
+        raise FileExistsError(f"{path} already exists; the corpus needs an empty database")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    app = create_app({'DATABASE': path})
+    with app.app_context():
+        Schema().init_db()
+        counts = generate_corpus(categories, topics, sections, items, seed)
+    app.extensions['db_pool'].close_all()
+    return counts
+
+def add_corpus_arguments(parser):
+    parser.add_argument('--categories', type=int, default=5)
+    parser.add_argument('--topics', type=int, default=50)
+    parser.add_argument('--sections', type=int, default=8, help='average sections per topic')
+    parser.add_argument('--items', type=int, default=10, help='average items per section')
+    parser.add_argument('--seed', type=int, default=1)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database', required=True, help='path of the new site.db')
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+
+    counts = build_database(args.database, args.categories, args.topics, args.sections, args.items, args.seed)
+    print(json.dumps(counts, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+"""Concurrent readers, searchers and admin writers against a multi-process server.
+
+Forks --workers processes that each serve the app with werkzeug's threaded
+server on one shared listening socket, the way a preforking server would.
+A pool of --clients threads then sends a weighted mix of requests for
+--seconds:
+
+    read    GET /<topic_slug> (and now and then /)
+    search  GET /search/query
+    write   admin section/item reorders and item edits
+
+The JSON report gives throughput, latency percentiles and error rates per
+kind. "database is locked" is counted twice: from responses that mention
+it, and from the workers' own output, since most views only print the
+error and return a generic failure.
+
+    python -m benchmarks.load --workers 4 --clients 32 --seconds 20
+    python -m benchmarks.load --mix read=50,search=30,write=20 --busy-timeout 100
+"""
+import argparse
+import http.client
+import json
+import logging
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode
+
+from werkzeug.serving import make_server
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from benchmarks.corpus import add_corpus_arguments, build_database, item_markdown
+from benchmarks.routes import SEARCH_QUERIES, load_targets, percentile, rotated
+
+LOCKED_MESSAGE = b'database is locked'
+
+# ----- SERVER ----- #
+def app_config(database, run_dir, busy_timeout):
+    config = {'DATABASE': database, 'LOGO_STAGING_DIR': os.path.join(run_dir, 'logo_staging')}
+    if busy_timeout is not None:
+        config['DB_PRAGMAS'] = {'busy_timeout': busy_timeout}
+    return config
+
+def serve(fd, host, config, log_path):
+    """Worker process: serve the app on the inherited listening socket."""
+    # Views report errors with print(); keep them for counting afterwards
+    log = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND)
+    os.dup2(log, 1)
+    os.dup2(log, 2)
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    app = create_app(config)
+    server = make_server(host, 0, app, threaded=True, fd=fd)
+    server.serve_forever()
+
+def start_server(workers, host, config, run_dir):
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((host, 0))
+    listener.listen(128)
+    listener.set_inheritable(True)
+
+    context = multiprocessing.get_context('fork')
+    processes = []
+    for n in range(workers):
+        log_path = os.path.join(run_dir, f'worker-{n}.log')
+        process = context.Process(target=serve, args=(listener.fileno(), host, config, log_path), daemon=True)
+        process.start()
+        processes.append(process)
+    return listener, processes
+
+def wait_until_ready(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            status, _, _ = send(host, port, 'GET', '/')
+            if status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise TimeoutError('Server workers did not start')
+
+def stop_server(listener, processes):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
+    listener.close()
+
+def count_locked_messages(run_dir, workers):
+    total = 0
+    for n in range(workers):
+        with open(os.path.join(run_dir, f'worker-{n}.log'), 'rb') as f:
+            total += f.read().count(LOCKED_MESSAGE)
+    return total
+
+# ----- CLIENT ----- #
+def send(host, port, method, path, cookie=None, form=None, json_body=None, timeout=30):
+    """One request on a fresh connection, so the kernel spreads them over workers."""
+    headers = {'Connection': 'close'}
+    body = None
+    if cookie:
+        headers['Cookie'] = cookie
+    if form is not None:
+        body = urlencode(form)
+        headers['Content-Type'] = 'application/x-www-form-urlencoded'
+    elif json_body is not None:
+        body = json.dumps(json_body)
+        headers['Content-Type'] = 'application/json'
+
+    conn = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        return response.status, response.getheader('Set-Cookie'), response.read()
+    finally:
+        conn.close()
+
+def admin_cookie(host, port):
+    status, set_cookie, _ = send(host, port, 'POST', '/auth/login', form={'username': 'admin', 'password': 'admin123'})
+    if status != 302 or not set_cookie:
+        raise RuntimeError('Could not log in as admin')
+    return set_cookie.split(';', 1)[0]
+
+def operations(targets, cookie):
+    """Kind -> function from (rng, n) to a request and its success check."""
+    def ok_json(status, body):
+        return status == 200 and json.loads(body).get('success') is True
+
+    def read(rng, n):
+        path = '/' if n % 5 == 0 else '/' + rng.choice(targets['slugs'])
+        return {'method': 'GET', 'path': path}, lambda status, body: status == 200
+
+    def search(rng, n):
+        query = urlencode({'q': rng.choice(SEARCH_QUERIES)})
+        return {'method': 'GET', 'path': f'/search/query?{query}'}, lambda status, body: status == 200
+
+    def write(rng, n):
+        kind = n % 3
+        if kind == 0:
+            topic_id, ids = rng.choice(targets['topic_sections'])
+            return {'method': 'POST', 'path': '/admin/api/sections/reorder', 'cookie': cookie,
+                    'json_body': {'topic_id': topic_id, 'order': rotated(ids, n)}}, ok_json
+        section_id, ids = rng.choice(targets['section_items'])
+        if kind == 1:
+            return {'method': 'POST', 'path': '/admin/api/items/reorder', 'cookie': cookie,
+                    'json_body': {'section_id': section_id, 'order': rotated(ids, n)}}, ok_json
+        # A successful edit redirects back to the sections page
+        form = {'title': f'Edited {n}', 'markdown_content': item_markdown(rng), 'card_size': 'normal', 'bookmark_color': '#3b82f6'}
+        return {'method': 'POST', 'path': f'/admin/item/{rng.choice(ids)}/edit', 'cookie': cookie, 'form': form}, \
+            lambda status, body: status == 302
+
+    return {'read': read, 'search': search, 'write': write}
+
+def client_loop(host, port, mix, ops, seed, stop, records):
+    rng = random.Random(seed)
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    n = 0
+    while not stop.is_set():
+        kind = rng.choices(kinds, weights)[0]
+        request, succeeded = ops[kind](rng, n)
+        start = time.perf_counter()
+        try:
+            status, _, body = send(host, port, **request)
+            if LOCKED_MESSAGE in body:
+                outcome = 'locked'
+            else:
+                outcome = 'ok' if succeeded(status, body) else 'error'
+        except (OSError, http.client.HTTPException, ValueError):
+            outcome = 'error'
+        records.append((kind, time.perf_counter() - start, outcome))
+        n += 1
+
+# ----- REPORT ----- #
+def summarize(records, seconds):
+    latencies = sorted(latency for _, latency, _ in records)
+    outcomes = [outcome for _, _, outcome in records]
+    count = len(records)
+    return {
+        'requests': count,
+        'requests_per_sec': round(count / seconds, 1),
+        'errors': outcomes.count('error'),
+        'locked': outcomes.count('locked'),
+        'error_rate': round(outcomes.count('error') / count, 4) if count else None,
+        'locked_rate': round(outcomes.count('locked') / count, 4) if count else None,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2) if count else None,
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2) if count else None,
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2) if count else None,
+        'max_ms': round(latencies[-1] * 1000, 2) if count else None,
+    }
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        kind, _, weight = part.partition('=')
+        kind = kind.strip()
+        if kind not in ('read', 'search', 'write'):
+            raise argparse.ArgumentTypeError(f"unknown request kind: {kind!r}")
+        try:
+            mix[kind] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid weight for {kind}: {weight!r}")
+    if not any(weight > 0 for weight in mix.values()):
+        raise argparse.ArgumentTypeError('the mix needs at least one positive weight')
+    return {kind: weight for kind, weight in mix.items() if weight > 0}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database', help='existing corpus database (default: build a fresh one)')
+    add_corpus_arguments(parser)
+    parser.add_argument('--workers', type=int, default=4, help='server processes')
+    parser.add_argument('--clients', type=int, default=32, help='concurrent client threads')
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('read=70,search=25,write=5'),
+                        help='relative weights, e.g. read=70,search=25,write=5')
+    parser.add_argument('--busy-timeout', type=int, help='override the busy_timeout pragma (ms) in the workers')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--output', help='also write the report to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as run_dir:
+        database = args.database
+        corpus = None
+        if database is None:
+            database = os.path.join(run_dir, 'site.db')
+            corpus = build_database(database, args.categories, args.topics, args.sections, args.items, args.seed)
+
+        config = app_config(database, run_dir, args.busy_timeout)
+        app = create_app(config)
+        targets = load_targets(app)
+        # No open connections may be inherited by the forked workers
+        app.extensions['db_pool'].close_all()
+
+        listener, processes = start_server(args.workers, args.host, config, run_dir)
+        port = listener.getsockname()[1]
+        try:
+            wait_until_ready(args.host, port)
+            ops = operations(targets, admin_cookie(args.host, port))
+
+            stop = threading.Event()
+            records = []
+            threads = [
+                threading.Thread(target=client_loop, args=(args.host, port, args.mix, ops, args.seed + n, stop, records))
+                for n in range(args.clients)
+            ]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            time.sleep(args.seconds)
+            stop.set()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            stop_server(listener, processes)
+
+        server_locked = count_locked_messages(run_dir, args.workers)
+
+    report = {
+        'meta': {
+            'workers': args.workers,
+            'clients': args.clients,
+            'seconds': args.seconds,
+            'mix': args.mix,
+            'busy_timeout': args.busy_timeout,
+            'corpus': corpus,
+        },
+        'kinds': {kind: summarize([r for r in records if r[0] == kind], elapsed) for kind in args.mix},
+        'total': summarize(records, elapsed),
+        'server_locked_messages': server_locked,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Per-call Markdown construction vs the pooled renderer vs bulk rendering.
+
+    python -m benchmarks.markdown_render --documents 2000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import markdown
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.utils.markdown_render import MARKDOWN_EXTENSIONS, render_markdown, render_many
+
+SAMPLE = '''## Usage {n}
+
+Run `tool --flag {n}` to get started.
+
+```python
+def handler_{n}(event):
+    return {{"status": {n}}}
+```
+
+| Option | Default | Description |
+|--------|---------|-------------|
+| `-v`   | off     | verbose output |
+| `-n`   | {n}     | number of runs |
+
+- first point
+- second point with **bold** text
+'''
+
+def timed(label, func, texts):
+    start = time.perf_counter()
+    output = func(texts)
+    elapsed = time.perf_counter() - start
+    return label, output, {
+        'seconds': round(elapsed, 4),
+        'docs_per_sec': round(len(texts) / elapsed, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--documents', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    texts = [SAMPLE.format(n=n) for n in range(args.documents)]
+    render_markdown(texts[0])  # build the thread's renderer outside the timing
+
+    runs = [
+        timed('per_call_construction', lambda ts: [markdown.markdown(t, extensions=MARKDOWN_EXTENSIONS) for t in ts], texts),
+        timed('pooled_renderer', lambda ts: [render_markdown(t) for t in ts], texts),
+        timed('bulk_process_pool', lambda ts: render_many(ts, workers=args.workers), texts),
+    ]
+
+    baseline = runs[0][1]
+    results = {}
+    for label, output, stats in runs:
+        stats['identical_output'] = output == baseline
+        results[label] = stats
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+"""Latency, throughput and memory of the hot routes on a seeded corpus.
+
+Builds a corpus with benchmarks.corpus (or reuses --database), then drives
+the Flask test client through each route and prints one JSON report.
+Save a report with --output and check a later commit against it with
+--compare; routes whose p95 got more than --threshold slower are listed
+as regressions and the exit status is 1.
+
+    python -m benchmarks.routes --topics 100 --output before.json
+    python -m benchmarks.routes --topics 100 --compare before.json
+
+--cache cold empties the page and search caches before every request,
+to time the views themselves rather than cache hits.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.models.category import CategoryModel
+from app.models.section import SectionModel
+from app.models.section_item import SectionItemModel
+from app.models.topic import TopicModel
+from benchmarks.corpus import WORDS, add_corpus_arguments, build_database
+
+# Sidebar searches: whole words, prefixes as typed, typos and two-word queries
+SEARCH_QUERIES = WORDS[::3] + \
+    [word[:3] for word in WORDS[1::7]] + \
+    [word[:2] + word[3] + word[2] + word[4:] for word in WORDS[2::9] if len(word) > 4] + \
+    [f'{a} {b}' for a, b in zip(WORDS[::11], WORDS[5::11])]
+
+# Topics, sections and categories whose orderings the admin routes rotate
+REORDER_TARGETS = 20
+
+# ----- WHAT TO REQUEST ----- #
+def load_targets(app):
+    """Ids and slugs from the corpus for the routes to cycle through."""
+    with app.app_context():
+        topics = TopicModel().get_all()
+        published = [topic for topic in topics if topic.is_published]
+        section_model = SectionModel()
+        item_model = SectionItemModel()
+
+        topic_sections = []
+        section_items = []
+        for topic in published[:REORDER_TARGETS]:
+            sections = section_model.get_by_topic(topic.id)
+            topic_sections.append((topic.id, [section.id for section in sections]))
+            for section in sections[:2]:
+                section_items.append((section.id, [item.id for item in item_model.get_by_section(section.id)]))
+
+        category_topics = {}
+        for topic in topics:
+            category_topics.setdefault(topic.category_id, []).append(topic.id)
+
+        return {
+            'slugs': [topic.slug for topic in published],
+            'topic_sections': topic_sections,
+            'section_items': section_items,
+            'category_topics': list(category_topics.items())[:REORDER_TARGETS],
+            'categories': [category.id for category in CategoryModel().get_all()],
+        }
+
+def rotated(ids, n):
+    if not ids:
+        return ids
+    n %= len(ids)
+    return ids[n:] + ids[:n]
+
+def scenarios(targets):
+    """Route name -> (needs admin, function from iteration number to a request)."""
+    def reorder(url, parent_key, pairs):
+        def request(n):
+            parent_id, ids = pairs[n % len(pairs)]
+            return 'POST', url, {'json': {parent_key: parent_id, 'order': rotated(ids, n + 1)}}
+        return request
+
+    return {
+        'index': (False, lambda n: ('GET', '/', {})),
+        'cheatsheet': (False, lambda n: ('GET', '/' + targets['slugs'][n % len(targets['slugs'])], {})),
+        'search_topics': (False, lambda n: ('GET', '/search/topics', {})),
+        'search_query': (False, lambda n: ('GET', '/search/query', {'query_string': {'q': SEARCH_QUERIES[n % len(SEARCH_QUERIES)]}})),
+        'admin_reorder_categories': (True, lambda n: ('POST', '/admin/api/categories/reorder', {'json': {'order': rotated(targets['categories'], n + 1)}})),
+        'admin_reorder_topics': (True, reorder('/admin/api/topics/reorder', 'category_id', targets['category_topics'])),
+        'admin_reorder_sections': (True, reorder('/admin/api/sections/reorder', 'topic_id', targets['topic_sections'])),
+        'admin_reorder_items': (True, reorder('/admin/api/items/reorder', 'section_id', targets['section_items'])),
+    }
+
+# ----- MEASURE ----- #
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    # Rank is ceil(fraction * n); rounding first keeps 0.95 * 100 from becoming 96
+    rank = math.ceil(round(fraction * len(sorted_values), 9))
+    index = max(0, min(len(sorted_values) - 1, rank - 1))
+    return sorted_values[index]
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def run_route(app, client, make_request, requests, warmup, cold):
+    for n in range(warmup):
+        method, url, kwargs = make_request(n)
+        client.open(url, method=method, **kwargs)
+
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for n in range(warmup, warmup + requests):
+        method, url, kwargs = make_request(n)
+        if cold:
+            app.extensions['response_cache'].clear()
+            app.extensions['search_cache'].clear()
+        start = time.perf_counter()
+        response = client.open(url, method=method, **kwargs)
+        latencies.append(time.perf_counter() - start)
+        # The admin APIs report failures as 200 with success: false
+        data = response.get_json() if response.is_json else None
+        if response.status_code >= 400 or (isinstance(data, dict) and data.get('success') is False):
+            errors += 1
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': requests,
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+        'requests_per_sec': round(requests / elapsed, 1),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(report, baseline, threshold):
+    """p95 of each route against a saved report; slower than 1+threshold is a regression."""
+    comparison = {}
+    for name, result in report['routes'].items():
+        previous = baseline.get('routes', {}).get(name)
+        if not previous or not previous.get('p95_ms'):
+            continue
+        ratio = result['p95_ms'] / previous['p95_ms']
+        comparison[name] = {
+            'baseline_p95_ms': previous['p95_ms'],
+            'p95_ms': result['p95_ms'],
+            'ratio': round(ratio, 3),
+            'regression': ratio > 1 + threshold,
+        }
+    return comparison
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database', help='existing corpus database (default: build a fresh one)')
+    add_corpus_arguments(parser)
+    parser.add_argument('--requests', type=int, default=200, help='timed requests per route')
+    parser.add_argument('--warmup', type=int, default=20, help='untimed requests per route first')
+    parser.add_argument('--cache', choices=['warm', 'cold'], default='warm')
+    parser.add_argument('--routes', nargs='*', help='only these routes (default: all)')
+    parser.add_argument('--output', help='also write the report to this file')
+    parser.add_argument('--compare', help='report from an earlier run to compare p95 against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed p95 slowdown, as a fraction')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = args.database
+        corpus = None
+        if database is None:
+            database = os.path.join(tmp, 'site.db')
+            corpus = build_database(database, args.categories, args.topics, args.sections, args.items, args.seed)
+
+        app = create_app({'DATABASE': database, 'LOGO_STAGING_DIR': os.path.join(tmp, 'logo_staging')})
+        targets = load_targets(app)
+        routes = scenarios(targets)
+        unknown = set(args.routes or []) - set(routes)
+        if unknown:
+            parser.error(f"unknown route(s): {', '.join(sorted(unknown))}")
+
+        public_client = app.test_client()
+        admin_client = app.test_client()
+        admin_client.post('/auth/login', data={'username': 'admin', 'password': 'admin123'})
+
+        results = {}
+        # Reads first: every write invalidates the caches the reads use
+        for name, (needs_admin, make_request) in routes.items():
+            if args.routes and name not in args.routes:
+                continue
+            client = admin_client if needs_admin else public_client
+            results[name] = run_route(app, client, make_request, args.requests, args.warmup, args.cache == 'cold')
+        app.extensions['db_pool'].close_all()
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'cache': args.cache,
+            'seed': args.seed,
+            'corpus': corpus,
+            'requests': args.requests,
+            'warmup': args.warmup,
+        },
+        'routes': results,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            report['comparison'] = compare(report, json.load(f), args.threshold)
+        regressions = [name for name, result in report['comparison'].items() if result['regression']]
+        report['regressions'] = regressions
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    sys.exit(1 if regressions else 0)
+
+if __name__ == '__main__':
+    main()
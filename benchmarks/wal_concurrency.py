@@ -0,0 +1,139 @@
+"""Read throughput while admin writes run alongside.
+
+Runs the same reader/writer mix against two pragma profiles: SQLite's
+defaults (rollback journal) and the app's DEFAULT_PRAGMAS (WAL). Readers
+issue the queries behind /<topic_slug> and /search/query; the writer keeps
+updating items and topic timestamps the way admin.edit_item does.
+
+    python -m benchmarks.wal_concurrency --readers 8 --seconds 5
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.models.database import DEFAULT_PRAGMAS, connect
+from app.models.schema import Schema
+
+PROFILES = {
+    'rollback-journal': {'journal_mode': 'DELETE', 'synchronous': 'FULL', 'foreign_keys': 'ON'},
+    'default': DEFAULT_PRAGMAS,
+}
+
+# ----- BUILD A SMALL CORPUS ----- #
+def build_database(path, topics, sections, items):
+    app = create_app({'DATABASE': path})
+    with app.app_context():
+        Schema().create_tables()
+    app.extensions['db_pool'].close_all()
+
+    conn = connect(path)
+    conn.execute("INSERT INTO user (username, email, password_hash) VALUES ('bench', 'bench@example.com', '')")
+    conn.execute("INSERT INTO category (name) VALUES ('Bench')")
+    for t in range(topics):
+        cur = conn.execute(
+            'INSERT INTO topic (slug, title, description, category_id, user_id, is_published) VALUES (?, ?, ?, 1, 1, 1)',
+            (f'topic-{t}', f'Topic {t}', f'Description {t}')
+        )
+        topic_id = cur.lastrowid
+        for s in range(sections):
+            cur = conn.execute(
+                'INSERT INTO section (title, display_order, topic_id) VALUES (?, ?, ?)',
+                (f'Section {s}', s, topic_id)
+            )
+            section_id = cur.lastrowid
+            conn.executemany(
+                'INSERT INTO section_item (title, markdown_content, display_order, section_id) VALUES (?, ?, ?, ?)',
+                [(f'Item {i}', f'Some `code` number {i}\n' * 20, i, section_id) for i in range(items)]
+            )
+    conn.commit()
+    conn.close()
+
+# ----- WORKERS ----- #
+def reader(path, pragmas, topics, stop, stats):
+    conn = connect(path, pragmas)
+    n = 0
+    while not stop.is_set():
+        slug = f'topic-{n % topics}'
+        try:
+            topic = conn.execute('SELECT * FROM topic WHERE slug = ? AND is_published = 1', (slug,)).fetchone()
+            sections = conn.execute('SELECT * FROM section WHERE topic_id = ? ORDER BY display_order, id', (topic['id'],)).fetchall()
+            for section in sections:
+                conn.execute('SELECT * FROM section_item WHERE section_id = ? ORDER BY display_order, id', (section['id'],)).fetchall()
+            stats['reads'] += 1
+        except sqlite3.OperationalError:
+            stats['read_errors'] += 1
+        n += 1
+    conn.close()
+
+def writer(path, pragmas, stop, stats, hold):
+    conn = connect(path, pragmas)
+    n = 0
+    while not stop.is_set():
+        try:
+            conn.execute(
+                'UPDATE section_item SET markdown_content = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+                (f'edit {n}\n' * 50, n % 50 + 1)
+            )
+            conn.execute('UPDATE topic SET updated_at = CURRENT_TIMESTAMP WHERE id = 1')
+            time.sleep(hold)  # keep the write transaction open like a slow request would
+            conn.commit()
+            stats['writes'] += 1
+        except sqlite3.OperationalError:
+            conn.rollback()
+            stats['write_errors'] += 1
+        n += 1
+    conn.close()
+
+def run_profile(path, pragmas, readers, seconds, topics, hold):
+    stop = threading.Event()
+    stats = {'reads': 0, 'read_errors': 0, 'writes': 0, 'write_errors': 0}
+    reader_stats = [dict(stats) for _ in range(readers)]
+
+    # journal_mode is persistent, so switch the file before starting workers
+    connect(path, pragmas).close()
+
+    threads = [threading.Thread(target=reader, args=(path, pragmas, topics, stop, s)) for s in reader_stats]
+    threads.append(threading.Thread(target=writer, args=(path, pragmas, stop, stats, hold)))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    for s in reader_stats:
+        stats['reads'] += s['reads']
+        stats['read_errors'] += s['read_errors']
+    stats['reads_per_sec'] = round(stats['reads'] / seconds, 1)
+    stats['writes_per_sec'] = round(stats['writes'] / seconds, 1)
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--topics', type=int, default=20)
+    parser.add_argument('--sections', type=int, default=10)
+    parser.add_argument('--items', type=int, default=10)
+    parser.add_argument('--hold', type=float, default=0.005, help='seconds each write transaction stays open')
+    args = parser.parse_args()
+
+    results = {}
+    for name, pragmas in PROFILES.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bench.db')
+            build_database(path, args.topics, args.sections, args.items)
+            results[name] = run_profile(path, pragmas, args.readers, args.seconds, args.topics, args.hold)
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
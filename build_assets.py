@@ -0,0 +1,37 @@
+"""Build the minified CSS/JS bundles the templates use when ASSET_BUNDLES is on.
+
+Bundles are defined in app/utils/bundles.py and written to app/static/dist
+together with a .gz copy of each, for nginx's gzip_static:
+
+    location /static/ {
+        alias /path/to/app/static/;
+        gzip_static on;
+    }
+
+Run it again after changing any stylesheet or script.
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from app.utils.bundles import BUNDLES, build_bundle
+
+STATIC_FOLDER = os.path.join(os.path.dirname(__file__), 'app', 'static')
+
+def build_assets(names=None):
+    print("Building asset bundles...")
+    for name in names or BUNDLES:
+        source_size, minified_size, gzip_size = build_bundle(name, STATIC_FOLDER)
+        print(f"  {name}: {source_size} -> {minified_size} bytes ({gzip_size} gzipped)")
+    print("Asset bundles built!")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Concatenate and minify CSS/JS into bundles.')
+    parser.add_argument('bundles', nargs='*', help=f"bundles to build (default: all of {', '.join(BUNDLES)})")
+    args = parser.parse_args()
+    unknown = [name for name in args.bundles if name not in BUNDLES]
+    if unknown:
+        parser.error(f"unknown bundle(s): {', '.join(unknown)}")
+    build_assets(args.bundles)
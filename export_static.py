@@ -0,0 +1,126 @@
+"""Export every published cheatsheet as static files nginx can serve directly.
+
+Output layout (for --output DIR):
+
+    DIR/index.html                 home page
+    DIR/<slug>/index.html          one page per published topic
+    DIR/search/topics.json         /search/topics payload
+    DIR/search/index.json          /search/index payload (client-side search)
+    DIR/search/topic/<id>.json     /search/topic/<id> payloads
+    DIR/static/...                 copy of app/static
+    DIR/manifest.json              slug -> updated_at of the last export
+
+A matching nginx location:
+
+    location / {
+        try_files $uri $uri/index.html $uri.json @app;
+    }
+
+With --incremental only topics whose updated_at differs from the manifest
+are rendered again; the home page, topic list and search index are always
+refreshed.
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from app import create_app
+from app.models.topic import TopicModel
+
+MANIFEST_NAME = 'manifest.json'
+
+_client = None
+
+# ----- WRITE A FILE ATOMICALLY ----- #
+def write_file(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+# ----- RENDER ONE URL ----- #
+def _init_worker(config):
+    global _client
+    _client = create_app(config).test_client()
+
+def fetch(url):
+    response = _client.get(url)
+    if response.status_code != 200:
+        raise RuntimeError(f"GET {url} returned {response.status_code}")
+    return response.get_data()
+
+def export_topic(output_dir, topic_id, slug):
+    write_file(os.path.join(output_dir, slug, 'index.html'), fetch(f'/{slug}'))
+    write_file(os.path.join(output_dir, 'search', 'topic', f'{topic_id}.json'), fetch(f'/search/topic/{topic_id}'))
+    return slug
+
+# ----- MANIFEST ----- #
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'topics': {}}
+
+def export_static(output_dir, incremental=False, workers=None, copy_static=True, database=None):
+    config = {'DATABASE': database} if database else None
+    app = create_app(config)
+    with app.app_context():
+        topics = TopicModel().get_all_published()
+
+    manifest = load_manifest(output_dir) if incremental else {'topics': {}}
+    previous = manifest.get('topics', {})
+    current = {topic.slug: {'id': topic.id, 'updated_at': topic.updated_at} for topic in topics}
+
+    changed = [
+        topic for topic in topics
+        if previous.get(topic.slug) != current[topic.slug]
+        or not os.path.exists(os.path.join(output_dir, topic.slug, 'index.html'))
+    ]
+    removed = [slug for slug in previous if slug not in current]
+
+    print(f"Exporting {len(changed)} of {len(topics)} topic(s) to {output_dir}...")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config,)) as pool:
+        # Pages that list every topic are refreshed on every run
+        shared = {
+            'index.html': pool.submit(fetch, '/'),
+            os.path.join('search', 'topics.json'): pool.submit(fetch, '/search/topics'),
+            os.path.join('search', 'index.json'): pool.submit(fetch, '/search/index'),
+        }
+        exports = [pool.submit(export_topic, output_dir, topic.id, topic.slug) for topic in changed]
+
+        for relative_path, future in shared.items():
+            write_file(os.path.join(output_dir, relative_path), future.result())
+        for future in exports:
+            print(f"  /{future.result()}")
+
+    for slug in removed:
+        shutil.rmtree(os.path.join(output_dir, slug), ignore_errors=True)
+        topic_json = os.path.join(output_dir, 'search', 'topic', f"{previous[slug]['id']}.json")
+        if os.path.exists(topic_json):
+            os.remove(topic_json)
+        print(f"  removed /{slug}")
+
+    if copy_static:
+        shutil.copytree(app.static_folder, os.path.join(output_dir, 'static'), dirs_exist_ok=True)
+
+    write_file(os.path.join(output_dir, MANIFEST_NAME), json.dumps({'topics': current}, indent=2).encode())
+    print("Static export complete!")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export published cheatsheets as static files.')
+    parser.add_argument('--output', default=os.path.join(os.path.dirname(__file__), 'instance', 'static_site'))
+    parser.add_argument('--incremental', action='store_true', help='only re-export topics changed since the last manifest')
+    parser.add_argument('--workers', type=int, help='render processes (default: one per CPU)')
+    parser.add_argument('--no-static', action='store_true', help='do not copy app/static into the export')
+    parser.add_argument('--database', help='path to site.db (default: instance/site.db)')
+    args = parser.parse_args()
+    export_static(args.output, incremental=args.incremental, workers=args.workers,
+                  copy_static=not args.no_static, database=args.database)
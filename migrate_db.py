@@ -0,0 +1,29 @@
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from app.models.migrations import Migrations
+
+def migrate_database(check_plans=False):
+    migrations = Migrations()
+    print(f"Schema version: {migrations.current_version()}")
+    applied = migrations.migrate()
+    if not applied:
+        print("Database is up to date.")
+
+    if check_plans:
+        problems = migrations.check_query_plans()
+        for name, detail in problems:
+            print(f"Full table scan in {name}: {detail}")
+        if problems:
+            sys.exit(1)
+        print("No hot query scans a table.")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Apply pending schema migrations.')
+    parser.add_argument('--check-plans', action='store_true',
+                        help='fail if a hot query falls back to a full table scan')
+    args = parser.parse_args()
+    migrate_database(check_plans=args.check_plans)
@@ -0,0 +1,23 @@
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from app import create_app
+from app.models.section_item import SectionItemModel
+
+def rerender_markdown(force=False, topic_id=None, workers=None):
+    print("Re-rendering markdown...")
+    app = create_app()
+    with app.app_context():
+        count = SectionItemModel().rerender_all(force=force, topic_id=topic_id, workers=workers)
+    print(f"Re-rendered {count} item(s).")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Refresh the stored HTML of every section item.')
+    parser.add_argument('--force', action='store_true', help='re-render items whose stored HTML is already current')
+    parser.add_argument('--topic-id', type=int, help='only re-render items of this topic')
+    parser.add_argument('--workers', type=int, help='render processes (default: one per CPU, 1 = in-process)')
+    args = parser.parse_args()
+    rerender_markdown(force=args.force, topic_id=args.topic_id, workers=args.workers)
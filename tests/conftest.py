@@ -0,0 +1,89 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.models.category import CategoryModel
+from app.models.schema import Schema
+from app.models.section import SectionModel
+from app.models.section_item import SectionItemModel
+from app.models.topic import TopicModel
+
+# ----- APP ON A TEMPORARY DATABASE ----- #
+def make_app(tmp_path, **config):
+    return create_app({
+        'TESTING': True,
+        'DATABASE': str(tmp_path / 'site.db'),
+        'LOGO_STAGING_DIR': str(tmp_path / 'logo_staging'),
+        'RESPONSE_CACHE_DIR': str(tmp_path / 'page_cache'),
+        **config,
+    })
+
+def close_app(app):
+    app.extensions['logo_pipeline'].wait()
+    app.extensions['db_pool'].close_all()
+
+@pytest.fixture
+def app_config():
+    """Extra config for the app fixture; override in a test module."""
+    return {}
+
+@pytest.fixture
+def app(tmp_path, app_config):
+    app = make_app(tmp_path, **app_config)
+    with app.app_context():
+        Schema().init_db()
+    yield app
+    close_app(app)
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def admin_client(app):
+    client = app.test_client()
+    response = client.post('/auth/login', data={'username': 'admin', 'password': 'admin123'})
+    assert response.status_code == 302
+    return client
+
+# ----- CONTENT ----- #
+class ContentFactory:
+    """Creates categories, topics, sections and items through the models."""
+    def __init__(self, app):
+        self.app = app
+        self.count = 0
+
+    def category(self, name=None):
+        self.count += 1
+        with self.app.app_context():
+            return CategoryModel().create(name or f'Category {self.count}')
+
+    def topic(self, title=None, description='', published=True, category_id=None, slug=None):
+        self.count += 1
+        title = title or f'Topic {self.count}'
+        if category_id is None:
+            category_id = self.category()
+        with self.app.app_context():
+            return TopicModel().create_topic(
+                slug or f'topic-{self.count}', title, description, 1, category_id, published
+            )
+
+    def section(self, topic_id, title=None, display_order=0):
+        self.count += 1
+        with self.app.app_context():
+            return SectionModel().create_section(title or f'Section {self.count}', topic_id, display_order)
+
+    def item(self, section_id, title=None, markdown_content='', display_order=0):
+        self.count += 1
+        with self.app.app_context():
+            return SectionItemModel().create_item(
+                title or f'Item {self.count}', section_id, markdown_content, display_order
+            )
+
+@pytest.fixture
+def content(app):
+    return ContentFactory(app)
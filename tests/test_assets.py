@@ -0,0 +1,43 @@
+import os
+import re
+
+from app.utils.assets import AssetManifest, ONE_YEAR
+
+def stylesheet_urls(client):
+    return re.findall(r'href="(/static/css/[^"]+)"', client.get('/').get_data(as_text=True))
+
+# ----- FINGERPRINTED URLS ----- #
+def test_pages_link_assets_with_their_content_hash(app, client):
+    urls = stylesheet_urls(client)
+    assert urls
+    fingerprint = app.extensions['assets'].fingerprint('css/base.css')
+    assert f'/static/css/base.css?v={fingerprint}' in urls
+
+def test_fingerprinted_urls_are_cached_as_immutable(client):
+    response = client.get(stylesheet_urls(client)[0])
+    assert response.status_code == 200
+    assert response.cache_control.immutable
+    assert response.cache_control.max_age == ONE_YEAR
+    response.close()
+
+def test_stale_or_missing_fingerprints_are_not_immutable(client):
+    for url in ('/static/css/base.css', '/static/css/base.css?v=000000000000'):
+        response = client.get(url)
+        assert not response.cache_control.immutable
+        response.close()
+
+# ----- MANIFEST ----- #
+def test_manifest_rehashes_a_changed_file_when_asked(tmp_path):
+    (tmp_path / 'css').mkdir()
+    stylesheet = tmp_path / 'css' / 'site.css'
+    stylesheet.write_text('a { color: red; }')
+    manifest = AssetManifest(str(tmp_path)).build()
+    before = manifest.fingerprint('css/site.css')
+
+    stylesheet.write_text('a { color: blue; }')
+    os.utime(stylesheet, ns=(0, 1))
+    assert manifest.fingerprint('css/site.css') == before
+    assert manifest.fingerprint('css/site.css', check_mtime=True) != before
+
+def test_missing_files_have_no_fingerprint(tmp_path):
+    assert AssetManifest(str(tmp_path)).build().fingerprint('css/none.css') is None
@@ -0,0 +1,52 @@
+import argparse
+import random
+
+import pytest
+
+from benchmarks.corpus import build_database
+from benchmarks.load import operations, parse_mix, summarize
+from benchmarks.routes import load_targets
+from conftest import close_app, make_app
+
+# ----- REQUEST MIX ----- #
+def test_parse_mix_keeps_positive_weights():
+    assert parse_mix('read=70, search=25,write=0') == {'read': 70.0, 'search': 25.0}
+
+@pytest.mark.parametrize('text', ['read=1,upload=2', 'read=lots', 'read=0,write=0'])
+def test_parse_mix_rejects_bad_mixes(text):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix(text)
+
+# ----- REPORT ----- #
+def test_summarize_counts_outcomes_and_latencies():
+    records = [('read', n / 1000, 'ok') for n in range(1, 99)] + [('write', 0.5, 'locked'), ('write', 1.0, 'error')]
+    summary = summarize(records, seconds=10)
+    assert summary['requests'] == 100
+    assert summary['requests_per_sec'] == 10.0
+    assert summary['locked_rate'] == summary['error_rate'] == 0.01
+    assert summary['p50_ms'] == 50.0
+    assert summary['max_ms'] == 1000.0
+
+def test_summarize_handles_no_requests():
+    summary = summarize([], seconds=1)
+    assert summary['requests'] == 0
+    assert summary['p95_ms'] is None
+
+# ----- OPERATIONS ----- #
+def test_every_operation_succeeds_against_the_app(tmp_path):
+    build_database(str(tmp_path / 'site.db'), categories=2, topics=6, sections=2, items=2, seed=3)
+    app = make_app(tmp_path)
+    try:
+        client = app.test_client()
+        client.post('/auth/login', data={'username': 'admin', 'password': 'admin123'})
+        ops = operations(load_targets(app), cookie=None)
+        rng = random.Random(1)
+        for kind, make_request in ops.items():
+            # Writes cycle through three kinds of request
+            for n in range(3):
+                request, succeeded = make_request(rng, n)
+                response = client.open(request['path'], method=request['method'],
+                                       data=request.get('form'), json=request.get('json_body'))
+                assert succeeded(response.status_code, response.data), (kind, n)
+    finally:
+        close_app(app)
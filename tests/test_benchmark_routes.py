@@ -0,0 +1,64 @@
+import sqlite3
+
+import pytest
+
+from benchmarks.corpus import build_database
+from benchmarks.routes import compare, load_targets, percentile, run_route, scenarios
+from conftest import close_app, make_app
+
+# ----- PERCENTILES ----- #
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.95) == 95
+    assert percentile(values, 0.99) == 99
+    assert percentile(values, 1.0) == 100
+    assert percentile([7], 0.99) == 7
+    assert percentile([], 0.5) is None
+
+# ----- COMPARISON ----- #
+def test_compare_flags_p95_slowdowns_past_the_threshold():
+    report = {'routes': {'index': {'p95_ms': 13.0}, 'search_query': {'p95_ms': 11.0}, 'new': {'p95_ms': 1.0}}}
+    baseline = {'routes': {'index': {'p95_ms': 10.0}, 'search_query': {'p95_ms': 10.0}}}
+    comparison = compare(report, baseline, threshold=0.2)
+    assert comparison['index']['regression'] is True
+    assert comparison['index']['ratio'] == 1.3
+    assert comparison['search_query']['regression'] is False
+    # Routes missing from the baseline are not compared
+    assert 'new' not in comparison
+
+# ----- CORPUS ----- #
+def corpus_titles(path):
+    conn = sqlite3.connect(path)
+    try:
+        return [row[0] for row in conn.execute('SELECT title FROM section_item ORDER BY id')]
+    finally:
+        conn.close()
+
+def test_corpus_is_the_same_for_the_same_seed(tmp_path):
+    first = build_database(str(tmp_path / 'a.db'), categories=2, topics=4, sections=2, items=2, seed=7)
+    second = build_database(str(tmp_path / 'b.db'), categories=2, topics=4, sections=2, items=2, seed=7)
+    assert first == second
+    assert first['topics'] == 4
+    assert corpus_titles(tmp_path / 'a.db') == corpus_titles(tmp_path / 'b.db')
+
+def test_corpus_needs_an_empty_database(tmp_path):
+    (tmp_path / 'site.db').write_bytes(b'')
+    with pytest.raises(FileExistsError):
+        build_database(str(tmp_path / 'site.db'))
+
+# ----- ROUTES ----- #
+def test_every_route_runs_without_errors(tmp_path):
+    build_database(str(tmp_path / 'site.db'), categories=2, topics=6, sections=2, items=2, seed=3)
+    app = make_app(tmp_path)
+    try:
+        public_client = app.test_client()
+        admin_client = app.test_client()
+        admin_client.post('/auth/login', data={'username': 'admin', 'password': 'admin123'})
+        for name, (needs_admin, make_request) in scenarios(load_targets(app)).items():
+            client = admin_client if needs_admin else public_client
+            result = run_route(app, client, make_request, requests=3, warmup=1, cold=True)
+            assert result['errors'] == 0, name
+            assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+    finally:
+        close_app(app)
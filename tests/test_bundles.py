@@ -0,0 +1,66 @@
+import gzip
+import shutil
+import subprocess
+
+import pytest
+
+from app.utils.bundles import BUNDLES, BUNDLE_DIR, build_bundle, bundle_sources, minify_css, minify_js
+
+@pytest.fixture
+def static_copy(app, tmp_path):
+    # Bundles are built into a copy so the tree's static/dist is left alone
+    folder = tmp_path / 'static'
+    shutil.copytree(app.static_folder, folder, ignore=shutil.ignore_patterns(BUNDLE_DIR, 'uploads'))
+    return folder
+
+# ----- MINIFIERS ----- #
+def test_css_minifier_keeps_strings_and_descendant_pseudo_classes():
+    source = '/* note */\na  :hover {\n  content: "a  /* b */  c";\n  color: red;\n}\n'
+    assert minify_css(source) == 'a :hover{content:"a  /* b */  c";color:red}\n'
+
+def test_js_minifier_keeps_line_breaks_strings_templates_and_regexes():
+    source = '''
+        // comment
+        let a = 1
+        let b = "x // y"
+        const re = /\\/\\*[^/]*/g;
+        const t = `line ${ a + { b: 2 }.b } // not a comment`
+        return a
+            ++b
+    '''
+    minified = minify_js(source)
+    assert '// comment' not in minified
+    assert 'let a=1\nlet b="x // y"' in minified
+    assert 'const re=/\\/\\*[^/]*/g;' in minified
+    assert '`line ${ a + { b: 2 }.b } // not a comment`' not in minified
+    assert '// not a comment`' in minified
+    assert 'return a\n++b' in minified
+
+# ----- SOURCES ----- #
+def test_stylesheet_bundles_stand_for_the_files_they_import(app):
+    sources = bundle_sources('public.css', app.static_folder)
+    assert 'css/main.css' not in sources
+    assert sources[0] == 'css/base.css'
+
+# ----- BUILD ----- #
+@pytest.mark.parametrize('name', sorted(BUNDLES))
+def test_built_bundle_has_a_matching_gzip_copy(static_copy, name):
+    source_size, minified_size, gzip_size = build_bundle(name, str(static_copy))
+    data = (static_copy / BUNDLE_DIR / name).read_bytes()
+    compressed = (static_copy / BUNDLE_DIR / f'{name}.gz').read_bytes()
+    assert minified_size == len(data) < source_size
+    assert gzip_size == len(compressed)
+    assert gzip.decompress(compressed) == data
+
+def test_builds_are_byte_identical(static_copy):
+    build_bundle('public.js', str(static_copy))
+    first = (static_copy / BUNDLE_DIR / 'public.js.gz').read_bytes()
+    build_bundle('public.js', str(static_copy))
+    assert (static_copy / BUNDLE_DIR / 'public.js.gz').read_bytes() == first
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='node is not installed')
+@pytest.mark.parametrize('name', sorted(name for name in BUNDLES if name.endswith('.js')))
+def test_built_scripts_still_parse(static_copy, name):
+    build_bundle(name, str(static_copy))
+    result = subprocess.run(['node', '--check', str(static_copy / BUNDLE_DIR / name)], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,77 @@
+import gzip
+import json
+
+import pytest
+
+@pytest.fixture
+def page(content):
+    content.topic('Vim', description='Modal editing ' * 50, slug='vim')
+    return '/vim'
+
+GZIP = {'Accept-Encoding': 'gzip'}
+
+# ----- CACHED PAGES ----- #
+def test_cached_pages_are_served_precompressed(client, page):
+    plain = client.get(page)
+    compressed = client.get(page, headers=GZIP)
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+    assert gzip.decompress(compressed.data) == plain.data
+    assert compressed.headers['ETag'] == f"W/{plain.headers['ETag']}"
+
+@pytest.mark.parametrize('encoded', [True, False])
+def test_either_etag_revalidates_either_representation(client, page, encoded):
+    plain_etag = client.get(page).headers['ETag']
+    weak_etag = client.get(page, headers=GZIP).headers['ETag']
+    headers = dict(GZIP) if encoded else {}
+    for etag in (plain_etag, weak_etag):
+        response = client.get(page, headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+        assert 'Content-Encoding' not in response.headers
+
+# ----- MIDDLEWARE ----- #
+def many_topics(content, count=30):
+    category_id = content.category()
+    for n in range(count):
+        content.topic(f'Topic number {n}', description='A reasonably long description', category_id=category_id)
+
+def test_large_json_responses_are_compressed_with_a_weak_etag(client, content):
+    many_topics(content)
+    plain = client.get('/search/topics')
+    compressed = client.get('/search/topics', headers=GZIP)
+    assert 'Content-Encoding' not in plain.headers
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert int(compressed.headers['Content-Length']) == len(compressed.data)
+    assert json.loads(gzip.decompress(compressed.data)) == plain.get_json()
+    assert compressed.headers['ETag'].startswith('W/')
+    assert 'Accept-Ranges' not in compressed.headers
+
+    revalidated = client.get('/search/topics', headers={**GZIP, 'If-None-Match': compressed.headers['ETag']})
+    assert revalidated.status_code == 304
+
+def test_small_responses_are_left_alone(client, content):
+    content.topic('Tiny')
+    response = client.get('/search/topics', headers=GZIP)
+    assert 'Content-Encoding' not in response.headers
+
+def test_streamed_responses_are_not_buffered(client, content):
+    many_topics(content)
+    response = client.get('/search/query?q=topic&format=ndjson', headers=GZIP)
+    assert 'Content-Encoding' not in response.headers
+    assert len(response.data.splitlines()) > 1
+
+def test_head_requests_are_not_compressed(client, content):
+    many_topics(content)
+    response = client.head('/search/topics', headers=GZIP)
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+@pytest.mark.parametrize('accept, expected', [
+    ('gzip;q=0', None),
+    ('identity', None),
+    ('deflate, gzip;q=0.5', 'gzip'),
+])
+def test_accept_encoding_is_negotiated(client, content, accept, expected):
+    many_topics(content)
+    response = client.get('/search/topics', headers={'Accept-Encoding': accept})
+    assert response.headers.get('Content-Encoding') == expected
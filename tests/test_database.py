@@ -0,0 +1,90 @@
+import sqlite3
+
+import pytest
+
+from app.models.category import CategoryModel
+from app.models.database import ConnectionPool, DBConnection, connect, get_db, transaction
+
+def category_names(app):
+    # A separate connection only sees committed rows
+    conn = connect(app.config['DATABASE'])
+    try:
+        return {row['name'] for row in conn.execute('SELECT name FROM category')}
+    finally:
+        conn.close()
+
+# ----- NESTED SCOPES ----- #
+def test_nested_scopes_share_one_connection(app):
+    with app.app_context():
+        with DBConnection() as outer:
+            with DBConnection() as inner:
+                assert inner.connection is outer.connection is get_db()
+
+def test_nested_scopes_commit_when_the_outermost_exits(app):
+    with app.app_context():
+        with transaction():
+            CategoryModel().create('Inner')
+            # The model's own scope has exited, but the outer one is still open
+            assert 'Inner' not in category_names(app)
+        assert 'Inner' in category_names(app)
+
+def test_error_in_a_nested_scope_rolls_back_the_whole_transaction(app):
+    with app.app_context():
+        with pytest.raises(RuntimeError):
+            with transaction():
+                CategoryModel().create('First')
+                with DBConnection():
+                    raise RuntimeError('boom')
+        assert 'First' not in category_names(app)
+
+        # The next scope on the same connection starts clean
+        CategoryModel().create('Second')
+    assert 'Second' in category_names(app)
+
+# ----- POOL ----- #
+def test_connection_returns_to_the_pool_after_an_error(app):
+    pool = app.extensions['db_pool']
+
+    @app.route('/_fail')
+    def fail():
+        get_db()
+        raise RuntimeError('boom')
+
+    client = app.test_client()
+    with pytest.raises(RuntimeError):
+        client.get('/_fail')
+    assert pool._in_use == 0
+    assert len(pool._idle) >= 1
+
+def test_released_connection_is_rolled_back_and_reused(app):
+    pool = app.extensions['db_pool']
+    conn = pool.acquire()
+    conn.execute("INSERT INTO category (name) VALUES ('Uncommitted')")
+    pool.release(conn)
+
+    assert pool.acquire() is conn
+    assert not conn.in_transaction
+    assert 'Uncommitted' not in category_names(app)
+    pool.release(conn)
+
+def test_pool_blocks_then_times_out_when_exhausted(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'pool.db'), size=1, acquire_timeout=0.05)
+    conn = pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is conn
+    pool.release(conn)
+    pool.close_all()
+
+def test_idle_connections_past_the_timeout_are_closed(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'pool.db'), size=2, idle_timeout=0.01)
+    conn = pool.acquire()
+    pool.release(conn)
+    pool._idle = [(conn, 0)]
+    fresh = pool.acquire()
+    assert fresh is not conn
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute('SELECT 1')
+    pool.release(fresh)
+    pool.close_all()
@@ -0,0 +1,46 @@
+import json
+import os
+
+from export_static import export_static
+from app.models.database import get_db
+
+def export(app, output_dir, incremental=False):
+    app.extensions['db_pool'].close_all()
+    export_static(str(output_dir), incremental=incremental, workers=1, copy_static=False,
+                  database=app.config['DATABASE'])
+
+def test_exports_published_topics_and_search_payloads(app, content, tmp_path):
+    topic_id = content.topic('Git', slug='git')
+    content.topic('Draft', slug='draft', published=False)
+    output = tmp_path / 'site'
+    export(app, output)
+
+    assert b'Git' in (output / 'git' / 'index.html').read_bytes()
+    assert not (output / 'draft').exists()
+    assert (output / 'index.html').exists()
+    topics = json.loads((output / 'search' / 'topics.json').read_text())
+    assert [topic['slug'] for topic in topics['topics']] == ['git']
+    index = json.loads((output / 'search' / 'index.json').read_text())
+    assert index['available']
+    assert [topic[1] for topic in index['topics']] == ['git']
+    assert json.loads((output / 'search' / 'topic' / f'{topic_id}.json').read_text())['topic']['id'] == topic_id
+    assert set(json.loads((output / 'manifest.json').read_text())['topics']) == {'git'}
+
+def test_incremental_export_skips_unchanged_and_removes_unpublished(app, content, tmp_path, capsys):
+    content.topic('Git', slug='git')
+    bash_id = content.topic('Bash', slug='bash')
+    output = tmp_path / 'site'
+    export(app, output)
+    git_page = output / 'git' / 'index.html'
+    os.utime(git_page, (0, 0))
+
+    with app.app_context():
+        get_db().execute('UPDATE topic SET is_published = 0 WHERE id = ?', (bash_id,))
+        get_db().commit()
+    capsys.readouterr()
+    export(app, output, incremental=True)
+
+    assert 'Exporting 0 of 1 topic(s)' in capsys.readouterr().out
+    assert os.stat(git_page).st_mtime == 0
+    assert not (output / 'bash').exists()
+    assert not (output / 'search' / 'topic' / f'{bash_id}.json').exists()
@@ -0,0 +1,44 @@
+import pytest
+
+from app.models.database import connection_opened, query_executed
+from app.utils.markdown_render import markdown_rendered
+from conftest import close_app, make_app
+
+SIGNALS = (connection_opened, query_executed, markdown_rendered)
+
+# ----- SERVER-TIMING ----- #
+def test_server_timing_is_off_for_visitors_by_default(client):
+    assert 'Server-Timing' not in client.get('/').headers
+
+def test_admins_get_server_timing(admin_client):
+    timing = admin_client.get('/admin/').headers['Server-Timing']
+    assert timing.startswith('app;dur=')
+    assert 'queries' in timing
+
+@pytest.mark.parametrize('app_config', [{'SERVER_TIMING': True}])
+def test_server_timing_flag_sends_it_to_everyone(client):
+    assert 'Server-Timing' in client.get('/').headers
+
+# ----- SIGNAL RECEIVERS ----- #
+def test_creating_apps_does_not_add_receivers(tmp_path):
+    before = [len(signal.receivers) for signal in SIGNALS]
+    for n in range(3):
+        (tmp_path / str(n)).mkdir()
+        app = make_app(tmp_path / str(n))
+        close_app(app)
+    assert [len(signal.receivers) for signal in SIGNALS] == before
+
+def test_queries_are_counted_for_the_app_that_ran_them(app, client, tmp_path):
+    (tmp_path / 'other').mkdir()
+    other = make_app(tmp_path / 'other')
+    try:
+        client.get('/search/topics')
+        assert 'lookup_db_queries_total{endpoint="search.get_all_topics"}' in app.extensions['metrics'].render()
+        assert 'search.get_all_topics' not in other.extensions['metrics'].render()
+    finally:
+        close_app(other)
+
+@pytest.mark.parametrize('app_config', [{'SLOW_QUERY_THRESHOLD': 0}])
+def test_slow_queries_are_counted(app, client):
+    client.get('/search/topics')
+    assert app.extensions['metrics'].slow_queries > 0
@@ -0,0 +1,53 @@
+import pytest
+
+from app.models.topic import TopicModel
+from conftest import close_app, make_app
+
+@pytest.fixture
+def other_app(app, tmp_path):
+    # A second worker process on the same database
+    other = make_app(tmp_path)
+    yield other
+    close_app(other)
+
+def rename_topic(app, topic_id, title):
+    with app.app_context():
+        topic = TopicModel().get_by_id(topic_id)
+        TopicModel().update_topic(topic_id, topic.slug, title, '', topic.category_id, True)
+
+def test_write_in_one_instance_invalidates_the_others(app, other_app, content):
+    topic_id = content.topic('Before', slug='shared')
+    reader = app.test_client()
+
+    assert b'Before' in reader.get('/shared').data
+    assert reader.get('/search/topics').get_json()['topics'][0]['title'] == 'Before'
+    assert reader.get('/search/query?q=after').get_json()['results'] == []
+
+    rename_topic(other_app, topic_id, 'After')
+
+    assert b'After' in reader.get('/shared').data
+    assert reader.get('/search/topics').get_json()['topics'][0]['title'] == 'After'
+    assert [r['topic']['id'] for r in reader.get('/search/query?q=after').get_json()['results']] == [topic_id]
+
+def test_callbacks_run_once_per_version_change(app, content):
+    versions = []
+    app.extensions['invalidation'].register(versions.append)
+    client = app.test_client()
+
+    client.get('/')
+    client.get('/')
+    assert versions == []
+
+    content.topic()
+    client.get('/')
+    client.get('/')
+    assert len(versions) == 1
+
+def test_content_version_counts_writes_from_any_connection(app, content):
+    from app.models.database import connect, _read_content_version
+
+    conn = connect(app.config['DATABASE'])
+    before = _read_content_version(conn)
+    content.topic()
+    assert _read_content_version(conn) > before
+    conn.close()
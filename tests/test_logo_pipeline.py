@@ -0,0 +1,68 @@
+import io
+import os
+
+from PIL import Image
+
+from app.models.database import transaction
+from app.models.topic import TopicModel
+
+def png_upload(name='logo.png', color='red'):
+    data = io.BytesIO()
+    Image.new('RGB', (200, 200), color).save(data, format='PNG')
+    data.seek(0)
+    return data, name
+
+def staged_files(app):
+    folder = app.config['LOGO_STAGING_DIR']
+    return os.listdir(folder) if os.path.isdir(folder) else []
+
+def topic_form(slug, **fields):
+    return {'slug': slug, 'title': 'Title', 'description': '', 'category_id': '1', **fields}
+
+def set_pending(app, topic_id, staged_filename, claimed_at=None):
+    with app.app_context():
+        with transaction() as cursor:
+            cursor.execute(
+                'UPDATE topic SET logo_pending_light = ?, logo_claimed_light = ? WHERE id = ?',
+                (staged_filename, claimed_at, topic_id)
+            )
+
+# ----- STAGING ----- #
+def test_failed_create_leaves_nothing_staged(app, admin_client, content):
+    content.topic(slug='taken')
+    response = admin_client.post('/admin/topic/new', data=topic_form('taken', logo_light=png_upload()),
+                                 content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert staged_files(app) == []
+
+def test_uploaded_logo_is_processed_and_unstaged(app, admin_client, content, monkeypatch, tmp_path):
+    monkeypatch.setattr('app.utils.logo_pipeline.logo_folder', lambda: str(tmp_path / 'logos'))
+    content.category()
+    response = admin_client.post('/admin/topic/new', data=topic_form('fresh', is_published='on', logo_light=png_upload()),
+                                 content_type='multipart/form-data')
+    assert response.status_code == 302
+    app.extensions['logo_pipeline'].wait()
+
+    with app.app_context():
+        topic = TopicModel().get_by_slug('fresh')
+    assert topic.logo_filename_light.endswith('.png')
+    assert topic.logo_pending_light is None
+    assert staged_files(app) == []
+    assert topic.logo_filename_light in os.listdir(tmp_path / 'logos')
+
+# ----- CLAIMS ----- #
+def test_each_pending_upload_is_claimed_once(app, content):
+    topic_id = content.topic()
+    set_pending(app, topic_id, 'abc.png')
+
+    with app.app_context():
+        assert TopicModel().claim_pending_logos(300) == [(topic_id, 'light', 'abc.png')]
+        # Another worker resuming right after gets nothing
+        assert TopicModel().claim_pending_logos(300) == []
+
+def test_stale_claims_are_taken_over(app, content):
+    topic_id = content.topic()
+    set_pending(app, topic_id, 'abc.png', claimed_at='2000-01-01 00:00:00')
+
+    with app.app_context():
+        assert TopicModel().claim_pending_logos(300) == [(topic_id, 'light', 'abc.png')]
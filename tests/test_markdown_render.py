@@ -0,0 +1,21 @@
+import threading
+
+from app.utils import markdown_render
+from app.utils.markdown_render import render_many, render_markdown
+
+def test_reused_renderer_does_not_leak_state_between_documents():
+    first = render_markdown('## Heading\n\n[link][ref]\n\n[ref]: https://example.com')
+    second = render_markdown('[link][ref]')
+    assert 'href="https://example.com"' in first
+    assert 'href' not in second
+
+def test_each_thread_gets_its_own_renderer():
+    renderers = []
+    thread = threading.Thread(target=lambda: renderers.append(markdown_render.get_renderer()))
+    thread.start()
+    thread.join()
+    assert renderers[0] is not markdown_render.get_renderer()
+
+def test_bulk_rendering_keeps_the_input_order():
+    texts = [f'item {n}' for n in range(markdown_render.BULK_MIN_DOCUMENTS + 6)]
+    assert render_many(texts, workers=2) == [f'<p>item {n}</p>' for n in range(len(texts))]
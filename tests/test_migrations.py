@@ -0,0 +1,149 @@
+import sqlite3
+
+import pytest
+
+from app.models.database import hash_password
+from app.models.migrations import MIGRATIONS, Migrations
+from conftest import close_app, make_app
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+# Tables as the first release's init_db.py created them
+BASELINE_SCHEMA = '''
+    CREATE TABLE user (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        is_admin BOOLEAN DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE category (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL,
+        display_order INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE topic (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        slug TEXT UNIQUE NOT NULL,
+        title TEXT NOT NULL,
+        description TEXT,
+        category_id INTEGER NOT NULL,
+        display_order INTEGER DEFAULT 0,
+        is_published BOOLEAN DEFAULT 0,
+        user_id INTEGER NOT NULL,
+        card_color_light TEXT DEFAULT '#ffffff',
+        card_color_dark TEXT DEFAULT '#1a1a1a',
+        logo_filename_light TEXT,
+        logo_filename_dark TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES user (id),
+        FOREIGN KEY (category_id) REFERENCES category (id)
+    );
+    CREATE TABLE section (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        display_order INTEGER DEFAULT 0,
+        topic_id INTEGER NOT NULL,
+        FOREIGN KEY (topic_id) REFERENCES topic (id) ON DELETE CASCADE
+    );
+    CREATE TABLE section_item (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        markdown_content TEXT NOT NULL,
+        display_order INTEGER DEFAULT 0,
+        card_size TEXT DEFAULT 'normal',
+        bookmark_color TEXT DEFAULT '#3b82f6',
+        section_id INTEGER NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (section_id) REFERENCES section (id) ON DELETE CASCADE
+    );
+'''
+
+@pytest.fixture
+def baseline_db(tmp_path):
+    conn = sqlite3.connect(tmp_path / 'site.db')
+    conn.executescript(BASELINE_SCHEMA)
+    conn.execute(
+        "INSERT INTO user (username, email, password_hash, is_admin) VALUES ('admin', 'admin@example.com', ?, 1)",
+        (hash_password('admin123'),)
+    )
+    conn.execute("INSERT INTO category (name) VALUES ('Tools')")
+    conn.execute('''
+        INSERT INTO topic (slug, title, description, category_id, user_id, is_published)
+        VALUES ('git', 'Git', 'Version control', 1, 1, 1)
+    ''')
+    conn.execute("INSERT INTO section (title, topic_id) VALUES ('Branches', 1)")
+    conn.execute("INSERT INTO section_item (title, markdown_content, section_id) VALUES ('Rebase', 'git rebase --interactive', 1)")
+    conn.commit()
+    conn.close()
+    return tmp_path
+
+# ----- FRESH DATABASE ----- #
+def test_init_db_applies_every_migration(app):
+    with app.app_context():
+        assert Migrations().current_version() == LATEST_VERSION
+        assert Migrations().migrate() == []
+
+def test_hot_queries_use_indexes(app):
+    with app.app_context():
+        assert Migrations().check_query_plans() == []
+
+# ----- UPGRADE FROM THE FIRST RELEASE ----- #
+@pytest.mark.parametrize('backend', ['engine', 'fts'])
+def test_baseline_database_is_migrated_on_startup(baseline_db, backend):
+    app = make_app(baseline_db, SEARCH_BACKEND=backend)
+    try:
+        with app.app_context():
+            assert Migrations().current_version() == LATEST_VERSION
+            assert Migrations().check_query_plans() == []
+
+        client = app.test_client()
+        assert client.get('/').status_code == 200
+        page = client.get('/git')
+        assert page.status_code == 200
+        assert b'git rebase --interactive' in page.data
+
+        results = client.get('/search/query?q=rebase').get_json()['results']
+        assert [result['topic']['slug'] for result in results] == ['git']
+    finally:
+        close_app(app)
+
+def test_upgraded_database_tracks_new_writes(baseline_db):
+    app = make_app(baseline_db)
+    try:
+        admin = app.test_client()
+        admin.post('/auth/login', data={'username': 'admin', 'password': 'admin123'})
+        etag = app.test_client().get('/git').headers['ETag']
+
+        response = admin.post('/admin/item/1/edit', data={
+            'title': 'Rebase', 'markdown_content': 'git rebase --onto', 'card_size': 'normal',
+            'bookmark_color': '#3b82f6'
+        })
+        assert response.status_code == 302
+
+        page = app.test_client().get('/git')
+        assert page.headers['ETag'] != etag
+        assert b'git rebase --onto' in page.data
+    finally:
+        close_app(app)
+
+def test_auto_migrate_can_be_turned_off(baseline_db):
+    app = make_app(baseline_db, AUTO_MIGRATE=False)
+    try:
+        with app.app_context():
+            assert Migrations().current_version() == 0
+    finally:
+        close_app(app)
+
+def test_empty_database_is_left_for_init_db(tmp_path):
+    app = make_app(tmp_path)
+    try:
+        with app.app_context():
+            assert not Migrations().has_schema()
+            assert Migrations().current_version() == 0
+    finally:
+        close_app(app)
@@ -0,0 +1,66 @@
+import pytest
+
+from app.models import ordering
+from app.models.category import CategoryModel
+from app.models.section import SectionModel
+
+@pytest.fixture(params=[True, False], ids=['set-based', 'per-row'])
+def reorder_mode(request, monkeypatch):
+    # False stands in for an SQLite without UPDATE ... FROM or JSON1
+    monkeypatch.setattr(ordering, '_set_based_supported', request.param)
+    return request.param
+
+@pytest.fixture
+def topics(content):
+    first = content.topic()
+    second = content.topic()
+    return {
+        first: [content.section(first, display_order=n) for n in range(3)],
+        second: [content.section(second, display_order=n) for n in range(2)],
+    }
+
+def section_order(app, topic_id):
+    with app.app_context():
+        return [section.id for section in SectionModel().get_by_topic(topic_id)]
+
+def reorder_sections(client, topic_id, order):
+    response = client.post('/admin/api/sections/reorder', json={'topic_id': topic_id, 'order': order})
+    assert response.status_code == 200
+    return response.get_json()
+
+def test_reorder_applies_the_new_positions(app, admin_client, topics, reorder_mode):
+    topic_id, section_ids = next(iter(topics.items()))
+    new_order = list(reversed(section_ids))
+    assert reorder_sections(admin_client, topic_id, new_order) == {'success': True}
+    assert section_order(app, topic_id) == new_order
+
+def test_ids_of_another_parent_are_rejected(app, admin_client, topics, reorder_mode):
+    (topic_id, own_ids), (_, foreign_ids) = topics.items()
+    result = reorder_sections(admin_client, topic_id, [foreign_ids[0], *reversed(own_ids)])
+    assert result['success'] is False
+    assert 'not section rows' in result['error']
+    # Nothing was written, not even the valid ids
+    assert section_order(app, topic_id) == own_ids
+
+@pytest.mark.parametrize('order', [['x'], [1, 1]])
+def test_invalid_orderings_are_rejected(app, admin_client, topics, reorder_mode, order):
+    topic_id, section_ids = next(iter(topics.items()))
+    assert reorder_sections(admin_client, topic_id, order)['success'] is False
+    assert section_order(app, topic_id) == section_ids
+
+def test_category_reorder_reports_failures(app, admin_client, content, reorder_mode):
+    category_ids = [content.category() for _ in range(3)]
+    response = admin_client.post('/admin/api/categories/reorder', json={'order': [*category_ids, 999]})
+    assert response.get_json()['success'] is False
+    assert 'not category rows' in response.get_json()['error']
+
+    new_order = list(reversed(category_ids))
+    response = admin_client.post('/admin/api/categories/reorder', json={'order': new_order})
+    assert response.get_json() == {'success': True}
+    with app.app_context():
+        assert [category.id for category in CategoryModel().get_all()] == new_order
+
+def test_reorder_needs_an_admin(client, topics):
+    topic_id, section_ids = next(iter(topics.items()))
+    response = client.post('/admin/api/sections/reorder', json={'topic_id': topic_id, 'order': section_ids})
+    assert response.status_code == 302
@@ -0,0 +1,38 @@
+import pytest
+
+from app.models.database import apply_pragmas, connect, get_db
+
+@pytest.fixture
+def app_config():
+    return {'DB_PRAGMAS': {'busy_timeout': 250}}
+
+def pragma(conn, name):
+    return conn.execute(f'PRAGMA {name}').fetchone()[0]
+
+def test_pooled_connections_get_the_pragma_profile(app):
+    with app.app_context():
+        conn = get_db()
+        assert pragma(conn, 'journal_mode') == 'wal'
+        assert pragma(conn, 'foreign_keys') == 1
+        assert pragma(conn, 'synchronous') == 1
+        assert pragma(conn, 'temp_store') == 2
+        assert pragma(conn, 'cache_size') == -16000
+
+def test_db_pragmas_override_the_defaults(app):
+    with app.app_context():
+        assert pragma(get_db(), 'busy_timeout') == 250
+
+def test_foreign_key_cascades_are_enforced(app, content):
+    topic_id = content.topic()
+    content.item(content.section(topic_id))
+    with app.app_context():
+        conn = get_db()
+        conn.execute('DELETE FROM topic WHERE id = ?', (topic_id,))
+        assert conn.execute('SELECT COUNT(*) FROM section_item').fetchone()[0] == 0
+        conn.rollback()
+
+def test_pragma_names_are_validated(tmp_path):
+    conn = connect(str(tmp_path / 'site.db'), pragmas={})
+    with pytest.raises(ValueError):
+        apply_pragmas(conn, {'journal_mode = OFF; --': 1})
+    conn.close()
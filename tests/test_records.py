@@ -0,0 +1,36 @@
+import pytest
+
+from app.models.category import CategoryModel
+from app.models.records import Item, Topic
+from app.models.topic import TopicModel
+from app.models.user import UserModel
+
+def test_models_return_slotted_records(app, content):
+    topic_id = content.topic('Make')
+    content.item(content.section(topic_id))
+    with app.app_context():
+        topic = TopicModel().get_tree_by_id(topic_id)
+        category = CategoryModel().get_by_id(topic.category_id)
+
+    for record in (topic, topic.sections[0], topic.sections[0].items[0], category):
+        assert not hasattr(record, '__dict__')
+    assert topic.title == 'Make'
+    assert topic.category_name == category.name
+
+def test_unknown_attributes_are_rejected():
+    with pytest.raises(AttributeError):
+        Topic(id=1).colour = 'red'
+
+def test_fields_not_given_default_to_none():
+    item = Item(id=3, title='Grep')
+    assert item.markdown_content is None
+    assert item.snippet is None
+    assert repr(item) == '<Item id=3>'
+
+def test_users_still_log_in(app):
+    with app.app_context():
+        user = UserModel().get_by_username('admin')
+    assert user.is_admin
+    assert user.check_password('admin123')
+    assert not user.check_password('wrong')
+    assert user.get_id() == str(user.id)
@@ -0,0 +1,33 @@
+from app.models.database import get_db
+from app.models.section_item import SectionItemModel
+from app.utils import markdown_render
+from app.utils.markdown_render import item_html, render_key
+
+def test_items_store_their_rendered_html(app, content):
+    item_id = content.item(content.section(content.topic()), markdown_content='# Title\n\n*emphasis*')
+    with app.app_context():
+        item = SectionItemModel().get_by_id(item_id)
+    assert item.rendered_key == render_key(item.markdown_content)
+    assert '<em>emphasis</em>' in item.rendered_html
+    assert item_html(item) == item.rendered_html
+
+def test_stale_html_is_rendered_again(app, content, monkeypatch):
+    item_id = content.item(content.section(content.topic()), markdown_content='**bold**')
+    with app.app_context():
+        item = SectionItemModel().get_by_id(item_id)
+    monkeypatch.setattr(markdown_render, 'RENDER_VERSION', markdown_render.RENDER_VERSION + 1)
+    # The stored key no longer matches, so the filter renders fresh HTML
+    assert item.rendered_key != render_key(item.markdown_content)
+    assert '<strong>bold</strong>' in item_html(item)
+
+def test_rerender_all_refreshes_only_stale_items(app, content):
+    section_id = content.section(content.topic())
+    fresh_id = content.item(section_id, markdown_content='fresh')
+    stale_id = content.item(section_id, markdown_content='stale')
+    with app.app_context():
+        get_db().execute("UPDATE section_item SET rendered_html = 'old', rendered_key = 'old' WHERE id = ?", (stale_id,))
+        get_db().commit()
+        assert SectionItemModel().rerender_all(workers=1) == 1
+        assert SectionItemModel().get_by_id(stale_id).rendered_html == '<p>stale</p>'
+        assert SectionItemModel().get_by_id(fresh_id).rendered_html == '<p>fresh</p>'
+        assert SectionItemModel().rerender_all(force=True, workers=1) == 2
@@ -0,0 +1,69 @@
+import pytest
+
+from app.models.database import transaction
+
+@pytest.fixture(params=['memory', 'filesystem'])
+def app_config(request):
+    # No compression here; see test_compression.py for encoded bodies
+    return {'RESPONSE_CACHE_BACKEND': request.param, 'COMPRESS_RESPONSES': False}
+
+@pytest.fixture
+def page(content):
+    content.topic('Vim', description='Modal editing', slug='vim')
+    return '/vim'
+
+def test_public_pages_carry_validators(client, page):
+    response = client.get(page)
+    assert response.status_code == 200
+    assert response.headers['ETag']
+    assert response.headers['Last-Modified']
+    assert response.cache_control.no_cache
+
+def test_matching_etag_is_answered_with_304_from_the_cache(app, client, page):
+    etag = client.get(page).headers['ETag']
+    hits = app.extensions['response_cache'].stats()['hits']
+
+    response = client.get(page, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert app.extensions['response_cache'].stats()['hits'] == hits + 1
+
+def test_unchanged_since_last_modified_is_answered_with_304(client, page):
+    last_modified = client.get(page).headers['Last-Modified']
+    assert client.get(page, headers={'If-Modified-Since': last_modified}).status_code == 304
+
+def test_any_content_change_moves_the_home_page_last_modified(app, client, content):
+    category_id = content.category('Editors')
+    content.topic('Vim', category_id=category_id)
+    # Backdate the last change so the rename below lands in a later second
+    with app.app_context():
+        with transaction() as cursor:
+            cursor.execute("UPDATE content_version SET changed_at = '2000-01-01 00:00:00'")
+    last_modified = client.get('/').headers['Last-Modified']
+
+    with app.app_context():
+        with transaction() as cursor:
+            cursor.execute("UPDATE category SET name = 'Renamed' WHERE id = ?", (category_id,))
+    response = client.get('/', headers={'If-Modified-Since': last_modified})
+    assert response.status_code == 200
+    assert 'Renamed' in response.get_data(as_text=True)
+    assert response.headers['Last-Modified'] != last_modified
+
+def test_content_write_changes_the_etag(client, content, page):
+    etag = client.get(page).headers['ETag']
+    content.topic('Unrelated')
+    response = client.get(page, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+def test_logged_in_pages_are_not_cached(app, admin_client, page):
+    stats = app.extensions['response_cache'].stats()
+    response = admin_client.get(page)
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
+    assert app.extensions['response_cache'].stats() == stats
+
+def test_missing_topics_are_not_cached(app, client):
+    assert client.get('/missing').status_code == 404
+    assert client.get('/missing').status_code == 404
+    assert app.extensions['response_cache'].stats()['hits'] == 0
@@ -0,0 +1,24 @@
+from app.models.topic import TopicModel
+
+def search_ids(client, query):
+    response = client.get('/search/query', query_string={'q': query})
+    return [result['topic']['id'] for result in response.get_json()['results']]
+
+def test_equivalent_queries_share_a_cache_entry(app, client, content):
+    content.topic('Docker')
+    cache = app.extensions['search_cache']
+
+    search_ids(client, 'docker')
+    hits = cache.stats()['hits']
+    search_ids(client, '  DOCKER!! ')
+    assert cache.stats()['hits'] == hits + 1
+    assert len(cache) == 1
+
+def test_writes_invalidate_cached_results(app, client, content):
+    topic_id = content.topic('Docker')
+    assert search_ids(client, 'podman') == []
+
+    with app.app_context():
+        topic = TopicModel().get_by_id(topic_id)
+        TopicModel().update_topic(topic_id, topic.slug, 'Podman', '', topic.category_id, True)
+    assert search_ids(client, 'podman') == [topic_id]
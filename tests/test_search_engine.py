@@ -0,0 +1,64 @@
+from app.models.database import content_generation, transaction
+from app.models.search_engine import get_search_engine
+
+def engine_titles(app, query):
+    with app.app_context():
+        return [topic.title for topic in get_search_engine().search(query).page(0, 50)]
+
+def execute(app, sql, params):
+    # The admin forms change the same columns; raw SQL keeps the tests short
+    with app.app_context():
+        with transaction() as cursor:
+            cursor.execute(sql, params)
+
+# ----- PUBLISHED CONTENT ONLY ----- #
+def test_drafts_do_not_crowd_out_published_hits(app, content):
+    for number in range(250):
+        content.topic(f'Zebra draft {number}', published=False)
+    content.topic('Zebra crossing', published=True)
+
+    assert engine_titles(app, 'zebra') == ['Zebra crossing']
+
+def test_draft_content_is_not_indexed(app, content):
+    draft = content.topic('Draft', published=False)
+    content.item(content.section(draft, 'Walrus section'), 'Walrus item', 'walrus body')
+
+    with app.app_context():
+        engine = get_search_engine()
+        engine.build()
+        assert not any(term.startswith('walrus') for term in engine.postings)
+
+# ----- KEPT CURRENT BY SYNC ----- #
+def test_publishing_a_topic_indexes_its_sections_and_items(app, content):
+    topic_id = content.topic('Draft', published=False)
+    content.item(content.section(topic_id, 'Section'), 'Item', 'narwhal facts')
+    assert engine_titles(app, 'narwhal') == []
+
+    execute(app, 'UPDATE topic SET is_published = 1 WHERE id = ?', (topic_id,))
+    assert engine_titles(app, 'narwhal') == ['Draft']
+
+    execute(app, 'UPDATE topic SET is_published = 0 WHERE id = ?', (topic_id,))
+    assert engine_titles(app, 'narwhal') == []
+
+def test_moving_a_section_to_a_draft_unindexes_its_items(app, content):
+    published = content.topic('Published')
+    draft = content.topic('Draft', published=False)
+    section_id = content.section(published, 'Section')
+    content.item(section_id, 'Item', 'okapi facts')
+    assert engine_titles(app, 'okapi') == ['Published']
+
+    execute(app, 'UPDATE section SET topic_id = ? WHERE id = ?', (draft, section_id))
+    assert engine_titles(app, 'okapi') == []
+
+def test_search_sees_writes_before_the_invalidation_bus_runs(app, client, content):
+    topic_id = content.topic('Before')
+    assert client.get('/search/query', query_string={'q': 'before'}).get_json()['results']
+
+    execute(app, "UPDATE topic SET title = 'After' WHERE id = ?", (topic_id,))
+    # Another request has published the new version but not yet run the
+    # callbacks, so this one skips them
+    with app.app_context():
+        app.extensions['invalidation'].version = content_generation()
+
+    results = client.get('/search/query', query_string={'q': 'after'}).get_json()['results']
+    assert [result['topic']['id'] for result in results] == [topic_id]
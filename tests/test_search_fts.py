@@ -0,0 +1,44 @@
+import pytest
+
+@pytest.fixture
+def app_config():
+    return {'SEARCH_BACKEND': 'fts'}
+
+def search(client, query, **params):
+    response = client.get('/search/query', query_string={'q': query, **params})
+    assert response.status_code == 200
+    return response.get_json()
+
+def test_drafts_do_not_crowd_out_published_matches(app, client, content):
+    category_id = content.category()
+    for n in range(250):
+        content.topic(f'Zebra draft {n}', published=False, category_id=category_id)
+    published_id = content.topic('Animals', description='The zebra has stripes', category_id=category_id)
+
+    results = search(client, 'zebra')['results']
+    assert [result['topic']['id'] for result in results] == [published_id]
+
+def test_drafted_sections_and_items_are_not_returned(app, client, content):
+    draft_id = content.topic('Draft', published=False)
+    content.item(content.section(draft_id, 'Hidden okapi'), 'Okapi notes', 'okapi okapi')
+    assert search(client, 'okapi')['results'] == []
+
+def test_item_hits_carry_highlighted_snippets(app, client, content):
+    topic_id = content.topic('Shell')
+    content.item(content.section(topic_id, 'Basics'), 'Listing', 'Use <ls> to list the directory contents')
+
+    result, = search(client, 'directory')['results']
+    assert result['match_type'] == 'content'
+    item, = result['sections'][0]['items']
+    assert '<mark>directory</mark>' in item['snippet']
+    assert '&lt;ls&gt;' in item['snippet']
+
+def test_title_matches_rank_before_body_matches(app, client, content):
+    body_id = content.topic('Tools', description='a note about rsync')
+    title_id = content.topic('Rsync')
+    ids = [result['topic']['id'] for result in search(client, 'rsync')['results']]
+    assert ids == [title_id, body_id]
+
+def test_last_word_matches_as_a_prefix(app, client, content):
+    topic_id = content.topic('Kubernetes')
+    assert [result['topic']['id'] for result in search(client, 'kube')['results']] == [topic_id]
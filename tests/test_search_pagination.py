@@ -0,0 +1,70 @@
+import pytest
+
+@pytest.fixture(params=['engine', 'fts'])
+def app_config(request):
+    return {'SEARCH_BACKEND': request.param}
+
+def search(client, query, **params):
+    return client.get('/search/query', query_string={'q': query, **params})
+
+def all_pages(client, query, limit):
+    ids = []
+    cursor = None
+    while True:
+        params = {'limit': limit}
+        if cursor:
+            params['cursor'] = cursor
+        body = search(client, query, **params).get_json()
+        ids += [result['topic']['id'] for result in body['results']]
+        cursor = body['next_cursor']
+        if not cursor:
+            return ids
+
+@pytest.fixture
+def zebras(content):
+    category_id = content.category()
+    return [content.topic(f'Zebra {n:03}', category_id=category_id) for n in range(260)]
+
+# ----- PAGING ----- #
+def test_pages_cover_every_match_past_the_first_200(client, zebras):
+    ids = all_pages(client, 'zebra', limit=100)
+    assert sorted(ids) == sorted(zebras)
+    assert len(ids) == len(set(ids))
+
+def test_pages_follow_the_ranked_order(client, content):
+    category_id = content.category()
+    body_id = content.topic('Tools', description='a note about rsync', category_id=category_id)
+    title_id = content.topic('Rsync', category_id=category_id)
+    assert all_pages(client, 'rsync', limit=1) == [title_id, body_id]
+
+def test_items_on_later_pages_have_snippets(client, content):
+    category_id = content.category()
+    for n in range(3):
+        topic_id = content.topic(f'Topic {n}', category_id=category_id)
+        content.item(content.section(topic_id, 'Section'), 'Item', f'the walrus number {n}')
+
+    body = search(client, 'walrus', limit=1).get_json()
+    body = search(client, 'walrus', limit=1, cursor=body['next_cursor']).get_json()
+    item, = body['results'][0]['sections'][0]['items']
+    assert '<mark>walrus</mark>' in item['snippet']
+
+def test_ndjson_pages_send_the_cursor_in_a_header(client, zebras):
+    response = search(client, 'zebra', format='ndjson', limit=200)
+    assert len(response.get_data(as_text=True).splitlines()) == 200
+    response = search(client, 'zebra', format='ndjson', limit=200, cursor=response.headers['X-Next-Cursor'])
+    assert len(response.get_data(as_text=True).splitlines()) == 60
+    assert 'X-Next-Cursor' not in response.headers
+
+# ----- CURSOR CHECKS ----- #
+def test_malformed_cursor_is_rejected(client, zebras):
+    assert search(client, 'zebra', cursor='not-a-cursor').status_code == 400
+
+def test_cursor_from_another_query_is_rejected(client, zebras):
+    cursor = search(client, 'zebra', limit=10).get_json()['next_cursor']
+    assert search(client, 'zeb', cursor=cursor).status_code == 400
+
+def test_cursor_is_rejected_once_content_changes(client, content, zebras):
+    cursor = search(client, 'zebra', limit=10).get_json()['next_cursor']
+    content.topic('Zebra crossing')
+    response = search(client, 'zebra', cursor=cursor)
+    assert response.status_code == 400
@@ -0,0 +1,76 @@
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.routes import SEARCH_QUERIES
+
+pytestmark = pytest.mark.skipif(shutil.which('node') is None, reason='node is not installed')
+
+LOCAL_SEARCH_JS = os.path.join(os.path.dirname(__file__), '..', 'app', 'static', 'js', 'local-search.js')
+
+# Answers every query with LocalSearch over the given /search/index payload
+HARNESS = '''
+const fs = require('fs');
+const [indexPath, queriesPath] = process.argv.slice(2);
+globalThis.fetch = () => Promise.resolve({ ok: true, json: () => JSON.parse(fs.readFileSync(indexPath, 'utf8')) });
+LocalSearch.load().then(() => {
+    const queries = JSON.parse(fs.readFileSync(queriesPath, 'utf8'));
+    process.stdout.write(JSON.stringify(queries.map(query => LocalSearch.search(query))));
+});
+'''
+
+def shape(result):
+    return (
+        result['topic']['id'],
+        result['match_type'],
+        [(section['id'], [item['id'] for item in section['items']]) for section in result['sections']],
+    )
+
+def local_results(client, tmp_path, queries):
+    index = client.get('/search/index').get_json()
+    assert index['available']
+    (tmp_path / 'index.json').write_text(json.dumps(index))
+    (tmp_path / 'queries.json').write_text(json.dumps(queries))
+    with open(LOCAL_SEARCH_JS, encoding='utf-8') as f:
+        (tmp_path / 'harness.js').write_text(f.read() + HARNESS)
+
+    output = subprocess.run(
+        ['node', str(tmp_path / 'harness.js'), str(tmp_path / 'index.json'), str(tmp_path / 'queries.json')],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return [[shape(result) for result in results] for results in json.loads(output)]
+
+def server_results(client, query):
+    results = []
+    cursor = None
+    while True:
+        params = {'q': query, 'limit': 200}
+        if cursor:
+            params['cursor'] = cursor
+        body = client.get('/search/query', query_string=params).get_json()
+        results += [shape(result) for result in body['results']]
+        cursor = body['next_cursor']
+        if not cursor:
+            return results
+
+# ----- SAME RESULTS IN THE BROWSER AND ON THE SERVER ----- #
+def test_local_search_matches_the_engine(app, client, tmp_path):
+    with app.app_context():
+        generate_corpus(categories=3, topics=30, sections=4, items=4, seed=5)
+
+    queries = SEARCH_QUERIES
+    for query, local in zip(queries, local_results(client, tmp_path, queries)):
+        assert local == server_results(client, query), query
+
+def test_local_search_returns_every_match(app, client, content, tmp_path):
+    category_id = content.category()
+    for n in range(250):
+        content.topic(f'Zebra {n:03}', category_id=category_id)
+
+    local, = local_results(client, tmp_path, ['zebra'])
+    assert len(local) == 250
+    assert local == server_results(client, 'zebra')
@@ -0,0 +1,37 @@
+import re
+
+import pytest
+
+from app.models import snapshot
+
+VERSION_META = re.compile(r'<meta name="sidebar-index-version" content="([^"]+)">')
+
+@pytest.fixture
+def snapshot_builds(monkeypatch):
+    builds = []
+    build = snapshot.SnapshotModel.build
+
+    def counting_build(self):
+        builds.append(1)
+        return build(self)
+
+    monkeypatch.setattr(snapshot.SnapshotModel, 'build', counting_build)
+    return builds
+
+# ----- PUBLIC PAGES ----- #
+@pytest.mark.parametrize('path', ['/', '/vim'])
+def test_public_pages_name_the_sidebar_index_version(client, content, path):
+    content.topic('Vim', slug='vim')
+    version, = VERSION_META.findall(client.get(path).get_data(as_text=True))
+    assert client.get('/search/topics').headers['ETag'] == f'"{version}"'
+
+# ----- OTHER PAGES ----- #
+def test_login_page_does_not_build_the_snapshot(client, snapshot_builds):
+    page = client.get('/auth/login').get_data(as_text=True)
+    assert not VERSION_META.search(page)
+    assert snapshot_builds == []
+
+def test_admin_pages_do_not_build_the_snapshot(admin_client, snapshot_builds):
+    page = admin_client.get('/admin/').get_data(as_text=True)
+    assert not VERSION_META.search(page)
+    assert snapshot_builds == []
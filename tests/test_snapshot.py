@@ -0,0 +1,51 @@
+import pytest
+
+from app.models.snapshot import get_snapshot
+
+def test_snapshot_holds_only_published_content(app, content):
+    published_id = content.topic('Published')
+    draft_id = content.topic('Draft', published=False)
+    content.item(content.section(published_id))
+    with app.test_request_context():
+        snapshot = get_snapshot()
+    assert [topic.id for topic in snapshot.topics] == [published_id]
+    assert draft_id not in snapshot.topics_by_id
+    # The footer's recent topics include drafts
+    assert draft_id in [topic.id for topic in snapshot.recent_topics]
+
+def test_snapshot_is_read_only(app, content):
+    content.item(content.section(content.topic()))
+    with app.test_request_context():
+        snapshot = get_snapshot()
+    topic = snapshot.topics[0]
+    assert isinstance(topic.sections, tuple)
+    assert isinstance(topic.sections[0].items, tuple)
+    with pytest.raises(TypeError):
+        snapshot.topics_by_slug['other'] = topic
+    with pytest.raises(TypeError):
+        next(iter(snapshot.categorized_topics.values()))['topics'] = ()
+
+def test_snapshot_is_shared_until_content_changes(app, content):
+    content.topic('First')
+    with app.test_request_context():
+        first = get_snapshot()
+    with app.test_request_context():
+        assert get_snapshot() is first
+
+    content.topic('Second')
+    with app.test_request_context():
+        second = get_snapshot()
+    assert second is not first
+    assert second.version > first.version
+    assert [topic.title for topic in second.topics] == ['First', 'Second']
+
+def test_pages_render_from_the_snapshot(app, client, content):
+    topic_id = content.topic('Cached', slug='cached')
+    content.item(content.section(topic_id), 'Entry', '**bold**')
+    client.get('/cached')
+    with app.test_request_context():
+        version = get_snapshot().version
+    response = client.get('/cached')
+    assert b'<strong>bold</strong>' in response.data
+    with app.test_request_context():
+        assert get_snapshot().version == version
@@ -0,0 +1,48 @@
+from blinker import ANY
+
+from app.models.database import query_executed
+from app.models.topic import TopicModel
+
+def count_queries(app, load):
+    statements = []
+
+    def on_query(sender, sql, elapsed):
+        statements.append(sql)
+
+    with app.app_context():
+        with query_executed.connected_to(on_query, ANY):
+            result = load()
+    return result, len(statements)
+
+def build_topic(content, sections, items, published=True):
+    topic_id = content.topic(published=published, slug=f'tree-{sections}-{items}-{published}')
+    for s in range(sections):
+        # Created in reverse so display order, not insert order, decides
+        section_id = content.section(topic_id, f'Section {s}', display_order=sections - s)
+        for i in range(items):
+            content.item(section_id, f'Item {s}.{i}', display_order=items - i)
+    return topic_id
+
+def test_tree_loads_in_a_fixed_number_of_queries(app, content):
+    build_topic(content, 1, 1)
+    build_topic(content, 6, 5)
+    model = TopicModel()
+
+    _, small = count_queries(app, lambda: model.get_tree_by_slug('tree-1-1-True'))
+    topic, large = count_queries(app, lambda: model.get_tree_by_slug('tree-6-5-True'))
+    assert small == large == 3
+    assert len(topic.sections) == 6
+    assert all(len(section.items) == 5 for section in topic.sections)
+
+def test_tree_is_in_display_order(app, content):
+    build_topic(content, 3, 3)
+    with app.app_context():
+        topic = TopicModel().get_tree_by_slug('tree-3-3-True')
+    assert [section.title for section in topic.sections] == ['Section 2', 'Section 1', 'Section 0']
+    assert [item.title for item in topic.sections[0].items] == ['Item 2.2', 'Item 2.1', 'Item 2.0']
+
+def test_unpublished_topics_have_no_public_tree(app, content):
+    topic_id = build_topic(content, 1, 1, published=False)
+    with app.app_context():
+        assert TopicModel().get_tree_by_slug('tree-1-1-False') is None
+        assert TopicModel().get_tree_by_id(topic_id).id == topic_id